@@ -1,8 +1,12 @@
 from __future__ import annotations
 
+import asyncio
+import base64
 import logging
 import json
+import math
 from datetime import datetime
+from io import BytesIO
 from typing import List, Optional, Type
 
 from langchain_anthropic import ChatAnthropic
@@ -11,17 +15,42 @@ from langchain_core.messages import (
 	AIMessage,
 	BaseMessage,
 	HumanMessage,
+	SystemMessage,
 	ToolMessage,
 )
 from langchain_openai import ChatOpenAI
+from PIL import Image
 
-from browser_use.agent.message_manager.views import MessageHistory, MessageMetadata
+from browser_use.agent.message_manager.tokenizer import Tokenizer, get_tokenizer
+from browser_use.agent.message_manager.views import ElementDelta, MessageHistory, MessageMetadata, PageSnapshot
 from browser_use.agent.prompts import AgentMessagePrompt, SystemPrompt
 from browser_use.agent.views import ActionResult, AgentOutput, AgentStepInfo
+from browser_use.agent.vision import VisionDecision
 from browser_use.browser.views import BrowserState
 
 logger = logging.getLogger(__name__)
 
+# Weight of the latest provider token count when updating the correction of the estimated token counts
+TOKEN_CORRECTION_SMOOTHING = 0.5
+# Bounds of the correction, a single odd response must not make the history look empty or full
+MIN_TOKEN_CORRECTION = 0.5
+MAX_TOKEN_CORRECTION = 3.0
+
+# Largest delta, relative to the number of elements on the page, sent instead of a full element list
+MAX_ELEMENT_DELTA_RATIO = 0.5
+
+# Longest line of a folded step in the history summary, and the number of lines it keeps before dropping the oldest
+MAX_SUMMARY_LINE_LENGTH = 300
+MAX_SUMMARY_LINES = 60
+
+HISTORY_SUMMARY_PROMPT = """You condense the history of a browser automation agent.
+Rewrite the summary and the new steps into one short summary of at most 15 lines.
+Keep everything the agent needs to finish its task: pages visited, data extracted, what worked, what failed, and
+what is already done. Drop routine details. Answer with the summary only."""
+
+# Marks the end of a prompt prefix the provider should cache, Anthropic keeps it for 5 minutes after the last read
+CACHE_CONTROL = {'type': 'ephemeral'}
+
 
 class MessageManager:
 	def __init__(
@@ -37,6 +66,12 @@ class MessageManager:
 		max_error_length: int = 400,
 		max_actions_per_step: int = 10,
 		message_context: Optional[str] = None,
+		prompt_caching: bool = True,
+		tokenizer: Optional[Tokenizer] = None,
+		max_history_steps: Optional[int] = None,
+		summary_llm: Optional[BaseChatModel] = None,
+		state_deltas: bool = False,
+		full_snapshot_interval: int = 5,
 	):
 		self.llm = llm
 		self.system_prompt_class = system_prompt_class
@@ -45,10 +80,35 @@ class MessageManager:
 		self.task = task
 		self.action_descriptions = action_descriptions
 		self.estimated_characters_per_token = estimated_characters_per_token
+		self.tokenizer = tokenizer or get_tokenizer(llm, estimated_characters_per_token)
+		# actual input tokens reported by the provider per counted token, covers the tool schemas and message framing
+		self.token_correction = 1.0
+		self._sent_tokens = 0
 		self.IMG_TOKENS = image_tokens
 		self.include_attributes = include_attributes
 		self.max_error_length = max_error_length
 		self.message_context = message_context
+		# marked copies of prefix messages by history index, sent in place of the originals
+		self._cache_breakpoints: dict[int, BaseMessage] = {}
+		# steps before the last max_history_steps are folded into one summary message after the prefix, None keeps all
+		self.max_history_steps = max_history_steps
+		# condenses the folded steps in the background, without it the summary lists them rule based
+		self.summary_llm = summary_llm
+		self._has_summary_message = False
+		self._summarized_steps = 0
+		self._summary_lines: list[str] = []
+		# number of summary lines ever dropped from the front of _summary_lines, by the line limit or the llm summary
+		self._summary_line_offset = 0
+		self._omitted_summary_lines = 0
+		self._llm_summary: Optional[str] = None
+		self._summary_task: Optional[asyncio.Task] = None
+		# on the same page, state messages only list the element changes to the last full element list in the history
+		self.state_deltas = state_deltas
+		# steps after which the full element list is sent again, even if the page barely changed
+		self.full_snapshot_interval = full_snapshot_interval
+		self._snapshot: Optional[PageSnapshot] = None
+		self._pending_snapshot: Optional[PageSnapshot] = None
+		self._steps_since_snapshot = 0
 
 		system_message = self.system_prompt_class(
 			self.action_descriptions,
@@ -58,6 +118,8 @@ class MessageManager:
 
 		self._add_message_with_tokens(system_message)
 		self.system_prompt = system_message
+		# the system prompt with the tools is shared by all runs with the same controller and system prompt
+		system_prompt_index = len(self.history.messages) - 1
 
 		if self.message_context:
 			context_message = HumanMessage(content=self.message_context)
@@ -65,6 +127,8 @@ class MessageManager:
 
 		task_message = self.task_instructions(task)
 		self._add_message_with_tokens(task_message)
+		# everything up to the task is repeated unchanged in every step of the run
+		task_index = len(self.history.messages) - 1
 		self.tool_id = 1
 		tool_calls = [
 			{
@@ -94,6 +158,24 @@ class MessageManager:
 		self._add_message_with_tokens(tool_message)
 		self.tool_id += 1
 
+		# messages that stay the same for the whole run, nothing before this index is modified or removed
+		self.prefix_length = len(self.history.messages)
+
+		# OpenAI caches prompt prefixes automatically, Anthropic only up to explicitly marked blocks
+		if prompt_caching and isinstance(self.llm, ChatAnthropic):
+			for index in (system_prompt_index, task_index):
+				self._cache_breakpoints[index] = self._mark_cache_breakpoint(self.history.messages[index].message)
+
+	@staticmethod
+	def _mark_cache_breakpoint(message: BaseMessage) -> BaseMessage:
+		"""Copy of the message whose last content block asks the provider to cache the prompt up to it"""
+		if isinstance(message.content, str):
+			blocks = [{'type': 'text', 'text': message.content}]
+		else:
+			blocks = [dict(block) if isinstance(block, dict) else {'type': 'text', 'text': block} for block in message.content]
+		blocks[-1]['cache_control'] = CACHE_CONTROL
+		return message.model_copy(update={'content': blocks})
+
 	@staticmethod
 	def task_instructions(task: str) -> HumanMessage:
 		content = f'Your ultimate task is: {task}. If you achieved your ultimate task, stop everything and use the done action in the next step to complete the task. If not, continue as usual.'
@@ -104,8 +186,9 @@ class MessageManager:
 		state: BrowserState,
 		result: Optional[List[ActionResult]] = None,
 		step_info: Optional[AgentStepInfo] = None,
+		vision: Optional[VisionDecision] = None,
 	) -> None:
-		"""Add browser state as human message"""
+		"""Add browser state as human message, vision decides which image is attached if set"""
 
 		# if keep in memory, add to directly to history and add state without result
 		if result:
@@ -126,13 +209,56 @@ class MessageManager:
 			include_attributes=self.include_attributes,
 			max_error_length=self.max_error_length,
 			step_info=step_info,
+			element_delta=self._get_element_delta(state) if self.state_deltas else None,
+			vision=vision,
 		).get_user_message()
 		self._add_message_with_tokens(state_message)
 
+	def _get_element_delta(self, state: BrowserState) -> Optional[ElementDelta]:
+		"""Changes to the snapshot of the page, None if the full element list has to be sent"""
+		lines = state.element_tree.clickable_element_lines(include_attributes=self.include_attributes)
+		self._pending_snapshot = None
+
+		snapshot = self._snapshot
+		if (
+			snapshot is not None
+			and snapshot.url == state.url
+			and self._steps_since_snapshot < self.full_snapshot_interval
+			and any(m.message is snapshot.message for m in self.history.messages)
+		):
+			delta = ElementDelta.between(snapshot.lines, lines)
+			if delta.size <= MAX_ELEMENT_DELTA_RATIO * max(len(lines), 1):
+				self._steps_since_snapshot += 1
+				return delta
+
+		# navigated, changed too much or the snapshot is too old, the full list becomes the new snapshot
+		self._pending_snapshot = PageSnapshot(url=state.url, lines=lines)
+		return None
+
 	def _remove_last_state_message(self) -> None:
 		"""Remove last state message from history"""
 		if len(self.history.messages) > 2 and isinstance(self.history.messages[-1].message, HumanMessage):
 			self.history.remove_message()
+			if self._pending_snapshot is not None:
+				self._keep_snapshot(self._pending_snapshot)
+				self._pending_snapshot = None
+
+	def _keep_snapshot(self, snapshot: PageSnapshot) -> None:
+		"""Keep the element list of a full state message in the history, replacing the previous snapshot"""
+		if self._snapshot is not None:
+			for index, m in enumerate(self.history.messages):
+				if m.message is self._snapshot.message:
+					self.history.remove_message(index)
+					break
+
+		elements_text = '\n'.join(line for _, line in snapshot.lines) or 'empty page'
+		snapshot.message = HumanMessage(
+			content=f'Page snapshot of {snapshot.url}, later state messages of this page only list the changes to it:\n'
+			f'{elements_text}'
+		)
+		self._add_message_with_tokens(snapshot.message)
+		self._snapshot = snapshot
+		self._steps_since_snapshot = 0
 
 	def add_model_output(self, model_output: AgentOutput) -> None:
 		"""Add model output as AI message"""
@@ -158,11 +284,128 @@ class MessageManager:
 		)
 		self._add_message_with_tokens(tool_message)
 		self.tool_id += 1
+		self.compact_history()
+
+	def compact_history(self) -> None:
+		"""Fold all steps but the last max_history_steps into the summary message after the prefix"""
+		if self.max_history_steps is None:
+			return
+
+		messages = self.history.messages
+		start = self.prefix_length + (1 if self._has_summary_message else 0)
+		# a step is the model output with its tool message, followed by the results of its actions
+		step_starts = [i for i in range(start, len(messages)) if isinstance(messages[i].message, AIMessage)]
+		excess = len(step_starts) - self.max_history_steps
+		if excess <= 0:
+			return
+		end = step_starts[excess] if excess < len(step_starts) else len(messages)
+
+		folded = [m.message for m in messages[start:end]]
+		for _ in range(end - start):
+			self.history.remove_message(start)
+		self._summary_lines.extend(self._summarize_steps(folded))
+
+		overflow = len(self._summary_lines) - MAX_SUMMARY_LINES
+		if overflow > 0:
+			del self._summary_lines[:overflow]
+			self._summary_line_offset += overflow
+			self._omitted_summary_lines += overflow
+
+		self._update_summary_message()
+		self._start_llm_summary()
+		logger.debug(f'Folded {excess} steps into the history summary - total tokens now: {self.history.total_tokens}')
+
+	def _summarize_steps(self, messages: list[BaseMessage]) -> list[str]:
+		"""One line per step with its goal and actions, and one per action result"""
+		lines = []
+		for message in messages:
+			if self._snapshot is not None and message is self._snapshot.message:
+				# the next state message of the page has the full element list again
+				continue
+			if isinstance(message, AIMessage):
+				self._summarized_steps += 1
+				for tool_call in message.tool_calls:
+					args = tool_call['args']
+					goal = (args.get('current_state') or {}).get('next_goal', '')
+					actions = ', '.join(
+						f'{name}({params})' for action in args.get('action', []) for name, params in action.items()
+					)
+					lines.append(self._truncate(f'Step {self._summarized_steps}: {goal} - actions: {actions or "none"}'))
+			elif isinstance(message, HumanMessage) and isinstance(message.content, str):
+				lines.append(self._truncate(f'  {message.content}'))
+		return lines
+
+	@staticmethod
+	def _truncate(line: str) -> str:
+		line = ' '.join(line.split())
+		if len(line) <= MAX_SUMMARY_LINE_LENGTH:
+			return line
+		return line[: MAX_SUMMARY_LINE_LENGTH - 3] + '...'
+
+	def _update_summary_message(self) -> None:
+		"""Replace the summary message after the prefix with the current summary"""
+		parts = [f'Summary of the earlier steps, the last {self.max_history_steps} steps follow in full:']
+		if self._llm_summary:
+			parts.append(self._llm_summary)
+		if self._omitted_summary_lines:
+			parts.append(f'({self._omitted_summary_lines} older lines omitted)')
+		parts.extend(self._summary_lines)
+		message = HumanMessage(content='\n'.join(parts))
+
+		if self._has_summary_message:
+			self.history.remove_message(self.prefix_length)
+		self.history.insert_message(self.prefix_length, message, MessageMetadata(input_tokens=self._count_tokens(message)))
+		self._has_summary_message = True
+
+	def _start_llm_summary(self) -> None:
+		"""Condense the summary lines with the summary llm in the background, one call at a time"""
+		if self.summary_llm is None or not self._summary_lines:
+			return
+		if self._summary_task is not None and not self._summary_task.done():
+			return
+		try:
+			loop = asyncio.get_running_loop()
+		except RuntimeError:
+			return
+		covered_until = self._summary_line_offset + len(self._summary_lines)
+		self._summary_task = loop.create_task(
+			self._summarize_with_llm(self._llm_summary, list(self._summary_lines), covered_until)
+		)
+
+	async def _summarize_with_llm(self, previous_summary: Optional[str], lines: list[str], covered_until: int) -> None:
+		assert self.summary_llm is not None
+		content = f'Summary:\n{previous_summary or "(none)"}\n\nNew steps:\n' + '\n'.join(lines)
+		try:
+			response = await self.summary_llm.ainvoke(
+				[SystemMessage(content=HISTORY_SUMMARY_PROMPT), HumanMessage(content=content)]
+			)
+		except Exception as e:
+			logger.warning(f'Could not summarize the history, keeping the rule based summary: {e}')
+			return
+
+		self._llm_summary = str(response.content).strip()
+		# lines folded while the call ran are not covered by the new summary
+		covered = covered_until - self._summary_line_offset
+		if covered > 0:
+			del self._summary_lines[:covered]
+			self._summary_line_offset += covered
+		self._update_summary_message()
+
+	async def close(self) -> None:
+		"""Cancel a running history summary, so it does not outlive the run or change its history afterwards"""
+		task, self._summary_task = self._summary_task, None
+		if task is None or task.done():
+			return
+		task.cancel()
+		try:
+			await task
+		except asyncio.CancelledError:
+			pass
 
 	def get_messages(self) -> List[BaseMessage]:
 		"""Get current message list, potentially trimmed to max tokens"""
 
-		msg = [m.message for m in self.history.messages]
+		msg = [self._cache_breakpoints.get(i, m.message) for i, m in enumerate(self.history.messages)]
 		# debug which messages are in history with token count # log
 		total_input_tokens = 0
 		logger.debug(f'Messages in history: {len(self.history.messages)}:')
@@ -170,9 +413,26 @@ class MessageManager:
 			total_input_tokens += m.metadata.input_tokens
 			logger.debug(f'{m.message.__class__.__name__} - Token count: {m.metadata.input_tokens}')
 		logger.debug(f'Total input tokens: {total_input_tokens}')
+		self._sent_tokens = total_input_tokens
 
 		return msg
 
+	@property
+	def estimated_input_tokens(self) -> int:
+		"""Input tokens of the current history as the provider is expected to count them"""
+		return round(self.history.total_tokens * self.token_correction)
+
+	def reconcile_input_tokens(self, actual_tokens: int) -> None:
+		"""Correct the token estimates with the input tokens the provider reported for the last get_messages call"""
+		if actual_tokens <= 0 or self._sent_tokens <= 0:
+			return
+		ratio = min(max(actual_tokens / self._sent_tokens, MIN_TOKEN_CORRECTION), MAX_TOKEN_CORRECTION)
+		self.token_correction += TOKEN_CORRECTION_SMOOTHING * (ratio - self.token_correction)
+		logger.debug(
+			f'Counted {self._sent_tokens} input tokens, provider reported {actual_tokens} - '
+			f'correction now {self.token_correction:.2f}'
+		)
+
 	def _add_message_with_tokens(self, message: BaseMessage) -> None:
 		"""Add message with token count metadata"""
 		token_count = self._count_tokens(message)
@@ -185,7 +445,7 @@ class MessageManager:
 		if isinstance(message.content, list):
 			for item in message.content:
 				if 'image_url' in item:
-					tokens += self.IMG_TOKENS
+					tokens += self._count_image_tokens(item)
 				elif isinstance(item, dict) and 'text' in item:
 					tokens += self._count_text_tokens(item['text'])
 		else:
@@ -195,15 +455,40 @@ class MessageManager:
 			tokens += self._count_text_tokens(msg)
 		return tokens
 
+	def _count_image_tokens(self, item: dict) -> int:
+		"""Estimate image tokens from the real image dimensions, falls back to the flat image token estimate"""
+		try:
+			url = item['image_url']['url']
+			data = url.split(',', 1)[1] if url.startswith('data:') else url
+			# only the header is parsed, the pixels are not decoded
+			width, height = Image.open(BytesIO(base64.b64decode(data))).size
+		except Exception:
+			return self.IMG_TOKENS
+
+		if isinstance(self.llm, ChatAnthropic):
+			# Anthropic scales the long edge down to 1568px and bills about one token per 750 pixels
+			scale = min(1.0, 1568 / max(width, height))
+			return math.ceil(width * scale * height * scale / 750)
+
+		if item['image_url'].get('detail') == 'low':
+			# OpenAI low detail is one 512px image at a flat cost
+			return 85
+
+		# OpenAI high detail: fit into 2048x2048, scale the short side down to 768px, then 170 tokens per 512px tile
+		scale = min(1.0, 2048 / max(width, height))
+		width, height = width * scale, height * scale
+		scale = min(1.0, 768 / min(width, height))
+		width, height = width * scale, height * scale
+		return 85 + 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
 	def _count_text_tokens(self, text: str) -> int:
 		"""Count tokens in a text string"""
-
-		tokens = len(text) // self.estimated_characters_per_token  # Rough estimate if no tokenizer available
-		return tokens
+		return self.tokenizer.count_tokens(text)
 
 	def cut_messages(self):
 		"""Get current message list, potentially trimmed to max tokens"""
-		diff = self.history.total_tokens - self.max_input_tokens
+		# history token counts are uncorrected, so the limit is converted to counted tokens
+		diff = self.history.total_tokens - int(self.max_input_tokens / self.token_correction)
 		if diff <= 0:
 			return None
 
@@ -214,12 +499,14 @@ class MessageManager:
 			text = ''
 			for item in msg.message.content:
 				if 'image_url' in item:
+					image_tokens = self._count_image_tokens(item)
 					msg.message.content.remove(item)
-					diff -= self.IMG_TOKENS
-					msg.metadata.input_tokens -= self.IMG_TOKENS
-					self.history.total_tokens -= self.IMG_TOKENS
+					diff -= image_tokens
+					msg.metadata.input_tokens -= image_tokens
+					self.history.total_tokens -= image_tokens
 					logger.debug(
-						f'Removed image with {self.IMG_TOKENS} tokens - total tokens now: {self.history.total_tokens}/{self.max_input_tokens}'
+						f'Removed image with {image_tokens} tokens - '
+						f'total tokens now: {self.history.total_tokens}/{self.max_input_tokens}'
 					)
 				elif 'text' in item and isinstance(item, dict):
 					text += item['text']
@@ -0,0 +1,118 @@
+"""
+Token counting for the message history.
+
+Every chat model class maps to a tokenizer factory. OpenAI models count with tiktoken, all other models use a
+characters per token estimate. Other model families can plug in their own tokenizer:
+
+	register_tokenizer('ChatMistralAI', lambda llm, characters_per_token: MyMistralTokenizer())
+
+Tokenizers are shared by all message managers of the same model, so the counts of repeated texts like the system
+prompt are cached across agents.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+from langchain_core.language_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+# Number of distinct texts whose token counts a tokenizer keeps
+TOKEN_COUNT_CACHE_SIZE = 1024
+
+
+class Tokenizer:
+	"""Counts the tokens of texts, base class estimates them from the number of characters"""
+
+	def __init__(self, characters_per_token: float = 3):
+		self.characters_per_token = characters_per_token
+		self._cache: OrderedDict[str, int] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def count_tokens(self, text: str) -> int:
+		with self._lock:
+			if text in self._cache:
+				self._cache.move_to_end(text)
+				return self._cache[text]
+
+		tokens = self._count_tokens(text)
+
+		with self._lock:
+			self._cache[text] = tokens
+			if len(self._cache) > TOKEN_COUNT_CACHE_SIZE:
+				self._cache.popitem(last=False)
+		return tokens
+
+	def _count_tokens(self, text: str) -> int:
+		return int(len(text) // self.characters_per_token)
+
+
+class TiktokenTokenizer(Tokenizer):
+	"""Counts tokens with the tiktoken encoding of an OpenAI model, estimates them if the encoding can not be loaded"""
+
+	def __init__(self, model_name: str, characters_per_token: float = 3):
+		super().__init__(characters_per_token)
+		self.model_name = model_name
+		self._encoding = None
+		self._encoding_loaded = False
+
+	def _get_encoding(self):
+		# loaded on first use, the encoding files are downloaded once and cached by tiktoken
+		if not self._encoding_loaded:
+			self._encoding_loaded = True
+			try:
+				import tiktoken
+
+				try:
+					self._encoding = tiktoken.encoding_for_model(self.model_name)
+				except KeyError:
+					self._encoding = tiktoken.get_encoding('o200k_base')
+			except Exception as e:
+				logger.debug(f'Could not load tiktoken encoding for {self.model_name}, estimating tokens instead: {e}')
+		return self._encoding
+
+	def _count_tokens(self, text: str) -> int:
+		encoding = self._get_encoding()
+		if encoding is None:
+			return super()._count_tokens(text)
+		return len(encoding.encode(text, disallowed_special=()))
+
+
+TokenizerFactory = Callable[[BaseChatModel, float], Tokenizer]
+
+
+def _openai_tokenizer(llm: BaseChatModel, characters_per_token: float) -> Tokenizer:
+	model_name = getattr(llm, 'model_name', None) or 'gpt-4o'
+	return TiktokenTokenizer(model_name, characters_per_token)
+
+
+_tokenizer_factories: dict[str, TokenizerFactory] = {
+	'ChatOpenAI': _openai_tokenizer,
+	'AzureChatOpenAI': _openai_tokenizer,
+}
+_tokenizers: dict[tuple[str, str, float], Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def register_tokenizer(chat_model_class_name: str, factory: TokenizerFactory) -> None:
+	"""Use the tokenizers made by factory for all chat models of the class, replaces earlier registrations"""
+	with _tokenizers_lock:
+		_tokenizer_factories[chat_model_class_name] = factory
+		for key in [key for key in _tokenizers if key[0] == chat_model_class_name]:
+			del _tokenizers[key]
+
+
+def get_tokenizer(llm: BaseChatModel, characters_per_token: float = 3) -> Tokenizer:
+	"""Shared tokenizer for the model of llm, estimates from characters_per_token for unknown model families"""
+	class_name = llm.__class__.__name__
+	model_name = str(getattr(llm, 'model_name', None) or getattr(llm, 'model', None) or '')
+	key = (class_name, model_name, characters_per_token)
+	with _tokenizers_lock:
+		tokenizer = _tokenizers.get(key)
+		if tokenizer is None:
+			factory = _tokenizer_factories.get(class_name)
+			tokenizer = factory(llm, characters_per_token) if factory else Tokenizer(characters_per_token)
+			_tokenizers[key] = tokenizer
+		return tokenizer
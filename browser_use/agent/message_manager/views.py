@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
@@ -30,8 +31,56 @@ class MessageHistory(BaseModel):
 		self.messages.append(ManagedMessage(message=message, metadata=metadata))
 		self.total_tokens += metadata.input_tokens
 
+	def insert_message(self, index: int, message: BaseMessage, metadata: MessageMetadata) -> None:
+		"""Insert a message with metadata before index"""
+		self.messages.insert(index, ManagedMessage(message=message, metadata=metadata))
+		self.total_tokens += metadata.input_tokens
+
 	def remove_message(self, index: int = -1) -> None:
 		"""Remove last message from history"""
 		if self.messages:
 			msg = self.messages.pop(index)
 			self.total_tokens -= msg.metadata.input_tokens
+
+
+@dataclass
+class PageSnapshot:
+	"""Full element list of a page kept in the history, later state messages of the page only list the changes"""
+
+	url: str
+	lines: list[tuple[str, str]]
+	message: Optional[BaseMessage] = None
+
+
+@dataclass
+class ElementDelta:
+	"""Element lines of a page view that differ from an earlier view of the same page"""
+
+	added: list[str] = field(default_factory=list)
+	changed: list[str] = field(default_factory=list)
+	removed: list[str] = field(default_factory=list)
+
+	@property
+	def size(self) -> int:
+		return len(self.added) + len(self.changed) + len(self.removed)
+
+	@staticmethod
+	def between(old_lines: list[tuple[str, str]], new_lines: list[tuple[str, str]]) -> ElementDelta:
+		"""Compare (key, line) lists, lines with the same key are the same element or text"""
+		old = dict(_number_repeated_keys(old_lines))
+		new = dict(_number_repeated_keys(new_lines))
+		return ElementDelta(
+			added=[line for key, line in new.items() if key not in old],
+			changed=[line for key, line in new.items() if key in old and old[key] != line],
+			removed=[line for key, line in old.items() if key not in new],
+		)
+
+
+def _number_repeated_keys(lines: list[tuple[str, str]]) -> list[tuple[tuple[str, int], str]]:
+	# repeated texts like "Learn more" are told apart by their order on the page
+	seen: dict[str, int] = {}
+	numbered = []
+	for key, line in lines:
+		seen[key] = seen.get(key, 0) + 1
+		numbered.append(((key, seen[key]), line))
+	return numbered
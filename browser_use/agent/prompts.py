@@ -3,7 +3,9 @@ from typing import List, Optional
 
 from langchain_core.messages import HumanMessage, SystemMessage
 
+from browser_use.agent.message_manager.views import ElementDelta
 from browser_use.agent.views import ActionResult, AgentStepInfo
+from browser_use.agent.vision import VisionDecision
 from browser_use.browser.views import BrowserState
 
 
@@ -120,14 +122,15 @@ Notes:
 		Returns:
 		    str: Formatted system prompt
 		"""
-		time_str = self.current_date.strftime('%Y-%m-%d %H:%M')
+		# only the date, so the prompt stays byte-identical and cacheable by the provider across runs of a day
+		time_str = self.current_date.strftime('%Y-%m-%d')
 
 		AGENT_PROMPT = f"""You are a precise browser automation agent that interacts with websites through structured commands. Your role is to:
 1. Analyze the provided webpage elements and structure
 2. Plan a sequence of actions to accomplish the given task
 3. Respond with valid JSON containing your action sequence and state assessment
 
-Current date and time: {time_str}
+Current date: {time_str}
 
 {self.input_format()}
 
@@ -154,12 +157,18 @@ class AgentMessagePrompt:
 		include_attributes: list[str] = [],
 		max_error_length: int = 400,
 		step_info: Optional[AgentStepInfo] = None,
+		element_delta: Optional[ElementDelta] = None,
+		vision: Optional[VisionDecision] = None,
 	):
 		self.state = state
 		self.result = result
 		self.max_error_length = max_error_length
 		self.include_attributes = include_attributes
 		self.step_info = step_info
+		# when set, only the changes to the page snapshot earlier in the conversation are listed
+		self.element_delta = element_delta
+		# when set, decides which image is attached instead of the screenshot of the state
+		self.vision = vision
 
 	def get_user_message(self) -> HumanMessage:
 		if self.step_info:
@@ -167,7 +176,10 @@ class AgentMessagePrompt:
 		else:
 			step_info_description = ''
 
-		elements_text = self.state.element_tree.clickable_elements_to_string(include_attributes=self.include_attributes)
+		if self.element_delta is not None:
+			elements_text = self._element_delta_to_string(self.element_delta)
+		else:
+			elements_text = self.state.element_tree.clickable_elements_to_string(include_attributes=self.include_attributes)
 
 		has_content_above = (self.state.pixels_above or 0) > 0
 		has_content_below = (self.state.pixels_below or 0) > 0
@@ -193,7 +205,7 @@ class AgentMessagePrompt:
 Current url: {self.state.url}
 Available tabs:
 {self.state.tabs}
-Interactive elements from current page view:
+{'Changes to the interactive elements of the page snapshot above' if self.element_delta is not None else 'Interactive elements from current page view'}:
 {elements_text}
 """
 
@@ -206,16 +218,35 @@ Interactive elements from current page view:
 					error = result.error[-self.max_error_length :]
 					state_description += f'\nAction error {i + 1}/{len(self.result)}: ...{error}'
 
-		if self.state.screenshot:
+		screenshot = self.state.screenshot
+		image_url: dict = {}
+		if self.vision is not None:
+			screenshot = self.vision.screenshot
+			if self.vision.note:
+				state_description += f'\n{self.vision.note}'
+			if self.vision.detail != 'auto':
+				image_url['detail'] = self.vision.detail
+
+		if screenshot:
 			# Format message for vision model
 			return HumanMessage(
 				content=[
 					{'type': 'text', 'text': state_description},
 					{
 						'type': 'image_url',
-						'image_url': {'url': f'data:image/png;base64,{self.state.screenshot}'},
+						'image_url': {'url': f'data:image/{self.state.screenshot_format};base64,{screenshot}', **image_url},
 					},
 				]
 			)
 
 		return HumanMessage(content=state_description)
+
+	@staticmethod
+	def _element_delta_to_string(delta: ElementDelta) -> str:
+		if not delta.size:
+			return 'No changes, all elements of the snapshot are still there'
+		sections = ['Elements not listed are unchanged. Removed elements can not be used anymore.']
+		for title, lines in (('Added', delta.added), ('Changed', delta.changed), ('Removed', delta.removed)):
+			if lines:
+				sections.append(f'{title}:\n' + '\n'.join(lines))
+		return '\n'.join(sections)
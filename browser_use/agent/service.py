@@ -8,6 +8,7 @@ import logging
 import os
 import platform
 import textwrap
+import time
 import uuid
 from io import BytesIO
 from pathlib import Path
@@ -33,9 +34,12 @@ from browser_use.agent.views import (
 	AgentHistoryList,
 	AgentOutput,
 	AgentStepInfo,
+	StepMetadata,
 )
+from browser_use.agent.vision import SCREENSHOT_REQUEST_ACTION, VisionPolicy
 from browser_use.browser.browser import Browser
 from browser_use.browser.context import BrowserContext
+from browser_use.browser.pool import BrowserContextPool
 from browser_use.browser.views import BrowserState, BrowserStateHistory
 from browser_use.controller.registry.views import ActionModel
 from browser_use.controller.service import Controller
@@ -65,6 +69,7 @@ class Agent:
 		llm: BaseChatModel,
 		browser: Browser | None = None,
 		browser_context: BrowserContext | None = None,
+		browser_context_pool: BrowserContextPool | None = None,
 		controller: Controller = Controller(),
 		use_vision: bool = True,
 		save_conversation_path: Optional[str] = None,
@@ -96,11 +101,17 @@ class Agent:
 		register_new_step_callback: Callable[['BrowserState', 'AgentOutput', int], None] | None = None,
 		register_done_callback: Callable[['AgentHistoryList'], None] | None = None,
 		tool_calling_method: Optional[str] = 'auto',
+		max_history_steps: Optional[int] = None,
+		history_summary_llm: Optional[BaseChatModel] = None,
+		use_state_deltas: bool = False,
+		vision_policy: Optional[VisionPolicy] = None,
 	):
 		self.agent_id = str(uuid.uuid4())  # unique identifier for the agent
 
 		self.task = task
 		self.use_vision = use_vision
+		# decides per step whether the screenshot is sent, the default sends all of them
+		self.vision_policy = vision_policy or VisionPolicy()
 		self.llm = llm
 		self.save_conversation_path = save_conversation_path
 		self.save_conversation_path_encoding = save_conversation_path_encoding
@@ -111,19 +122,29 @@ class Agent:
 
 		# Controller setup
 		self.controller = controller
+		# actions of the controller this agent does not offer to the model, the controller may be shared with other agents
+		self.excluded_actions: list[str] = [] if self.use_vision and self.vision_policy.adaptive else [SCREENSHOT_REQUEST_ACTION]
 		self.max_actions_per_step = max_actions_per_step
 
 		# Browser setup
-		self.injected_browser = browser is not None
+		self.injected_browser = browser is not None or browser_context_pool is not None
 		self.injected_browser_context = browser_context is not None
+		self.browser_context_pool = browser_context_pool
 		self.message_context = message_context
 
+		if browser is None and browser_context_pool is not None:
+			browser = browser_context_pool.browser
+
 		# Initialize browser first if needed
 		self.browser = browser if browser is not None else (None if browser_context else Browser())
 
 		# Initialize browser context
+		self.browser_context: BrowserContext | None
 		if browser_context:
 			self.browser_context = browser_context
+		elif browser_context_pool:
+			# Acquired from the pool when the agent starts
+			self.browser_context = None
 		elif self.browser:
 			self.browser_context = BrowserContext(browser=self.browser, config=self.browser.config.new_context_config)
 		else:
@@ -148,13 +169,16 @@ class Agent:
 		self.message_manager = MessageManager(
 			llm=self.llm,
 			task=self.task,
-			action_descriptions=self.controller.registry.get_prompt_description(),
+			action_descriptions=self.controller.registry.get_prompt_description(self.excluded_actions),
 			system_prompt_class=self.system_prompt_class,
 			max_input_tokens=self.max_input_tokens,
 			include_attributes=self.include_attributes,
 			max_error_length=self.max_error_length,
 			max_actions_per_step=self.max_actions_per_step,
 			message_context=self.message_context,
+			max_history_steps=max_history_steps,
+			summary_llm=history_summary_llm,
+			state_deltas=use_state_deltas,
 		)
 
 		# Step callback
@@ -206,9 +230,30 @@ class Agent:
 	def _setup_action_models(self) -> None:
 		"""Setup dynamic action models from controller's registry"""
 		# Get the dynamic action model from controller's registry
-		self.ActionModel = self.controller.registry.create_action_model()
+		self.ActionModel = self.controller.registry.create_action_model(self.excluded_actions)
 		# Create output model with the dynamic actions
 		self.AgentOutput = AgentOutput.type_with_custom_actions(self.ActionModel)
+		self._registry_version = self.controller.registry.version
+		self._structured_llm = None
+
+	def _get_structured_llm(self):
+		"""
+		LLM bound to the output schema, built once per agent.
+
+		with_structured_output converts the schema of every action on each call, so it is only rebuilt when actions
+		were registered since the output model was created.
+		"""
+		if self._registry_version != self.controller.registry.version:
+			self._setup_action_models()
+
+		if self._structured_llm is None:
+			if self.tool_calling_method is None:
+				self._structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True)
+			else:
+				self._structured_llm = self.llm.with_structured_output(
+					self.AgentOutput, include_raw=True, method=self.tool_calling_method
+				)
+		return self._structured_llm
 
 	def set_tool_calling_method(self, tool_calling_method: Optional[str]) -> Optional[str]:
 		if tool_calling_method == 'auto':
@@ -228,19 +273,23 @@ class Agent:
 		state = None
 		model_output = None
 		result: list[ActionResult] = []
+		step_metadata = StepMetadata(step_number=self.n_steps, step_start_time=time.time())
 
 		try:
+			await self._acquire_browser_context()
 			state = await self.browser_context.get_state(use_vision=self.use_vision)
 
 			if self._stopped or self._paused:
 				logger.debug('Agent paused after getting state')
 				raise InterruptedError
 
-			self.message_manager.add_state_message(state, self._last_result, step_info)
+			vision = self.vision_policy.decide(state, self._last_result) if self.use_vision else None
+			step_metadata.vision_decision = vision.reason if vision else None
+			self.message_manager.add_state_message(state, self._last_result, step_info, vision=vision)
 			input_messages = self.message_manager.get_messages()
 
 			try:
-				model_output = await self.get_next_action(input_messages)
+				model_output = await self.get_next_action(input_messages, step_metadata)
 
 				if self.register_new_step_callback:
 					self.register_new_step_callback(state, model_output, self.n_steps)
@@ -258,7 +307,9 @@ class Agent:
 				self.message_manager._remove_last_state_message()
 				raise e
 
-			result: list[ActionResult] = await self.controller.multi_act(model_output.action, self.browser_context)
+			result: list[ActionResult] = await self.controller.multi_act(
+				model_output.action, self.browser_context, step_metadata=step_metadata
+			)
 			self._last_result = result
 
 			if len(result) > 0 and result[-1].is_done:
@@ -288,7 +339,23 @@ class Agent:
 				return
 
 			if state:
-				self._make_history_item(model_output, state, result)
+				step_metadata.step_end_time = time.time()
+				self._make_history_item(model_output, state, result, step_metadata)
+
+	async def _acquire_browser_context(self) -> None:
+		"""Take a ready browser context from the pool if the agent does not have one yet"""
+		if self.browser_context is None and self.browser_context_pool is not None:
+			self.browser_context = await self.browser_context_pool.acquire()
+
+	async def _release_browser_context(self) -> None:
+		"""Give the browser context back to the pool, or close it if the agent created it"""
+		if self.browser_context is None:
+			return
+		if self.browser_context_pool is not None:
+			await self.browser_context_pool.release(self.browser_context)
+			self.browser_context = None
+		elif not self.injected_browser_context:
+			await self.browser_context.close()
 
 	async def _handle_step_error(self, error: Exception) -> list[ActionResult]:
 		"""Handle all types of errors that can occur during a step"""
@@ -323,6 +390,7 @@ class Agent:
 		model_output: AgentOutput | None,
 		state: BrowserState,
 		result: list[ActionResult],
+		metadata: Optional[StepMetadata] = None,
 	) -> None:
 		"""Create and store history item"""
 		interacted_element = None
@@ -341,20 +409,26 @@ class Agent:
 			screenshot=state.screenshot,
 		)
 
-		history_item = AgentHistory(model_output=model_output, result=result, state=state_history)
+		history_item = AgentHistory(model_output=model_output, result=result, state=state_history, metadata=metadata)
 
 		self.history.history.append(history_item)
 
 	@time_execution_async('--get_next_action')
-	async def get_next_action(self, input_messages: list[BaseMessage]) -> AgentOutput:
+	async def get_next_action(
+		self, input_messages: list[BaseMessage], step_metadata: Optional[StepMetadata] = None
+	) -> AgentOutput:
 		"""Get next action from LLM based on current state"""
-		if self.tool_calling_method is None:
-			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True)
-		else:
-			structured_llm = self.llm.with_structured_output(self.AgentOutput, include_raw=True, method=self.tool_calling_method)
+		structured_llm = self._get_structured_llm()
+
+		try:
+			response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
+		except NotImplementedError:
+			# sync only clients would block the event loop, and with it all other agents
+			response = await asyncio.to_thread(structured_llm.invoke, input_messages)  # type: ignore
 
-		# response: dict[str, Any] = await structured_llm.ainvoke(input_messages)  # type: ignore
-		response: dict[str, Any] = structured_llm.invoke(input_messages)
+		if step_metadata is not None:
+			self._record_token_usage(response.get('raw'), step_metadata)
+			self.message_manager.reconcile_input_tokens(step_metadata.input_tokens)
 
 		parsed: AgentOutput | None = response['parsed']
 		if parsed is None:
@@ -382,6 +456,18 @@ class Agent:
 		for i, action in enumerate(response.action):
 			logger.info(f'🛠️  Action {i + 1}/{len(response.action)}: {action.model_dump_json(exclude_unset=True)}')
 
+	def _record_token_usage(self, raw_response: Any, step_metadata: StepMetadata) -> None:
+		"""Store the input tokens reported by the provider, split by whether they came from its prompt cache"""
+		usage = getattr(raw_response, 'usage_metadata', None)
+		if not usage:
+			return
+		step_metadata.input_tokens = usage.get('input_tokens', 0)
+		step_metadata.cached_input_tokens = (usage.get('input_token_details') or {}).get('cache_read', 0)
+		logger.debug(
+			f'Input tokens: {step_metadata.input_tokens} ({step_metadata.cached_input_tokens} cached, '
+			f'{step_metadata.uncached_input_tokens} uncached)'
+		)
+
 	def _save_conversation(self, input_messages: list[BaseMessage], response: Any) -> None:
 		"""Save conversation history to file if path is specified"""
 		if not self.save_conversation_path:
@@ -444,6 +530,8 @@ class Agent:
 		try:
 			self._log_agent_run()
 
+			await self._acquire_browser_context()
+
 			# Execute initial actions if provided
 			if self.initial_actions:
 				result = await self.controller.multi_act(self.initial_actions, self.browser_context, check_for_new_elements=False)
@@ -473,6 +561,11 @@ class Agent:
 
 			return self.history
 		finally:
+			if self.use_vision:
+				stats = self.vision_policy.stats
+				logger.info(
+					f'🖼️ Screenshots sent: {stats.images_sent} ({stats.images_cropped} cropped), left out: {stats.images_skipped}'
+				)
 			self.telemetry.capture(
 				AgentEndTelemetryEvent(
 					agent_id=self.agent_id,
@@ -483,8 +576,8 @@ class Agent:
 				)
 			)
 
-			if not self.injected_browser_context:
-				await self.browser_context.close()
+			await self.message_manager.close()
+			await self._release_browser_context()
 
 			if not self.injected_browser and self.browser:
 				await self.browser.close()
@@ -528,7 +621,7 @@ class Agent:
 			f' example: {{"is_valid": false, "reason": "The user wanted to search for "cat photos", but the agent searched for "dog photos" instead."}}'
 		)
 
-		if self.browser_context.session:
+		if self.browser_context and self.browser_context.session:
 			state = await self.browser_context.get_state(use_vision=self.use_vision)
 			content = AgentMessagePrompt(
 				state=state,
@@ -577,38 +670,44 @@ class Agent:
 		        List of action results
 		"""
 		results = []
+		try:
+			await self._acquire_browser_context()
+
+			for i, history_item in enumerate(history.history):
+				goal = history_item.model_output.current_state.next_goal if history_item.model_output else ''
+				logger.info(f'Replaying step {i + 1}/{len(history.history)}: goal: {goal}')
+
+				if (
+					not history_item.model_output
+					or not history_item.model_output.action
+					or history_item.model_output.action == [None]
+				):
+					logger.warning(f'Step {i + 1}: No action to replay, skipping')
+					results.append(ActionResult(error='No action to replay'))
+					continue
 
-		for i, history_item in enumerate(history.history):
-			goal = history_item.model_output.current_state.next_goal if history_item.model_output else ''
-			logger.info(f'Replaying step {i + 1}/{len(history.history)}: goal: {goal}')
-
-			if (
-				not history_item.model_output
-				or not history_item.model_output.action
-				or history_item.model_output.action == [None]
-			):
-				logger.warning(f'Step {i + 1}: No action to replay, skipping')
-				results.append(ActionResult(error='No action to replay'))
-				continue
-
-			retry_count = 0
-			while retry_count < max_retries:
-				try:
-					result = await self._execute_history_step(history_item, delay_between_actions)
-					results.extend(result)
-					break
-
-				except Exception as e:
-					retry_count += 1
-					if retry_count == max_retries:
-						error_msg = f'Step {i + 1} failed after {max_retries} attempts: {str(e)}'
-						logger.error(error_msg)
-						if not skip_failures:
-							results.append(ActionResult(error=error_msg))
-							raise RuntimeError(error_msg)
-					else:
-						logger.warning(f'Step {i + 1} failed (attempt {retry_count}/{max_retries}), retrying...')
-						await asyncio.sleep(delay_between_actions)
+				retry_count = 0
+				while retry_count < max_retries:
+					try:
+						result = await self._execute_history_step(history_item, delay_between_actions)
+						results.extend(result)
+						break
+
+					except Exception as e:
+						retry_count += 1
+						if retry_count == max_retries:
+							error_msg = f'Step {i + 1} failed after {max_retries} attempts: {str(e)}'
+							logger.error(error_msg)
+							if not skip_failures:
+								results.append(ActionResult(error=error_msg))
+								raise RuntimeError(error_msg)
+						else:
+							logger.warning(f'Step {i + 1} failed (attempt {retry_count}/{max_retries}), retrying...')
+							await asyncio.sleep(delay_between_actions)
+		finally:
+			# only a pooled context is given back, the agent's own context stays open for the caller
+			if self.browser_context_pool is not None:
+				await self._release_browser_context()
 
 		return results
 
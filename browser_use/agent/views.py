@@ -2,7 +2,8 @@ from __future__ import annotations
 
 import json
 import traceback
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Optional, Type
 
@@ -10,7 +11,7 @@ from openai import RateLimitError
 from pydantic import BaseModel, ConfigDict, Field, ValidationError, create_model
 
 from browser_use.browser.views import BrowserStateHistory
-from browser_use.controller.registry.views import ActionModel
+from browser_use.controller.registry.views import ACTION_MODEL_CACHE_SIZE, ActionModel
 from browser_use.dom.history_tree_processor.service import (
 	DOMElementNode,
 	DOMHistoryElement,
@@ -32,6 +33,51 @@ class ActionResult(BaseModel):
 	extracted_content: Optional[str] = None
 	error: Optional[str] = None
 	include_in_memory: bool = False  # whether to include in past messages as context or not
+	screenshot_requested: bool = False  # attach the screenshot to the next state, even if the vision policy would not
+
+
+@dataclass
+class VisionStats:
+	"""Screenshots of a run that were sent to the model or left out by the vision policy"""
+
+	images_sent: int = 0
+	images_cropped: int = 0
+	images_skipped: int = 0
+	# decisions by reason, e.g. {'navigation': 2, 'unchanged': 5}
+	reasons: dict[str, int] = field(default_factory=dict)
+
+	def record(self, reason: str, sent: bool, cropped: bool = False) -> None:
+		if sent:
+			self.images_sent += 1
+			self.images_cropped += int(cropped)
+		else:
+			self.images_skipped += 1
+		self.reasons[reason] = self.reasons.get(reason, 0) + 1
+
+
+class StepMetadata(BaseModel):
+	"""Metrics of one agent step"""
+
+	step_number: int
+	step_start_time: float
+	step_end_time: float = 0.0
+	# seconds waited for the page to settle after each action but the last
+	settle_times: list[float] = Field(default_factory=list)
+	# input tokens of the model call as reported by the provider, and how many of them were read from its prompt cache
+	input_tokens: int = 0
+	cached_input_tokens: int = 0
+	# why the vision policy sent, cropped or left out the screenshot
+	vision_decision: Optional[str] = None
+
+	@property
+	def duration_seconds(self) -> float:
+		"""Duration of the step in seconds"""
+		return self.step_end_time - self.step_start_time
+
+	@property
+	def uncached_input_tokens(self) -> int:
+		"""Input tokens the provider had to process without its prompt cache"""
+		return self.input_tokens - self.cached_input_tokens
 
 
 class AgentBrain(BaseModel):
@@ -54,8 +100,9 @@ class AgentOutput(BaseModel):
 	action: list[ActionModel]
 
 	@staticmethod
+	@lru_cache(maxsize=ACTION_MODEL_CACHE_SIZE)
 	def type_with_custom_actions(custom_actions: Type[ActionModel]) -> Type['AgentOutput']:
-		"""Extend actions with custom actions"""
+		"""Extend actions with custom actions, the output model is created once per action model"""
 		return create_model(
 			'AgentOutput',
 			__base__=AgentOutput,
@@ -70,6 +117,7 @@ class AgentHistory(BaseModel):
 	model_output: AgentOutput | None
 	result: list[ActionResult]
 	state: BrowserStateHistory
+	metadata: Optional[StepMetadata] = None
 
 	model_config = ConfigDict(arbitrary_types_allowed=True, protected_namespaces=())
 
@@ -105,6 +153,7 @@ class AgentHistory(BaseModel):
 			'model_output': model_output_dump,
 			'result': [r.model_dump(exclude_none=True) for r in self.result],
 			'state': self.state.to_dict(),
+			'metadata': self.metadata.model_dump() if self.metadata else None,
 		}
 
 
@@ -240,6 +289,14 @@ class AgentHistoryList(BaseModel):
 			content.extend([r.extracted_content for r in h.result if r.extracted_content])
 		return content
 
+	def total_input_tokens(self) -> int:
+		"""Input tokens of all model calls as reported by the provider"""
+		return sum(h.metadata.input_tokens for h in self.history if h.metadata)
+
+	def total_cached_input_tokens(self) -> int:
+		"""Input tokens of all model calls that were read from the prompt cache of the provider"""
+		return sum(h.metadata.cached_input_tokens for h in self.history if h.metadata)
+
 	def model_actions_filtered(self, include: list[str] = []) -> list[dict]:
 		"""Get all model actions from history as JSON"""
 		outputs = self.model_actions()
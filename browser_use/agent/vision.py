@@ -0,0 +1,201 @@
+"""
+Policies that decide per step whether the state message carries the screenshot.
+
+VisionPolicy sends every screenshot in full. AdaptiveVisionPolicy only sends it when it adds information to what the
+model has already seen:
+
+	agent = Agent(task=task, llm=llm, vision_policy=AdaptiveVisionPolicy())
+
+The screenshot is still taken every step, for the diff and for the history, only the message to the model changes.
+"""
+
+import base64
+import logging
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Literal, Optional
+
+from PIL import Image, ImageChops
+
+from browser_use.agent.views import ActionResult, VisionStats
+from browser_use.browser.views import BrowserState
+from browser_use.dom.views import DOMBaseNode, DOMElementNode
+
+logger = logging.getLogger(__name__)
+
+ImageDetail = Literal['low', 'high', 'auto']
+
+# Screenshots are compared on a small grayscale grid, pixels that differ by more than the threshold count as changed
+DIFF_GRID_SIZE = (64, 64)
+DIFF_PIXEL_THRESHOLD = 16
+
+# Elements whose content the element list can not describe, and the number of images that makes a page image heavy
+VISUAL_TAGS = frozenset({'canvas', 'video'})
+IMAGE_HEAVY_COUNT = 10
+
+PIL_FORMATS = {'png': 'PNG', 'jpeg': 'JPEG', 'webp': 'WEBP'}
+
+# Controller action the model calls to get the screenshot of the next step, only offered by adaptive policies
+SCREENSHOT_REQUEST_ACTION = 'request_screenshot'
+
+
+@dataclass
+class VisionDecision:
+	"""What the state message of a step shows of the screenshot"""
+
+	# reason of the decision, e.g. 'navigation' or 'unchanged', counted in VisionStats.reasons
+	reason: str
+	# base64 image to attach, the full screenshot or a crop of it, None to leave it out
+	screenshot: Optional[str] = None
+	detail: ImageDetail = 'auto'
+	cropped: bool = False
+	# tells the model what the image shows or why there is none
+	note: Optional[str] = None
+
+
+class VisionPolicy:
+	"""Sends every screenshot in full, base class of the policies"""
+
+	# whether the policy can leave screenshots out, then the model is offered the request_screenshot action
+	adaptive: bool = False
+
+	def __init__(self):
+		self.stats = VisionStats()
+
+	def decide(self, state: BrowserState, last_result: Optional[list[ActionResult]] = None) -> VisionDecision:
+		"""Decide for the state of this step and record the decision in the stats"""
+		decision = self._decide(state, last_result or [])
+		if state.screenshot:
+			self.stats.record(decision.reason, sent=decision.screenshot is not None, cropped=decision.cropped)
+			logger.debug(f'Screenshot {"sent" if decision.screenshot else "left out"}: {decision.reason}')
+		return decision
+
+	def _decide(self, state: BrowserState, last_result: list[ActionResult]) -> VisionDecision:
+		return VisionDecision(reason='always', screenshot=state.screenshot)
+
+
+class AdaptiveVisionPolicy(VisionPolicy):
+	"""
+	Sends the screenshot only when it shows something new.
+
+	In order: without a screenshot nothing is sent. A screenshot requested by the model, the first one and one after
+	navigation or a failed action are sent in full. After max_steps_without_image steps without an image a low detail
+	one is sent. Otherwise the screenshot is compared with the last one sent: below min_change (fraction of changed
+	pixels) it is left out. If canvas or video elements or many images are on the page it is sent in full, and if the
+	change fits in max_crop_area (fraction of the screenshot) only the changed region is sent.
+	"""
+
+	adaptive = True
+
+	def __init__(
+		self,
+		min_change: float = 0.01,
+		max_crop_area: float = 0.25,
+		max_steps_without_image: int = 5,
+		crop_padding: float = 0.05,
+	):
+		super().__init__()
+		self.min_change = min_change
+		self.max_crop_area = max_crop_area
+		self.max_steps_without_image = max_steps_without_image
+		self.crop_padding = crop_padding
+		self._last_url: Optional[str] = None
+		self._reference: Optional[Image.Image] = None
+		self._steps_without_image = 0
+
+	def _decide(self, state: BrowserState, last_result: list[ActionResult]) -> VisionDecision:
+		if not state.screenshot:
+			return VisionDecision(reason='no_screenshot')
+
+		navigated = state.url != self._last_url
+		self._last_url = state.url
+		current = _diff_image(state.screenshot)
+
+		if any(r.screenshot_requested for r in last_result):
+			return self._send(current, VisionDecision(reason='requested', screenshot=state.screenshot, detail='high'))
+		if navigated or self._reference is None:
+			return self._send(current, VisionDecision(reason='navigation', screenshot=state.screenshot))
+		if any(r.error for r in last_result):
+			return self._send(current, VisionDecision(reason='action_failed', screenshot=state.screenshot, detail='high'))
+		if self._steps_without_image >= self.max_steps_without_image:
+			return self._send(current, VisionDecision(reason='refresh', screenshot=state.screenshot, detail='low'))
+
+		changed, box = _visual_diff(self._reference, current)
+		if changed < self.min_change or box is None:
+			self._steps_without_image += 1
+			return VisionDecision(
+				reason='unchanged',
+				note='No screenshot this step, the page looks the same as in the last one. '
+				'Use request_screenshot if you need to see it.',
+			)
+		if _has_visual_content(state.element_tree):
+			return self._send(current, VisionDecision(reason='visual_content', screenshot=state.screenshot, detail='high'))
+
+		left, top, right, bottom = box
+		if (right - left) * (bottom - top) <= self.max_crop_area:
+			crop = _crop(state.screenshot, box, self.crop_padding, state.screenshot_format)
+			return self._send(
+				current,
+				VisionDecision(
+					reason='changed_region',
+					screenshot=crop,
+					detail='high',
+					cropped=True,
+					note='The screenshot only shows the part of the page that changed since the last one.',
+				),
+			)
+		return self._send(current, VisionDecision(reason='changed', screenshot=state.screenshot))
+
+	def _send(self, current: Image.Image, decision: VisionDecision) -> VisionDecision:
+		# what the model has seen now, later screenshots are compared against it
+		self._reference = current
+		self._steps_without_image = 0
+		return decision
+
+
+def _diff_image(screenshot: str) -> Image.Image:
+	image = Image.open(BytesIO(base64.b64decode(screenshot)))
+	return image.convert('L').resize(DIFF_GRID_SIZE)
+
+
+def _visual_diff(reference: Image.Image, current: Image.Image) -> tuple[float, Optional[tuple[float, float, float, float]]]:
+	"""Fraction of changed pixels and their bounding box as fractions of the image size"""
+	changed = ImageChops.difference(reference, current).point(lambda p: 255 if p > DIFF_PIXEL_THRESHOLD else 0)
+	box = changed.getbbox()
+	if box is None:
+		return 0.0, None
+	width, height = DIFF_GRID_SIZE
+	fraction = changed.histogram()[255] / (width * height)
+	return fraction, (box[0] / width, box[1] / height, box[2] / width, box[3] / height)
+
+
+def _crop(screenshot: str, box: tuple[float, float, float, float], padding: float, screenshot_format: str) -> str:
+	image = Image.open(BytesIO(base64.b64decode(screenshot)))
+	left, top, right, bottom = box
+	crop_box = (
+		int(max(0.0, left - padding) * image.width),
+		int(max(0.0, top - padding) * image.height),
+		int(min(1.0, right + padding) * image.width),
+		int(min(1.0, bottom + padding) * image.height),
+	)
+	buffer = BytesIO()
+	image.crop(crop_box).save(buffer, format=PIL_FORMATS.get(screenshot_format, 'PNG'))
+	return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+
+def _has_visual_content(element_tree: DOMElementNode) -> bool:
+	images = 0
+	stack: list[DOMBaseNode] = [element_tree]
+	while stack:
+		node = stack.pop()
+		if not isinstance(node, DOMElementNode):
+			continue
+		if node.is_visible:
+			if node.tag_name in VISUAL_TAGS:
+				return True
+			if node.tag_name == 'img':
+				images += 1
+				if images >= IMAGE_HEAVY_COUNT:
+					return True
+		stack.extend(node.children)
+	return False
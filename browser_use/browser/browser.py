@@ -4,6 +4,7 @@ Playwright browser on steroids.
 
 import asyncio
 import logging
+import weakref
 from dataclasses import dataclass, field
 
 from playwright._impl._api_structures import ProxySettings
@@ -17,6 +18,16 @@ from browser_use.browser.context import BrowserContext, BrowserContextConfig
 
 logger = logging.getLogger(__name__)
 
+# Skip GPU compositing and threaded animation work, only used in headless mode
+LOW_RENDER_COST_CHROMIUM_ARGS = [
+	'--disable-gpu',
+	'--disable-gpu-compositing',
+	'--disable-smooth-scrolling',
+	'--disable-threaded-animation',
+	'--disable-threaded-scrolling',
+	'--disable-checker-imaging',
+]
+
 
 @dataclass
 class BrowserConfig:
@@ -42,6 +53,15 @@ class BrowserConfig:
 		chrome_instance_path: None
 			Path to a Chrome instance to use to connect to your normal browser
 			e.g. '/Applications/GoogleChrome.app/Contents/MacOS/GoogleChrome'
+
+		share_playwright: False
+			Share one Playwright driver process with all other Browser instances of this event loop that also set it.
+			Each Browser still gets its own browser process.
+
+		disable_gpu_compositing: False
+			Pass Chromium flags that skip GPU compositing work. Only applied in headless mode.
+
+	Use BrowserConfig.low_render_cost() for a headless preset that minimises renderer work for agents without vision.
 	"""
 
 	headless: bool = False
@@ -54,6 +74,53 @@ class BrowserConfig:
 	proxy: ProxySettings | None = field(default=None)
 	new_context_config: BrowserContextConfig = field(default_factory=BrowserContextConfig)
 
+	disable_gpu_compositing: bool = False
+	share_playwright: bool = False
+
+	@classmethod
+	def low_render_cost(cls, **kwargs) -> 'BrowserConfig':
+		"""Headless preset without GPU compositing whose contexts use BrowserContextConfig.low_render_cost()"""
+		preset = {
+			'headless': True,
+			'disable_gpu_compositing': True,
+			'new_context_config': BrowserContextConfig.low_render_cost(),
+		}
+		preset.update(kwargs)
+		return cls(**preset)
+
+
+# Playwright drivers shared by Browsers with share_playwright=True, one per event loop
+_shared_playwright: dict[asyncio.AbstractEventLoop, Playwright] = {}
+_shared_playwright_users: dict[asyncio.AbstractEventLoop, int] = {}
+# kept for the lifetime of the loop, a lock replaced while tasks wait on it would let two of them start a driver
+_shared_playwright_locks: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock] = weakref.WeakKeyDictionary()
+
+
+async def _acquire_shared_playwright() -> Playwright:
+	"""Get the shared Playwright driver of the running event loop, starting it on first use"""
+	loop = asyncio.get_running_loop()
+	lock = _shared_playwright_locks.setdefault(loop, asyncio.Lock())
+	async with lock:
+		if loop not in _shared_playwright:
+			_shared_playwright[loop] = await async_playwright().start()
+		_shared_playwright_users[loop] = _shared_playwright_users.get(loop, 0) + 1
+		return _shared_playwright[loop]
+
+
+async def _release_shared_playwright() -> None:
+	"""Release the shared Playwright driver of the running event loop, stopping it when the last user is gone"""
+	loop = asyncio.get_running_loop()
+	lock = _shared_playwright_locks.setdefault(loop, asyncio.Lock())
+	async with lock:
+		users = _shared_playwright_users.get(loop, 0) - 1
+		if users > 0:
+			_shared_playwright_users[loop] = users
+			return
+		_shared_playwright_users.pop(loop, None)
+		playwright = _shared_playwright.pop(loop, None)
+		if playwright:
+			await playwright.stop()
+
 
 # @singleton: TODO - think about id singleton makes sense here
 # @dev By default this is a singleton, but you can create multiple instances if you need to.
@@ -73,6 +140,8 @@ class Browser:
 		self.config = config
 		self.playwright: Playwright | None = None
 		self.playwright_browser: PlaywrightBrowser | None = None
+		# Many contexts can ask for the browser at the same time, only the first one launches it
+		self._init_lock = asyncio.Lock()
 
 		self.disable_security_args = []
 		if self.config.disable_security:
@@ -91,20 +160,36 @@ class Browser:
 	async def get_playwright_browser(self) -> PlaywrightBrowser:
 		"""Get a browser context"""
 		if self.playwright_browser is None:
-			return await self._init()
+			async with self._init_lock:
+				if self.playwright_browser is None:
+					return await self._init()
 
 		return self.playwright_browser
 
 	async def _init(self):
 		"""Initialize the browser session"""
-		playwright = await async_playwright().start()
-		browser = await self._setup_browser(playwright)
+		if self.config.share_playwright:
+			playwright = await _acquire_shared_playwright()
+		else:
+			playwright = await async_playwright().start()
+
+		try:
+			browser = await self._setup_browser(playwright)
+		except Exception:
+			await self._stop_playwright(playwright)
+			raise
 
 		self.playwright = playwright
 		self.playwright_browser = browser
 
 		return self.playwright_browser
 
+	async def _stop_playwright(self, playwright: Playwright) -> None:
+		if self.config.share_playwright:
+			await _release_shared_playwright()
+		else:
+			await playwright.stop()
+
 	async def _setup_cdp(self, playwright: Playwright) -> PlaywrightBrowser:
 		"""Sets up and returns a Playwright Browser instance with anti-detection measures."""
 		if not self.config.cdp_url:
@@ -167,6 +252,10 @@ class Browser:
 
 	async def _setup_standard_browser(self, playwright: Playwright) -> PlaywrightBrowser:
 		"""Sets up and returns a Playwright Browser instance with anti-detection measures."""
+		render_args = []
+		if self.config.disable_gpu_compositing and self.config.headless:
+			render_args = LOW_RENDER_COST_CHROMIUM_ARGS
+
 		browser = await playwright.chromium.launch(
 			headless=self.config.headless,
 			args=[
@@ -186,6 +275,7 @@ class Browser:
 				# '--window-size=1280,1000',
 			]
 			+ self.disable_security_args
+			+ render_args
 			+ self.config.extra_chromium_args,
 			proxy=self.config.proxy,
 		)
@@ -213,7 +303,7 @@ class Browser:
 			if self.playwright_browser:
 				await self.playwright_browser.close()
 			if self.playwright:
-				await self.playwright.stop()
+				await self._stop_playwright(self.playwright)
 		except Exception as e:
 			logger.debug(f'Failed to close browser properly: {e}')
 		finally:
@@ -11,7 +11,9 @@ import re
 import time
 import uuid
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Optional, TypedDict
+from io import BytesIO
+from typing import TYPE_CHECKING, Literal, Optional, TypedDict
+from urllib.parse import urlparse
 
 from playwright.async_api import Browser as PlaywrightBrowser
 from playwright.async_api import (
@@ -19,11 +21,21 @@ from playwright.async_api import (
 )
 from playwright.async_api import (
 	ElementHandle,
+	Frame,
 	FrameLocator,
 	Page,
+	Request,
+	Route,
 )
 
-from browser_use.browser.views import BrowserError, BrowserState, TabInfo, URLNotAllowedError
+from browser_use.browser.views import (
+	BrowserError,
+	BrowserState,
+	FormFieldResult,
+	ResourceBlockingStats,
+	TabInfo,
+	URLNotAllowedError,
+)
 from browser_use.dom.service import DomService
 from browser_use.dom.views import DOMElementNode, SelectorMap
 from browser_use.utils import time_execution_sync
@@ -33,12 +45,402 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Third party hosts an agent never needs to make a decision, subdomains are blocked too
+BLOCKABLE_HOSTS = {
+	# Analytics and tracking
+	'google-analytics.com',
+	'googletagmanager.com',
+	'segment.io',
+	'segment.com',
+	'mixpanel.com',
+	'amplitude.com',
+	'hotjar.com',
+	'fullstory.com',
+	'clarity.ms',
+	'scorecardresearch.com',
+	# Ad-related
+	'doubleclick.net',
+	'googlesyndication.com',
+	'googleadservices.com',
+	'amazon-adsystem.com',
+	'adnxs.com',
+	'criteo.com',
+	'taboola.com',
+	'outbrain.com',
+	# Social media widgets
+	'connect.facebook.net',
+	'platform.twitter.com',
+	'platform.linkedin.com',
+	# Live chat and support
+	'livechatinc.com',
+	'zdassets.com',
+	'intercom.io',
+	'intercomcdn.com',
+	'crisp.chat',
+	# Push notifications
+	'onesignal.com',
+	'pushwoosh.com',
+}
+
+# Patterns that are not waited for when checking if the network is idle
+IGNORED_URL_PATTERNS = {
+	# Analytics and tracking
+	'analytics',
+	'tracking',
+	'telemetry',
+	'beacon',
+	'metrics',
+	# Ad-related
+	'doubleclick',
+	'adsystem',
+	'adserver',
+	'advertising',
+	# Social media widgets
+	'facebook.com/plugins',
+	'platform.twitter',
+	'linkedin.com/embed',
+	# Live chat and support
+	'livechat',
+	'zendesk',
+	'intercom',
+	'crisp.chat',
+	'hotjar',
+	# Push notifications
+	'push-notifications',
+	'onesignal',
+	'pushwoosh',
+	# Background sync/heartbeat
+	'heartbeat',
+	'ping',
+	'alive',
+	# WebRTC and streaming
+	'webrtc',
+	'rtmp://',
+	'wss://',
+	# Common CDNs for dynamic content
+	'cloudfront.net',
+	'fastly.net',
+}
+
+# Stops CSS animations and transitions, injected when disable_animations is enabled
+DISABLE_ANIMATIONS_SCRIPT = """
+(() => {
+	const inject = () => {
+		const style = document.createElement('style');
+		style.id = 'browser-use-disable-animations';
+		style.textContent = `*, *::before, *::after {
+			animation: none !important;
+			transition: none !important;
+			scroll-behavior: auto !important;
+			caret-color: transparent !important;
+		}`;
+		(document.head || document.documentElement).appendChild(style);
+	};
+	if (document.documentElement) {
+		inject();
+	} else {
+		document.addEventListener('DOMContentLoaded', inject, { once: true });
+	}
+})();
+"""
+
+# Transparent 1x1 gif, served instead of blocked images when a placeholder is requested
+TRANSPARENT_PIXEL_GIF = base64.b64decode('R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7')
+
+
+def _matches_host(hostname: str | None, hosts: list[str]) -> bool:
+	"""Whether hostname is one of hosts or a subdomain of one"""
+	if not hostname:
+		return False
+	hostname = hostname.lower()
+	return any(hostname == host.lower() or hostname.endswith('.' + host.lower()) for host in hosts)
+
+
+def _in_iframe(element: DOMElementNode) -> bool:
+	"""Whether the element is inside an iframe, and so in another document than the page"""
+	parent = element.parent
+	while parent is not None:
+		if parent.tag_name == 'iframe':
+			return True
+		parent = parent.parent
+	return False
+
+
+def _is_detached_error(error: Exception) -> bool:
+	"""Whether a Playwright error was raised because the element was removed from the page"""
+	message = str(error).lower()
+	return 'not attached' in message or 'detached' in message
+
+
+def _hosts_url_pattern(hosts: list[str]) -> re.Pattern:
+	"""URL pattern of requests to hosts or their subdomains, matched by Playwright before a request reaches Python"""
+	alternatives = '|'.join(re.escape(host.lower()) for host in hosts)
+	return re.compile(rf'^[a-z][a-z0-9+.-]*://([^/?#@]*@)?([^/?#]*\.)?({alternatives})(:\d+)?([/?#]|$)', re.IGNORECASE)
+
+
+# Resource types a page is waiting for after an action, see wait_for_dom_settle
+SETTLE_RESOURCE_TYPES = {'document', 'xhr', 'fetch'}
+
+# Milliseconds since the last DOM mutation, the observer is installed on the first call in every document
+DOM_QUIET_TIME_SCRIPT = """
+() => {
+	if (!window.__browserUseMutations) {
+		const mutations = { last: performance.now() };
+		new MutationObserver(() => { mutations.last = performance.now(); }).observe(document, {
+			childList: true, subtree: true, attributes: true, characterData: true
+		});
+		window.__browserUseMutations = mutations;
+	}
+	return performance.now() - window.__browserUseMutations.last;
+}
+"""
+
+# Valid class names in CSS selectors
+VALID_CLASS_NAME_PATTERN = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_-]*$')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Attributes that are stable and useful for building a selector of an element
+SAFE_SELECTOR_ATTRIBUTES = frozenset(
+	{
+		# Standard HTML attributes
+		'id',
+		'name',
+		'type',
+		'value',
+		'placeholder',
+		# Accessibility attributes
+		'aria-label',
+		'aria-labelledby',
+		'aria-describedby',
+		'role',
+		# Common form attributes
+		'for',
+		'autocomplete',
+		'required',
+		'readonly',
+		# Media attributes
+		'alt',
+		'title',
+		'src',
+		# Data attributes (if they're stable in your application)
+		'data-testid',
+		'data-id',
+		'data-qa',
+		'data-cy',
+		# Custom stable attributes (add any application-specific ones)
+		'href',
+		'target',
+	}
+)
+
+# Removes the highlight container and the highlight attributes from one document
+REMOVE_HIGHLIGHTS_SCRIPT = """
+try {
+	// Remove the highlight container and all its contents
+	const container = document.getElementById('playwright-highlight-container');
+	if (container) {
+		container.remove();
+	}
+
+	// Remove highlight attributes from elements
+	const highlightedElements = document.querySelectorAll('[browser-user-highlight-id^="playwright-highlight-"]');
+	highlightedElements.forEach(el => {
+		el.removeAttribute('browser-user-highlight-id');
+	});
+} catch (e) {
+	console.error('Failed to remove highlights:', e);
+}
+"""
+
+# Draws the highlight of a single element in its own document, same look as the highlights of buildDomTree.js
+FOCUS_HIGHLIGHT_SCRIPT = """
+(element, index) => {
+	const doc = element.ownerDocument;
+	const win = doc.defaultView;
+	doc.getElementById('playwright-highlight-container')?.remove();
+
+	const colors = [
+		'#FF0000', '#00FF00', '#0000FF', '#FFA500',
+		'#800080', '#008080', '#FF69B4', '#4B0082',
+		'#FF4500', '#2E8B57', '#DC143C', '#4682B4'
+	];
+	const baseColor = colors[index % colors.length];
+	const rect = element.getBoundingClientRect();
+	const top = rect.top + win.scrollY;
+	const left = rect.left + win.scrollX;
+
+	const container = doc.createElement('div');
+	container.id = 'playwright-highlight-container';
+	container.style.cssText = 'position: absolute; pointer-events: none; top: 0; left: 0; width: 100%; height: 100%;'
+		+ ' z-index: 2147483647;';
+
+	const overlay = doc.createElement('div');
+	overlay.style.cssText = `position: absolute; pointer-events: none; box-sizing: border-box; border: 2px solid ${baseColor};
+		background-color: ${baseColor}1A; top: ${top}px; left: ${left}px;
+		width: ${rect.width}px; height: ${rect.height}px;`;
+
+	const label = doc.createElement('div');
+	label.className = 'playwright-highlight-label';
+	label.style.cssText = `position: absolute; background: ${baseColor}; color: white; padding: 1px 4px; border-radius: 4px;
+		font-size: ${Math.min(12, Math.max(8, rect.height / 2))}px; top: ${top + 2}px;
+		left: ${Math.max(left, left + rect.width - 22)}px;`;
+	label.textContent = index;
+
+	container.appendChild(overlay);
+	container.appendChild(label);
+	(doc.body || doc.documentElement).appendChild(container);
+}
+"""
+
+# Sets the value of one form field and fires the events a user interaction would
+FILL_FORM_FIELD_SCRIPT = """
+(element, value) => {
+	const tag = element.tagName.toLowerCase();
+	const type = (element.getAttribute('type') || '').toLowerCase();
+	const dispatch = (...names) => names.forEach(name => element.dispatchEvent(new Event(name, { bubbles: true })));
+
+	if (element.disabled || element.readOnly) {
+		return { success: false, message: 'field is disabled or read only' };
+	}
+
+	if (tag === 'select') {
+		const options = Array.from(element.options);
+		const option = options.find(o => o.text === value)
+			|| options.find(o => o.text.trim() === value.trim())
+			|| options.find(o => o.value === value);
+		if (!option) {
+			const available = options.map(o => JSON.stringify(o.text.trim())).join(', ');
+			return { success: false, message: `option "${value}" not found, options are: ${available}` };
+		}
+		element.value = option.value;
+		dispatch('input', 'change');
+		return { success: true, message: `selected "${option.text.trim()}"` };
+	}
+
+	if (tag === 'input' && (type === 'checkbox' || type === 'radio')) {
+		const checked = !['false', 'no', 'off', '0', 'unchecked', ''].includes(value.trim().toLowerCase());
+		if (type === 'radio' && !checked) {
+			return { success: false, message: 'a radio button can only be checked, check another option instead' };
+		}
+		// a click fires the same events as a user and respects handlers that cancel it
+		if (element.checked !== checked) element.click();
+		return { success: element.checked === checked, message: element.checked ? 'checked' : 'unchecked' };
+	}
+
+	if (tag === 'input' || tag === 'textarea') {
+		element.focus();
+		// the native setter keeps frameworks like React in sync with the new value
+		const setter = Object.getOwnPropertyDescriptor(Object.getPrototypeOf(element), 'value')?.set;
+		if (setter) {
+			setter.call(element, value);
+		} else {
+			element.value = value;
+		}
+		dispatch('input', 'change');
+		element.blur();
+		return { success: true, message: `entered ${JSON.stringify(value)}` };
+	}
+
+	if (element.isContentEditable) {
+		element.focus();
+		element.textContent = value;
+		dispatch('input');
+		element.blur();
+		return { success: true, message: `entered ${JSON.stringify(value)}` };
+	}
+
+	return { success: false, message: `<${tag}> is not a form field` };
+}
+"""
+
+# Fills several fields of the last DOM extraction in one evaluation, unresolved fields are returned as null
+FILL_FORM_BATCH_SCRIPT = """
+([extractionId, fields]) => {
+	const fillField = FILL_FORM_FIELD;
+	const extraction = window.__browserUseElements;
+	return fields.map(([index, value]) => {
+		if (!extraction || extraction.extractionId !== extractionId) return null;
+		const element = extraction.elements.get(index);
+		if (!element || !element.isConnected) return null;
+		try {
+			return fillField(element, value);
+		} catch (e) {
+			return { success: false, message: e.toString() };
+		}
+	});
+}
+""".replace('FILL_FORM_FIELD', FILL_FORM_FIELD_SCRIPT.strip())
+
+# Resolves a highlight index of the last DOM extraction to its element, registered by buildDomTree.js
+LOCATE_EXTRACTED_ELEMENT_SCRIPT = """
+([extractionId, index]) => {
+	const extraction = window.__browserUseElements;
+	if (!extraction || extraction.extractionId !== extractionId) return null;
+	const element = extraction.elements.get(index);
+	return element && element.isConnected ? element : null;
+}
+"""
+
+
+# How text is entered into a field:
+# 'fill' sets the value in one call, 'insert_text' inserts it with one CDP Input.insertText (contenteditable),
+# 'type' sends one key event per character for widgets that react to keys (autocomplete, masks),
+# 'auto' picks one of them from the element
+TextInputStrategy = Literal['auto', 'fill', 'insert_text', 'type']
+
+# Strategies tried when a strategy fails, per-character typing works on every focusable element
+TEXT_INPUT_FALLBACKS: dict[str, list[str]] = {
+	'fill': ['fill', 'type'],
+	'insert_text': ['insert_text', 'type'],
+	'type': ['type'],
+}
+
+# Input types that accept text through fill
+FILLABLE_INPUT_TYPES = {
+	'',
+	'text',
+	'search',
+	'email',
+	'url',
+	'tel',
+	'password',
+	'number',
+	'date',
+	'time',
+	'datetime-local',
+	'month',
+	'week',
+}
+
+# Selects the contents of an element so that inserted text replaces them
+SELECT_ELEMENT_CONTENTS_SCRIPT = """
+(element) => {
+	element.focus();
+	if (typeof element.select === 'function') {
+		element.select();
+		return;
+	}
+	const selection = element.ownerDocument.getSelection();
+	const range = element.ownerDocument.createRange();
+	range.selectNodeContents(element);
+	selection.removeAllRanges();
+	selection.addRange(range);
+}
+"""
+
 
 class BrowserContextWindowSize(TypedDict):
 	width: int
 	height: int
 
 
+class ScreenshotClip(TypedDict):
+	x: int
+	y: int
+	width: int
+	height: int
+
+
 @dataclass
 class BrowserContextConfig:
 	"""
@@ -62,7 +464,11 @@ class BrowserContextConfig:
 			Maximum time to wait for page load before proceeding anyway
 
 		wait_between_actions: 1.0
-			Time to wait between multiple per step actions
+			Maximum time to wait for the page to settle between multiple per step actions
+
+		dom_settle_time: 0.25
+			The page counts as settled between actions once there were no DOM mutations for this long and no document,
+			XHR or fetch request is in flight
 
 		browser_window_size: {
 				'width': 1280,
@@ -90,9 +496,68 @@ class BrowserContextConfig:
 		viewport_expansion: 500
 			Viewport expansion in pixels. This amount will increase the number of elements which are included in the state what the LLM will see. If set to -1, all elements will be included (this leads to high token usage). If set to 0, only the elements which are visible in the viewport will be included.
 
+		stable_highlight_indices: True
+			Elements keep their highlight index across steps while the page is not navigated, new elements get fresh
+			indices. If False, indices follow the DOM order of every extraction and BrowserState.index_mapping maps
+			the indices of the last extraction to the new ones.
+
 		allowed_domains: None
 			List of allowed domains that can be accessed. If None, all domains are allowed.
 			Example: ['example.com', 'api.example.com']
+
+		screenshot_format: 'png'
+			Image codec for vision screenshots: 'png', 'jpeg' or 'webp'. Lossy codecs are much smaller to store and upload.
+
+		screenshot_quality: None
+			Quality (0-100) for 'jpeg' and 'webp' screenshots. If None, the codec default is used.
+
+		screenshot_max_dimension: None
+			Downscale screenshots so that their longest side is at most this many pixels. If None, keep the captured size.
+
+		screenshot_css_scale: True
+			Capture screenshots in CSS pixels instead of device pixels, so high device scale factors do not inflate the image.
+
+		screenshot_clip: None
+			Only capture this region of the viewport, e.g. {'x': 0, 'y': 0, 'width': 1280, 'height': 800}.
+
+		block_resources: False
+			Abort requests matching blocked_resource_types or blocked_hosts at the network layer. Pages are never blocked,
+			frames only when they are loaded from a blocked host.
+			Playwright turns off the HTTP cache of a context that routes requests, so pages re-download their scripts
+			and styles. With blocked_resource_types every request also passes through Python, with only blocked_hosts
+			just the requests to those hosts do.
+
+		blocked_resource_types: ['image', 'font', 'media']
+			Playwright resource types to block when block_resources is enabled. Empty to only block hosts.
+
+		blocked_hosts: BLOCKABLE_HOSTS
+			Hosts whose requests are blocked when block_resources is enabled, including their subdomains
+			(ads, analytics, chat widgets, ...).
+
+		blocked_image_placeholder: None
+			Answer blocked images with a transparent 1x1 image instead of aborting them, so screenshots keep the layout
+			of the page and show no broken image icons. If None, placeholders are used while the context takes
+			screenshots for vision.
+
+		device_scale_factor: None
+			Device scale factor of the context. If None, the Playwright default (1) is used.
+
+		reduced_motion: False
+			Emulate prefers-reduced-motion, so well behaved pages skip their animations.
+
+		disable_animations: False
+			Inject a stylesheet that turns off all CSS animations and transitions.
+
+		text_input_strategy: 'auto'
+			How input_text enters text: 'fill' sets the value at once, 'insert_text' uses a single CDP Input.insertText
+			(made for contenteditable), 'type' sends one key event per character (needed by autocomplete widgets), 'auto'
+			picks from the element. Failing strategies fall back to 'type'.
+
+		text_input_overrides: {}
+			Per-field strategies, keyed by CSS selector, e.g. {'#address': 'type'}. The first matching selector wins over
+			text_input_strategy.
+
+	Use BrowserContextConfig.low_render_cost() for a preset that minimises renderer work for agents without vision.
 	"""
 
 	cookies_file: str | None = None
@@ -100,6 +565,7 @@ class BrowserContextConfig:
 	wait_for_network_idle_page_load_time: float = 1
 	maximum_wait_page_load_time: float = 5
 	wait_between_actions: float = 1
+	dom_settle_time: float = 0.25
 	apply_click_styling: bool = False
 	apply_form_related: bool = False
 
@@ -117,8 +583,39 @@ class BrowserContextConfig:
 
 	highlight_elements: bool = True
 	viewport_expansion: int = 500
+	stable_highlight_indices: bool = True
 	allowed_domains: list[str] | None = None
 
+	screenshot_format: Literal['png', 'jpeg', 'webp'] = 'png'
+	screenshot_quality: int | None = None
+	screenshot_max_dimension: int | None = None
+	screenshot_css_scale: bool = True
+	screenshot_clip: ScreenshotClip | None = None
+
+	block_resources: bool = False
+	blocked_resource_types: list[str] = field(default_factory=lambda: ['image', 'font', 'media'])
+	blocked_hosts: list[str] = field(default_factory=lambda: sorted(BLOCKABLE_HOSTS))
+	blocked_image_placeholder: bool | None = None
+
+	device_scale_factor: float | None = None
+	reduced_motion: bool = False
+	disable_animations: bool = False
+
+	text_input_strategy: TextInputStrategy = 'auto'
+	text_input_overrides: dict[str, TextInputStrategy] = field(default_factory=dict)
+
+	@classmethod
+	def low_render_cost(cls, **kwargs) -> 'BrowserContextConfig':
+		"""Preset for agents without vision: small viewport, scale factor 1, no animations or transitions"""
+		preset = {
+			'browser_window_size': {'width': 1024, 'height': 768},
+			'device_scale_factor': 1,
+			'reduced_motion': True,
+			'disable_animations': True,
+		}
+		preset.update(kwargs)
+		return cls(**preset)
+
 
 @dataclass
 class BrowserSession:
@@ -138,6 +635,17 @@ class BrowserContext:
 
 		self.config = config
 		self.browser = browser
+		self.resource_blocking_stats = ResourceBlockingStats()
+
+		# Document, XHR and fetch requests of the context that have not finished yet
+		self._inflight_requests: set[Request] = set()
+
+		# Element handles by (extraction id, highlight index), valid until the next DOM extraction
+		self._element_handle_cache: dict[tuple[str, int | None], ElementHandle] = {}
+		# Whether the last state had a screenshot, blocked images get placeholders then unless configured otherwise
+		self._screenshots_enabled = True
+		# Frames other than the main frame that hold a focus highlight, the only ones that have to be cleared besides it
+		self._highlighted_frames: set[Frame] = set()
 
 		# Initialize these as None - they'll be set up when needed
 		self.session: BrowserSession | None = None
@@ -161,6 +669,8 @@ class BrowserContext:
 				return
 
 			await self.save_cookies()
+			self._element_handle_cache.clear()
+			self._highlighted_frames.clear()
 
 			if self.config.trace_path:
 				try:
@@ -195,6 +705,7 @@ class BrowserContext:
 
 		context = await self._create_context(playwright_browser)
 		self._add_new_page_listener(context)
+		self._add_request_tracking(context)
 
 		if len(context.pages) > 0:
 			page = context.pages[0]
@@ -202,7 +713,16 @@ class BrowserContext:
 			page = await context.new_page()
 
 		# Instead of calling _update_state(), create an empty initial state
-		initial_state = BrowserState(
+		self.session = BrowserSession(
+			context=context,
+			current_page=page,
+			cached_state=self._get_initial_state(page),
+		)
+		return self.session
+
+	def _get_initial_state(self, page: Page) -> BrowserState:
+		"""Empty state for a page that has not been extracted yet"""
+		return BrowserState(
 			element_tree=DOMElementNode(
 				tag_name='root',
 				is_visible=True,
@@ -220,13 +740,6 @@ class BrowserContext:
 			pixels_below=0,
 		)
 
-		self.session = BrowserSession(
-			context=context,
-			current_page=page,
-			cached_state=initial_state,
-		)
-		return self.session
-
 	def _add_new_page_listener(self, context: PlaywrightBrowserContext):
 		async def on_page(page: Page):
 			await page.wait_for_load_state()
@@ -236,6 +749,51 @@ class BrowserContext:
 
 		context.on('page', on_page)
 
+	def _add_request_tracking(self, context: PlaywrightBrowserContext):
+		"""Keep track of the requests wait_for_dom_settle waits for"""
+
+		def on_request(request: Request):
+			if request.resource_type in SETTLE_RESOURCE_TYPES and not any(
+				pattern in request.url.lower() for pattern in IGNORED_URL_PATTERNS
+			):
+				self._inflight_requests.add(request)
+
+		def on_request_done(request: Request):
+			self._inflight_requests.discard(request)
+
+		context.on('request', on_request)
+		context.on('requestfinished', on_request_done)
+		context.on('requestfailed', on_request_done)
+
+	async def wait_for_dom_settle(self, timeout: float | None = None) -> float:
+		"""
+		Wait until the page settled after an action: no DOM mutations for dom_settle_time and no document, XHR or fetch
+		request in flight, at most `timeout` seconds (wait_between_actions by default). Returns the time waited in seconds.
+		"""
+		timeout = self.config.wait_between_actions if timeout is None else timeout
+		quiet_time = self.config.dom_settle_time
+		start_time = time.time()
+
+		while True:
+			elapsed = time.time() - start_time
+			if elapsed >= timeout:
+				logger.debug(f'Page did not settle within {timeout:.2f}s ({len(self._inflight_requests)} requests in flight)')
+				break
+
+			try:
+				page = await self.get_current_page()
+				dom_quiet_time = await page.evaluate(DOM_QUIET_TIME_SCRIPT) / 1000
+			except Exception:
+				# the document is being replaced, e.g. by a navigation
+				dom_quiet_time = 0
+
+			if dom_quiet_time >= quiet_time and not self._inflight_requests:
+				break
+
+			await asyncio.sleep(min(max(quiet_time - dom_quiet_time, 0.05), timeout - elapsed))
+
+		return time.time() - start_time
+
 	async def get_session(self) -> BrowserSession:
 		"""Lazy initialization of the browser and related components"""
 		if self.session is None:
@@ -266,11 +824,16 @@ class BrowserContext:
 				record_video_dir=self.config.save_recording_path,
 				record_video_size=self.config.browser_window_size,
 				locale=self.config.locale,
+				device_scale_factor=self.config.device_scale_factor,
+				reduced_motion='reduce' if self.config.reduced_motion else None,
 			)
 
 		if self.config.trace_path:
 			await context.tracing.start(screenshots=True, snapshots=True, sources=True)
 
+		if self.config.block_resources:
+			await self._install_resource_blocking(context)
+
 		# Load cookies if they exist
 		if self.config.cookies_file and os.path.exists(self.config.cookies_file):
 			with open(self.config.cookies_file, 'r') as f:
@@ -315,8 +878,53 @@ class BrowserContext:
 			"""
 		)
 
+		if self.config.disable_animations:
+			await context.add_init_script(DISABLE_ANIMATIONS_SCRIPT)
+
 		return context
 
+	async def _install_resource_blocking(self, context: PlaywrightBrowserContext) -> None:
+		"""Route the requests that may be blocked, Playwright does not intercept requests that match no route"""
+		if self.config.blocked_resource_types:
+			# resource types are only known per request, so every request is routed
+			await context.route('**/*', self._route_blocked_resources)
+		elif self.config.blocked_hosts:
+			await context.route(_hosts_url_pattern(self.config.blocked_hosts), self._route_blocked_resources)
+
+	def _should_block_request(self, request: Request) -> bool:
+		"""Check if a request matches the resource blocking configuration"""
+		url = request.url.lower()
+		if url.startswith(('data:', 'blob:')):
+			return False
+
+		# Playwright reports frame loads as documents too: never block the page itself, only frames of blocked hosts
+		if request.resource_type == 'document':
+			return request.frame.parent_frame is not None and _matches_host(urlparse(url).hostname, self.config.blocked_hosts)
+
+		if request.resource_type in self.config.blocked_resource_types:
+			return True
+		return _matches_host(urlparse(url).hostname, self.config.blocked_hosts)
+
+	async def _route_blocked_resources(self, route: Route) -> None:
+		"""Route handler that aborts blocked requests and lets everything else through"""
+		request = route.request
+		if not self._should_block_request(request):
+			await route.fallback()
+			return
+
+		self.resource_blocking_stats.record(request.resource_type)
+		try:
+			placeholder = self.config.blocked_image_placeholder
+			if placeholder is None:
+				placeholder = self._screenshots_enabled
+			if request.resource_type == 'image' and placeholder:
+				await route.fulfill(status=200, content_type='image/gif', body=TRANSPARENT_PIXEL_GIF)
+			else:
+				await route.abort('blockedbyclient')
+		except Exception as e:
+			# The page may have navigated away or been closed in the meantime
+			logger.debug(f'Failed to block request {request.url}: {e}')
+
 	async def _wait_for_stable_network(self):
 		page = await self.get_current_page()
 
@@ -342,46 +950,6 @@ class BrowserContext:
 			'application/json',
 		}
 
-		# Additional patterns to filter out
-		IGNORED_URL_PATTERNS = {
-			# Analytics and tracking
-			'analytics',
-			'tracking',
-			'telemetry',
-			'beacon',
-			'metrics',
-			# Ad-related
-			'doubleclick',
-			'adsystem',
-			'adserver',
-			'advertising',
-			# Social media widgets
-			'facebook.com/plugins',
-			'platform.twitter',
-			'linkedin.com/embed',
-			# Live chat and support
-			'livechat',
-			'zendesk',
-			'intercom',
-			'crisp.chat',
-			'hotjar',
-			# Push notifications
-			'push-notifications',
-			'onesignal',
-			'pushwoosh',
-			# Background sync/heartbeat
-			'heartbeat',
-			'ping',
-			'alive',
-			# WebRTC and streaming
-			'webrtc',
-			'rtmp://',
-			'wss://',
-			# Common CDNs for dynamic content
-			'cloudfront.net',
-			'fastly.net',
-		}
-
 		async def on_request(request):
 			# Filter by resource type
 			if request.resource_type not in RELEVANT_RESOURCE_TYPES:
@@ -460,9 +1028,14 @@ class BrowserContext:
 			last_activity = asyncio.get_event_loop().time()
 			# logger.debug(f'Request resolved: {request.url} ({content_type})')
 
+		async def on_request_failed(request):
+			# Failed and blocked requests never get a response
+			pending_requests.discard(request)
+
 		# Attach event listeners
 		page.on('request', on_request)
 		page.on('response', on_response)
+		page.on('requestfailed', on_request_failed)
 
 		try:
 			# Wait for idle time
@@ -483,6 +1056,7 @@ class BrowserContext:
 			# Clean up event listeners
 			page.remove_listener('request', on_request)
 			page.remove_listener('response', on_response)
+			page.remove_listener('requestfailed', on_request_failed)
 
 		logger.debug(f'Network stabilized for {self.config.wait_for_network_idle_page_load_time} seconds')
 
@@ -612,9 +1186,11 @@ class BrowserContext:
 	@time_execution_sync('--get_state')  # This decorator might need to be updated to handle async
 	async def get_state(self, use_vision: bool = False) -> BrowserState:
 		"""Get the current state of the browser"""
+		self._screenshots_enabled = use_vision
 		await self._wait_for_page_and_frames_load()
 		session = await self.get_session()
 		session.cached_state = await self._update_state(use_vision=use_vision)
+		await self._clear_element_handle_cache()
 
 		# Save cookies if a file is specified
 		if self.config.cookies_file:
@@ -651,6 +1227,7 @@ class BrowserContext:
 				highlight_elements=self.config.highlight_elements,
 				apply_click_styling=self.config.apply_click_styling,
 				apply_form_related=self.config.apply_form_related,
+				stable_indices=self.config.stable_highlight_indices,
 			)
 
 			screenshot_b64 = None
@@ -665,8 +1242,17 @@ class BrowserContext:
 				title=await page.title(),
 				tabs=await self.get_tabs_info(),
 				screenshot=screenshot_b64,
+				screenshot_format=self.config.screenshot_format,
 				pixels_above=pixels_above,
 				pixels_below=pixels_below,
+				# stable indices do not change, so there is nothing to map
+				index_mapping={}
+				if self.config.stable_highlight_indices
+				else {
+					node.previous_highlight_index: index
+					for index, node in content.selector_map.items()
+					if node.previous_highlight_index is not None
+				},
 			)
 
 			return self.current_state
@@ -677,56 +1263,96 @@ class BrowserContext:
 				return self.current_state
 			raise
 
+	async def get_interactive_branch_path_hashes(self) -> list[str] | None:
+		"""
+		Branch path hashes of the interactive elements on the current page, a cheap check whether they changed since the
+		last get_state. Returns None if the page can not be checked, e.g. while it is navigating.
+		"""
+		try:
+			page = await self.get_current_page()
+			dom_service = DomService(page)
+			return await dom_service.get_interactive_branch_path_hashes(viewport_expansion=self.config.viewport_expansion)
+		except Exception as e:
+			logger.debug(f'Failed to check interactive elements: {str(e)}')
+			return None
+
 	# region - Browser Actions
 
 	async def take_screenshot(self, full_page: bool = False) -> str:
 		"""
-		Returns a base64 encoded screenshot of the current page.
+		Returns a base64 encoded screenshot of the current page, encoded and sized according to the context config.
 		"""
 		page = await self.get_current_page()
 
+		# Playwright only encodes png and jpeg natively, webp is converted afterwards
+		capture_type = 'jpeg' if self.config.screenshot_format == 'jpeg' else 'png'
+		options = {}
+		if capture_type == 'jpeg' and self.config.screenshot_quality is not None:
+			options['quality'] = self.config.screenshot_quality
+		if self.config.screenshot_clip and not full_page:
+			options['clip'] = self.config.screenshot_clip
+
 		screenshot = await page.screenshot(
 			full_page=full_page,
 			animations='disabled',
+			type=capture_type,
+			scale='css' if self.config.screenshot_css_scale else 'device',
+			**options,
 		)
 
+		screenshot = self._postprocess_screenshot(screenshot)
 		screenshot_b64 = base64.b64encode(screenshot).decode('utf-8')
 
 		# await self.remove_highlights()
 
 		return screenshot_b64
 
+	def _postprocess_screenshot(self, screenshot: bytes) -> bytes:
+		"""Downscale and re-encode a captured screenshot if the config asks for it"""
+		max_dimension = self.config.screenshot_max_dimension
+		if self.config.screenshot_format != 'webp' and max_dimension is None:
+			return screenshot
+
+		from PIL import Image
+
+		image = Image.open(BytesIO(screenshot))
+		needs_resize = max_dimension is not None and max(image.size) > max_dimension
+		if not needs_resize and self.config.screenshot_format != 'webp':
+			return screenshot
+
+		if needs_resize:
+			image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+
+		save_options = {}
+		if self.config.screenshot_format in ('jpeg', 'webp') and self.config.screenshot_quality is not None:
+			save_options['quality'] = self.config.screenshot_quality
+		if self.config.screenshot_format == 'jpeg' and image.mode not in ('RGB', 'L'):
+			image = image.convert('RGB')
+
+		output = BytesIO()
+		image.save(output, format=self.config.screenshot_format.upper(), **save_options)
+		return output.getvalue()
+
 	async def remove_highlights(self):
 		"""
-		Removes all highlight overlays and labels created by the highlightElement function.
-		Handles cases where the page might be closed or inaccessible.
+		Removes all highlight overlays and labels created by the highlightElement function, in the main frame and in the
+		frames that got a focus highlight. Handles cases where the page might be closed or inaccessible.
 		"""
 		try:
 			page = await self.get_current_page()
-			await page.evaluate(
-				"""
-                try {
-                    // Remove the highlight container and all its contents
-                    const container = document.getElementById('playwright-highlight-container');
-                    if (container) {
-                        container.remove();
-                    }
-
-                    // Remove highlight attributes from elements
-                    const highlightedElements = document.querySelectorAll('[browser-user-highlight-id^="playwright-highlight-"]');
-                    highlightedElements.forEach(el => {
-                        el.removeAttribute('browser-user-highlight-id');
-                    });
-                } catch (e) {
-                    console.error('Failed to remove highlights:', e);
-                }
-                """
-			)
+			await self._remove_frame_highlights([page.main_frame, *self._highlighted_frames])
 		except Exception as e:
 			logger.debug(f'Failed to remove highlights (this is usually ok): {str(e)}')
 			# Don't raise the error since this is not critical functionality
 			pass
 
+	async def _remove_frame_highlights(self, frames: list[Frame]) -> None:
+		results = await asyncio.gather(*[frame.evaluate(REMOVE_HIGHLIGHTS_SCRIPT) for frame in frames], return_exceptions=True)
+		for frame, result in zip(frames, results):
+			self._highlighted_frames.discard(frame)
+			if isinstance(result, Exception):
+				logger.debug(f'Failed to remove highlights from a frame (this is usually ok): {str(result)}')
+
 	# endregion
 
 	# region - User Actions
@@ -793,9 +1419,6 @@ class BrowserContext:
 
 			# Handle class attributes
 			if 'class' in element.attributes and element.attributes['class']:
-				# Define a regex pattern for valid class names in CSS
-				valid_class_name_pattern = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_-]*$')
-
 				# Iterate through the class attribute values
 				classes = element.attributes['class'].split()
 				for class_name in classes:
@@ -804,45 +1427,13 @@ class BrowserContext:
 						continue
 
 					# Check if the class name is valid
-					if valid_class_name_pattern.match(class_name):
+					if VALID_CLASS_NAME_PATTERN.match(class_name):
 						# Append the valid class name to the CSS selector
 						css_selector += f'.{class_name}'
 					else:
 						# Skip invalid class names
 						continue
 
-			# Expanded set of safe attributes that are stable and useful for selection
-			SAFE_ATTRIBUTES = {
-				# Standard HTML attributes
-				'id',
-				'name',
-				'type',
-				'value',
-				'placeholder',
-				# Accessibility attributes
-				'aria-label',
-				'aria-labelledby',
-				'aria-describedby',
-				'role',
-				# Common form attributes
-				'for',
-				'autocomplete',
-				'required',
-				'readonly',
-				# Media attributes
-				'alt',
-				'title',
-				'src',
-				# Data attributes (if they're stable in your application)
-				'data-testid',
-				'data-id',
-				'data-qa',
-				'data-cy',
-				# Custom stable attributes (add any application-specific ones)
-				'href',
-				'target',
-			}
-
 			# Handle other attributes
 			for attribute, value in element.attributes.items():
 				if attribute == 'class':
@@ -852,7 +1443,7 @@ class BrowserContext:
 				if not attribute.strip():
 					continue
 
-				if attribute not in SAFE_ATTRIBUTES:
+				if attribute not in SAFE_SELECTOR_ATTRIBUTES:
 					continue
 
 				# Escape special characters in attribute names
@@ -864,7 +1455,7 @@ class BrowserContext:
 				elif any(char in value for char in '"\'<>`\n\r\t'):
 					# Use contains for values with special characters
 					# Regex-substitute *any* whitespace with a single space, then strip.
-					collapsed_value = re.sub(r'\s+', ' ', value).strip()
+					collapsed_value = WHITESPACE_PATTERN.sub(' ', value).strip()
 					# Escape embedded double-quotes.
 					safe_value = collapsed_value.replace('"', '\\"')
 					css_selector += f'[{safe_attribute}*="{safe_value}"]'
@@ -879,6 +1470,59 @@ class BrowserContext:
 			return f"{tag_name}[highlight_index='{element.highlight_index}']"
 
 	async def get_locate_element(self, element: DOMElementNode) -> ElementHandle | None:
+		"""
+		Get the element handle of a DOM element.
+
+		Handles of indexed elements are cached until the next DOM extraction, so several actions on the same
+		element (or a lookup followed by an action) only locate it once.
+		"""
+		cache_key = self._element_handle_cache_key(element)
+		if cache_key is not None and cache_key in self._element_handle_cache:
+			cached_handle = self._element_handle_cache[cache_key]
+			try:
+				await cached_handle.scroll_into_view_if_needed()
+				return cached_handle
+			except Exception as e:
+				if not _is_detached_error(e):
+					logger.debug(f'Failed to scroll element into view: {str(e)}')
+					return cached_handle
+			# the page re-rendered the element since it was located, the handle points at a removed node
+			await self._evict_element_handle(element)
+
+		element_handle = await self._locate_element(element)
+		if cache_key is not None and element_handle is not None:
+			self._element_handle_cache[cache_key] = element_handle
+		return element_handle
+
+	@staticmethod
+	def _element_handle_cache_key(element: DOMElementNode) -> tuple[str, int | None] | None:
+		return (element.extraction_id, element.highlight_index) if element.extraction_id is not None else None
+
+	async def _evict_element_handle(self, element: DOMElementNode) -> None:
+		"""Drop the cached handle of an element, so the next lookup locates it again"""
+		cache_key = self._element_handle_cache_key(element)
+		handle = self._element_handle_cache.pop(cache_key, None) if cache_key is not None else None
+		if handle is not None:
+			await asyncio.gather(handle.dispose(), return_exceptions=True)
+
+	async def _clear_element_handle_cache(self) -> None:
+		"""Dispose the cached element handles of the previous DOM extraction"""
+		handles = list(self._element_handle_cache.values())
+		self._element_handle_cache.clear()
+		if handles:
+			await asyncio.gather(*[handle.dispose() for handle in handles], return_exceptions=True)
+
+	async def _locate_element(self, element: DOMElementNode) -> ElementHandle | None:
+		# Elements of the current extraction are resolved directly by their highlight index,
+		# the selector is only built when the page changed since the extraction or the element is in an iframe
+		element_handle = await self._locate_extracted_element(element)
+		if element_handle:
+			try:
+				await element_handle.scroll_into_view_if_needed()
+			except Exception as e:
+				logger.debug(f'Failed to scroll element into view: {str(e)}')
+			return element_handle
+
 		current_frame = await self.get_current_page()
 
 		# Start with the target element and collect all parents
@@ -913,26 +1557,186 @@ class BrowserContext:
 			logger.error(f'Failed to locate element: {str(e)}')
 			return None
 
-	async def _input_text_element_node(self, element_node: DOMElementNode, text: str):
+	async def _locate_extracted_element(self, element: DOMElementNode) -> ElementHandle | None:
+		"""Look up an element in the element map of the DOM extraction that indexed it"""
+		if element.extraction_id is None or element.highlight_index is None:
+			return None
+
+		page = await self.get_current_page()
 		try:
-			# Highlight before typing
-			if element_node.highlight_index is not None:
-				await self._update_state(focus_element=element_node.highlight_index)
+			js_handle = await page.evaluate_handle(
+				LOCATE_EXTRACTED_ELEMENT_SCRIPT, [element.extraction_id, element.highlight_index]
+			)
+		except Exception as e:
+			logger.debug(f'Failed to look up element {element.highlight_index} of extraction {element.extraction_id}: {str(e)}')
+			return None
 
+		element_handle = js_handle.as_element()
+		if element_handle is None:
+			await js_handle.dispose()
+		return element_handle
+
+	async def _highlight_focus_element(self, element_node: DOMElementNode, element: ElementHandle) -> None:
+		"""
+		Replace the highlights with one on the element that is about to be used.
+
+		Only draws an overlay on the already located element, the DOM is not extracted again and the cached state stays as is.
+		"""
+		if not self.config.highlight_elements or element_node.highlight_index is None:
+			return
+
+		try:
+			page = await self.get_current_page()
+			# the overlay script clears the document it draws in, only other highlighted frames are cleared here
+			if _in_iframe(element_node):
+				frame = await element.owner_frame() or page.main_frame
+				# the highlights of the extraction are drawn in the main document
+				stale_frames = [page.main_frame, *self._highlighted_frames]
+			else:
+				frame = page.main_frame
+				stale_frames = list(self._highlighted_frames)
+			await self._remove_frame_highlights([f for f in stale_frames if f is not frame])
+
+			await element.evaluate(FOCUS_HIGHLIGHT_SCRIPT, element_node.highlight_index)
+			if frame is not page.main_frame:
+				self._highlighted_frames.add(frame)
+		except Exception as e:
+			logger.debug(f'Failed to highlight element {element_node.highlight_index}: {str(e)}')
+
+	async def _input_text_element_node(
+		self, element_node: DOMElementNode, text: str, strategy: TextInputStrategy | None = None
+	) -> str:
+		"""
+		Enter text into an element, replacing its content. Returns the input strategy that was used.
+
+		The strategy is taken from the argument, the text_input_overrides of the config or text_input_strategy, in that order.
+		"""
+		try:
 			page = await self.get_current_page()
 			element = await self.get_locate_element(element_node)
 
 			if element is None:
 				raise Exception(f'Element: {repr(element_node)} not found')
 
+			# Highlight before typing
+			await self._highlight_focus_element(element_node, element)
+
 			await element.scroll_into_view_if_needed(timeout=2500)
-			await element.fill('')
-			await element.type(text)
+
+			strategy = strategy or await self._get_text_input_strategy(element)
+			if strategy == 'auto':
+				strategy = self._detect_text_input_strategy(element_node)
+
+			errors = []
+			for candidate in TEXT_INPUT_FALLBACKS[strategy]:
+				try:
+					await self._input_text_with_strategy(page, element, text, candidate)
+					break
+				except Exception as e:
+					logger.debug(f'Text input with {candidate} failed: {str(e)}')
+					errors.append(f'{candidate}: {str(e)}')
+			else:
+				raise Exception('; '.join(errors))
+
 			await page.wait_for_load_state()
+			return candidate
 
 		except Exception as e:
 			raise Exception(f'Failed to input text into element: {repr(element_node)}. Error: {str(e)}')
 
+	async def _get_text_input_strategy(self, element: ElementHandle) -> TextInputStrategy:
+		"""Strategy of the first override selector that matches the element, or the configured default"""
+		overrides = self.config.text_input_overrides
+		if overrides:
+			selectors = list(overrides)
+			try:
+				match = await element.evaluate(
+					'(element, selectors) => selectors.findIndex(selector => element.matches(selector))', selectors
+				)
+				if match >= 0:
+					return overrides[selectors[match]]
+			except Exception as e:
+				logger.debug(f'Failed to match text input overrides: {str(e)}')
+		return self.config.text_input_strategy
+
+	@staticmethod
+	def _detect_text_input_strategy(element_node: DOMElementNode) -> TextInputStrategy:
+		"""Pick an input strategy from the extracted attributes, without a round trip to the page"""
+		attributes = element_node.attributes
+
+		# widgets that suggest or format while typing need real key events
+		if (
+			attributes.get('role') == 'combobox'
+			or attributes.get('aria-autocomplete') in ('list', 'both', 'inline')
+			or 'list' in attributes
+			or attributes.get('aria-haspopup', 'false') != 'false'
+		):
+			return 'type'
+
+		if element_node.tag_name == 'textarea':
+			return 'fill'
+		if element_node.tag_name == 'input':
+			return 'fill' if attributes.get('type', '').lower() in FILLABLE_INPUT_TYPES else 'type'
+		if attributes.get('contenteditable', 'false').lower() != 'false':
+			return 'insert_text'
+		return 'type'
+
+	async def _input_text_with_strategy(self, page: Page, element: ElementHandle, text: str, strategy: str) -> None:
+		if strategy == 'fill':
+			await element.fill(text)
+		elif strategy == 'insert_text':
+			await element.evaluate(SELECT_ELEMENT_CONTENTS_SCRIPT)
+			cdp_session = await page.context.new_cdp_session(page)
+			try:
+				await cdp_session.send('Input.insertText', {'text': text})
+			finally:
+				await cdp_session.detach()
+			# elements in out of process iframes do not receive input from the page session
+			content = await element.evaluate('(element) => element.value ?? element.innerText')
+			if WHITESPACE_PATTERN.sub(' ', text).strip() not in WHITESPACE_PATTERN.sub(' ', content or ''):
+				raise Exception('text was not inserted')
+		else:
+			try:
+				await element.fill('')
+			except Exception:
+				# not fillable, the typed text replaces the selected content instead
+				await element.evaluate(SELECT_ELEMENT_CONTENTS_SCRIPT)
+			await element.type(text)
+
+	async def fill_form_fields(self, fields: list[tuple[DOMElementNode, str]]) -> list[FormFieldResult]:
+		"""
+		Fill several form fields (text inputs, textareas, selects, checkboxes, radios, contenteditable) at once.
+
+		Fields of the current extraction are filled in a single page evaluation. Fields that can not be resolved that way
+		(iframes, stale extraction) are located one by one. Values are set directly, so widgets that need key events
+		(autocomplete) should use _input_text_element_node instead.
+		"""
+		page = await self.get_current_page()
+
+		batch_results: list[dict | None] = [None] * len(fields)
+		extraction_id = next((node.extraction_id for node, _ in fields if node.extraction_id is not None), None)
+		if extraction_id is not None:
+			batch = [[node.highlight_index if node.extraction_id == extraction_id else -1, value] for node, value in fields]
+			try:
+				batch_results = await page.evaluate(FILL_FORM_BATCH_SCRIPT, [extraction_id, batch])
+			except Exception as e:
+				logger.debug(f'Batch form fill failed, filling fields one by one: {str(e)}')
+
+		results = []
+		for (node, value), result in zip(fields, batch_results):
+			if result is None:
+				try:
+					element = await self.get_locate_element(node)
+					if element is None:
+						raise Exception('element not found')
+					result = await element.evaluate(FILL_FORM_FIELD_SCRIPT, value)
+				except Exception as e:
+					result = {'success': False, 'message': str(e)}
+			results.append(FormFieldResult(index=node.highlight_index, success=result['success'], message=result['message']))  # type: ignore
+
+		await page.wait_for_load_state()
+		return results
+
 	async def _click_element_node(self, element_node: DOMElementNode):
 		"""
 		Optimized method to click an element using xpath.
@@ -940,15 +1744,14 @@ class BrowserContext:
 		page = await self.get_current_page()
 
 		try:
-			# Highlight before clicking
-			if element_node.highlight_index is not None:
-				await self._update_state(focus_element=element_node.highlight_index)
-
 			element = await self.get_locate_element(element_node)
 
 			if element is None:
 				raise Exception(f'Element: {repr(element_node)} not found')
 
+			# Highlight before clicking
+			await self._highlight_focus_element(element_node, element)
+
 			# await element.scroll_into_view_if_needed()
 
 			try:
@@ -958,9 +1761,17 @@ class BrowserContext:
 				await self._check_and_handle_navigation(page)
 			except URLNotAllowedError as e:
 				raise e
-			except Exception:
+			except Exception as click_error:
 				try:
-					await page.evaluate('(el) => el.click()', element)
+					if _is_detached_error(click_error):
+						# the cached handle points at a node the page removed, a JS click on it would do nothing
+						await self._evict_element_handle(element_node)
+						element = await self.get_locate_element(element_node)
+						if element is None:
+							raise Exception(f'Element: {repr(element_node)} not found')
+						await element.click(timeout=1500)
+					else:
+						await page.evaluate('(el) => el.click()', element)
 					await page.wait_for_load_state()
 					# Check if navigation occurred and if the new URL is allowed
 					await self._check_and_handle_navigation(page)
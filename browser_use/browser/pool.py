@@ -0,0 +1,346 @@
+"""
+Pools of pre-initialised browser contexts and of browser processes.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+
+from playwright.async_api import Browser as PlaywrightBrowser
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+
+logger = logging.getLogger(__name__)
+
+try:
+	import psutil
+
+	PSUTIL_AVAILABLE = True
+except ImportError:
+	PSUTIL_AVAILABLE = False
+
+
+@dataclass
+class BrowserContextPoolMetrics:
+	"""Counters of a BrowserContextPool"""
+
+	acquired: int = 0
+	hits: int = 0
+	misses: int = 0
+	total_wait_time: float = 0.0
+	max_wait_time: float = 0.0
+	reset: int = 0
+	recycled: int = 0
+
+	@property
+	def hit_rate(self) -> float:
+		"""Share of acquisitions served by an already initialised context"""
+		return self.hits / self.acquired if self.acquired else 0.0
+
+	@property
+	def average_wait_time(self) -> float:
+		"""Average time in seconds an acquisition waited for its context"""
+		return self.total_wait_time / self.acquired if self.acquired else 0.0
+
+
+class BrowserContextPool:
+	"""
+	Keeps a number of pre-initialised browser contexts, each with a blank page, ready to be handed out.
+
+	Context creation, init scripts, cookie loading and opening the first page happen in the background
+	instead of on the critical path of the first agent step.
+
+	On release a context is closed and replaced by a fresh one. With reset_on_release=True it is reset instead
+	(cookies, permissions and extra tabs are cleared, the page goes back to about:blank) and reused up to max_uses
+	times. A reset does not clear site storage, so only use it for agents that may share state.
+	"""
+
+	def __init__(
+		self,
+		browser: Browser,
+		size: int = 2,
+		config: BrowserContextConfig | None = None,
+		reset_on_release: bool = False,
+		max_uses: int = 10,
+	):
+		self.browser = browser
+		self.size = size
+		self.config = config or browser.config.new_context_config
+		self.reset_on_release = reset_on_release
+		self.max_uses = max_uses
+		self.metrics = BrowserContextPoolMetrics()
+
+		self._idle: list[BrowserContext] = []
+		self._uses: dict[str, int] = {}
+		self._pending = 0
+		self._tasks: set[asyncio.Task] = set()
+		self._closed = False
+
+	async def __aenter__(self):
+		await self.start()
+		return self
+
+	async def __aexit__(self, exc_type, exc_val, exc_tb):
+		await self.close()
+
+	async def start(self) -> None:
+		"""Fill the pool and wait until all contexts are ready"""
+		self._replenish()
+		if self._tasks:
+			await asyncio.gather(*self._tasks, return_exceptions=True)
+
+	async def acquire(self) -> BrowserContext:
+		"""Hand out a ready context, or create one if the pool is empty"""
+		if self._closed:
+			raise RuntimeError('BrowserContextPool is closed')
+
+		start_time = time.time()
+		context = self._pop_idle()
+		if context is not None:
+			self.metrics.hits += 1
+		else:
+			self.metrics.misses += 1
+			context = await self._create_context()
+
+		wait_time = time.time() - start_time
+		self.metrics.acquired += 1
+		self.metrics.total_wait_time += wait_time
+		self.metrics.max_wait_time = max(self.metrics.max_wait_time, wait_time)
+		self._uses[context.context_id] = self._uses.get(context.context_id, 0) + 1
+
+		self._replenish()
+		return context
+
+	async def release(self, context: BrowserContext) -> None:
+		"""Give a context back to the pool"""
+		uses = self._uses.get(context.context_id, 0)
+		if not self._closed and self.reset_on_release and uses < self.max_uses and len(self._idle) < self.size:
+			try:
+				await self._reset_context(context)
+				self._idle.append(context)
+				self.metrics.reset += 1
+				return
+			except Exception as e:
+				logger.debug(f'Failed to reset browser context, closing it instead: {e}')
+
+		self._uses.pop(context.context_id, None)
+		await context.close()
+		self.metrics.recycled += 1
+		if not self._closed:
+			self._replenish()
+
+	async def close(self) -> None:
+		"""Close all idle contexts and stop filling the pool. Contexts that are still acquired are not closed."""
+		self._closed = True
+		for task in list(self._tasks):
+			task.cancel()
+		await asyncio.gather(*self._tasks, return_exceptions=True)
+
+		idle, self._idle = self._idle, []
+		for context in idle:
+			self._uses.pop(context.context_id, None)
+			await context.close()
+
+	def _pop_idle(self) -> BrowserContext | None:
+		while self._idle:
+			context = self._idle.pop(0)
+			# skip contexts that were closed from the outside
+			if context.session is not None:
+				return context
+		return None
+
+	async def _create_context(self) -> BrowserContext:
+		context = BrowserContext(browser=self.browser, config=self.config)
+		# creates the playwright context, runs the init scripts, loads cookies and opens a blank page
+		await context.get_session()
+		return context
+
+	def _replenish(self) -> None:
+		"""Create contexts in the background until the pool is back to its size"""
+		missing = self.size - len(self._idle) - self._pending
+		for _ in range(missing):
+			self._pending += 1
+			task = asyncio.create_task(self._add_new_context())
+			self._tasks.add(task)
+			task.add_done_callback(self._tasks.discard)
+
+	async def _add_new_context(self) -> None:
+		try:
+			context = await self._create_context()
+			if self._closed:
+				await context.close()
+				return
+			self._idle.append(context)
+		except asyncio.CancelledError:
+			raise
+		except Exception as e:
+			logger.warning(f'Failed to pre-initialise browser context: {e}')
+		finally:
+			self._pending -= 1
+
+	async def _reset_context(self, context: BrowserContext) -> None:
+		session = await context.get_session()
+		await context.save_cookies()
+		await session.context.clear_cookies()
+		await session.context.clear_permissions()
+
+		pages = session.context.pages
+		for page in pages[1:]:
+			await page.close()
+		page = pages[0] if pages else await session.context.new_page()
+		await page.goto('about:blank')
+
+		session.current_page = page
+		session.cached_state = context._get_initial_state(page)
+		await context._clear_element_handle_cache()
+
+
+@dataclass
+class BrowserShardStats:
+	"""Load of one browser process of a BrowserPool"""
+
+	index: int
+	connected: bool
+	contexts: int
+	restarts: int
+	# CPU seconds used by all processes of the browser (browser, renderers, gpu, ...)
+	cpu_time: float | None = None
+	# Resident memory in bytes of all processes of the browser, only available with psutil installed
+	memory_rss: int | None = None
+
+
+class BrowserPool(Browser):
+	"""
+	Spreads browser contexts over several Chromium processes.
+
+	A BrowserPool can be used wherever a Browser is expected (Agent, BrowserContext, BrowserContextPool):
+	every context that is created picks the shard with the fewest open contexts. Shards that crash or
+	disconnect are restarted in the background, so one renderer crash only affects the contexts on that shard.
+	"""
+
+	def __init__(
+		self,
+		config: BrowserConfig = BrowserConfig(),
+		size: int = 2,
+	):
+		super().__init__(config=config)
+		if config.cdp_url or config.wss_url or config.chrome_instance_path:
+			raise ValueError('BrowserPool launches its own browsers and can not connect to an existing one')
+
+		self.size = size
+		self.shards = [Browser(config=config) for _ in range(size)]
+		self.restarts = [0] * size
+		# serializes launches of a shard, so concurrent first uses start one browser with one disconnect handler
+		self._shard_locks = [asyncio.Lock() for _ in range(size)]
+		self._next_shard = 0
+		self._tasks: set[asyncio.Task] = set()
+		self._closing = False
+
+	async def start(self) -> None:
+		"""Launch all shards up front instead of on first use"""
+		await asyncio.gather(*[self._get_shard_browser(index) for index in range(self.size)])
+
+	async def get_playwright_browser(self) -> PlaywrightBrowser:
+		"""Get the browser of the least loaded shard"""
+		return await self._get_shard_browser(self._pick_shard())
+
+	def _shard_load(self, index: int) -> int:
+		playwright_browser = self.shards[index].playwright_browser
+		return len(playwright_browser.contexts) if playwright_browser else 0
+
+	def _pick_shard(self) -> int:
+		"""Shard with the fewest open contexts, ties are broken round robin"""
+		loads = [self._shard_load(index) for index in range(self.size)]
+		min_load = min(loads)
+		for offset in range(self.size):
+			index = (self._next_shard + offset) % self.size
+			if loads[index] == min_load:
+				self._next_shard = index + 1
+				return index
+		return 0
+
+	async def _get_shard_browser(self, index: int) -> PlaywrightBrowser:
+		shard = self.shards[index]
+		if shard.playwright_browser is not None:
+			return shard.playwright_browser
+
+		async with self._shard_locks[index]:
+			return await self._launch_shard(index)
+
+	async def _launch_shard(self, index: int) -> PlaywrightBrowser:
+		"""Launch the browser of the shard if it has none, the caller holds the lock of the shard"""
+		shard = self.shards[index]
+		if shard.playwright_browser is not None:
+			return shard.playwright_browser
+
+		playwright_browser = await shard.get_playwright_browser()
+		playwright_browser.on('disconnected', lambda _: self._on_shard_disconnected(index, playwright_browser))
+		logger.debug(f'Launched browser shard {index}')
+		return playwright_browser
+
+	def _on_shard_disconnected(self, index: int, playwright_browser: PlaywrightBrowser) -> None:
+		if self._closing or self.shards[index].playwright_browser is not playwright_browser:
+			return
+
+		logger.warning(f'Browser shard {index} disconnected - restarting it')
+		self.restarts[index] += 1
+		task = asyncio.create_task(self._restart_shard(index))
+		self._tasks.add(task)
+		task.add_done_callback(self._tasks.discard)
+
+	async def _restart_shard(self, index: int) -> None:
+		async with self._shard_locks[index]:
+			# closing stops the playwright driver of the dead browser and resets the shard
+			await self.shards[index].close()
+			try:
+				await self._launch_shard(index)
+			except Exception as e:
+				logger.error(f'Failed to restart browser shard {index}: {e}')
+
+	async def get_stats(self) -> list[BrowserShardStats]:
+		"""Context count, restarts, CPU time and memory of every shard"""
+		stats = []
+		for index, shard in enumerate(self.shards):
+			shard_stats = BrowserShardStats(
+				index=index,
+				connected=shard.playwright_browser is not None and shard.playwright_browser.is_connected(),
+				contexts=self._shard_load(index),
+				restarts=self.restarts[index],
+			)
+			if shard_stats.connected:
+				await self._add_process_stats(shard.playwright_browser, shard_stats)  # type: ignore
+			stats.append(shard_stats)
+		return stats
+
+	async def _add_process_stats(self, playwright_browser: PlaywrightBrowser, stats: BrowserShardStats) -> None:
+		try:
+			cdp_session = await playwright_browser.new_browser_cdp_session()
+			try:
+				info = await cdp_session.send('SystemInfo.getProcessInfo')
+			finally:
+				await cdp_session.detach()
+		except Exception as e:
+			logger.debug(f'Failed to get process info of browser shard {stats.index}: {e}')
+			return
+
+		processes = info.get('processInfo', [])
+		stats.cpu_time = sum(process.get('cpuTime', 0) for process in processes)
+
+		if PSUTIL_AVAILABLE:
+			memory_rss = 0
+			for process in processes:
+				try:
+					memory_rss += psutil.Process(process['id']).memory_info().rss
+				except (psutil.Error, KeyError):
+					continue
+			stats.memory_rss = memory_rss
+
+	async def close(self):
+		"""Close all shards"""
+		self._closing = True
+		for task in list(self._tasks):
+			task.cancel()
+		await asyncio.gather(*self._tasks, return_exceptions=True)
+		await asyncio.gather(*[shard.close() for shard in self.shards], return_exceptions=True)
@@ -22,9 +22,13 @@ class BrowserState(DOMState):
 	title: str
 	tabs: list[TabInfo]
 	screenshot: Optional[str] = None
+	screenshot_format: str = 'png'
 	pixels_above: int = 0
 	pixels_below: int = 0
 	browser_errors: list[str] = field(default_factory=list)
+	# highlight index of the last extraction on the same page -> current index, for elements that are still there.
+	# Only filled when indices are renumbered (stable_highlight_indices=False), stable indices keep their values
+	index_mapping: dict[int, int] = field(default_factory=dict)
 
 
 @dataclass
@@ -45,6 +49,40 @@ class BrowserStateHistory:
 		return data
 
 
+# Rough median transfer size per request type, used to estimate the bytes saved by blocking
+ESTIMATED_RESOURCE_BYTES = {
+	'image': 15_000,
+	'font': 30_000,
+	'media': 250_000,
+	'script': 20_000,
+	'stylesheet': 10_000,
+}
+DEFAULT_ESTIMATED_RESOURCE_BYTES = 5_000
+
+
+@dataclass
+class ResourceBlockingStats:
+	"""Counters for requests aborted by the resource blocking route of a context"""
+
+	blocked_requests: int = 0
+	estimated_bytes_saved: int = 0
+	blocked_by_type: dict[str, int] = field(default_factory=dict)
+
+	def record(self, resource_type: str) -> None:
+		self.blocked_requests += 1
+		self.estimated_bytes_saved += ESTIMATED_RESOURCE_BYTES.get(resource_type, DEFAULT_ESTIMATED_RESOURCE_BYTES)
+		self.blocked_by_type[resource_type] = self.blocked_by_type.get(resource_type, 0) + 1
+
+
+@dataclass
+class FormFieldResult:
+	"""Outcome of filling one field with BrowserContext.fill_form_fields"""
+
+	index: int
+	success: bool
+	message: str
+
+
 class BrowserError(Exception):
 	"""Base class for all browser errors"""
 
@@ -0,0 +1,199 @@
+"""
+Executors for sync actions.
+
+Sync action functions run in the default thread pool unless they are registered with another executor:
+
+	register_action_executor(ThreadPoolActionExecutor('pdf', max_workers=2))
+
+	@controller.action('Parse a PDF', executor='pdf')
+	def parse_pdf(path: str): ...
+
+Executors are shared by all registries in the process, so a named pool bounds the work of all agents.
+'inline' runs trivial functions directly on the event loop, 'process' runs CPU bound functions in a process pool
+(the function must be importable, params and results are pickled).
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+
+from browser_use.controller.registry.views import ActionExecutorStats
+
+logger = logging.getLogger(__name__)
+
+
+class _Submission:
+	"""A submitted call, leaves the queue either when it starts or when it is cancelled before"""
+
+	__slots__ = ('submitted_at', 'dequeued')
+
+	def __init__(self):
+		self.submitted_at = time.monotonic()
+		self.dequeued = False
+
+
+class ActionExecutor:
+	"""Runs sync action functions, base class runs them inline on the event loop"""
+
+	def __init__(self, name: str):
+		self.name = name
+		self.stats = ActionExecutorStats()
+		self._lock = threading.Lock()
+
+	async def run(self, func: Callable, *args, **kwargs) -> Any:
+		submission = self._submitted()
+		self._started(submission)
+		try:
+			return func(*args, **kwargs)
+		finally:
+			self._completed()
+
+	def _submitted(self) -> _Submission:
+		with self._lock:
+			self.stats.submitted += 1
+			self.stats.queued += 1
+			self.stats.max_queued = max(self.stats.max_queued, self.stats.queued)
+		return _Submission()
+
+	def _started(self, submission: _Submission) -> None:
+		wait_time = time.monotonic() - submission.submitted_at
+		with self._lock:
+			if submission.dequeued:
+				return
+			submission.dequeued = True
+			self.stats.queued -= 1
+			self.stats.total_wait_time += wait_time
+			self.stats.max_wait_time = max(self.stats.max_wait_time, wait_time)
+
+	def _cancelled(self, submission: _Submission) -> None:
+		# the call never started, e.g. its task was cancelled while it waited for a worker
+		with self._lock:
+			if not submission.dequeued:
+				submission.dequeued = True
+				self.stats.queued -= 1
+
+	def _completed(self) -> None:
+		with self._lock:
+			self.stats.completed += 1
+
+	def shutdown(self, cancel_pending: bool = True) -> None:
+		pass
+
+
+class ThreadPoolActionExecutor(ActionExecutor):
+	"""Runs sync actions in a thread pool, the default thread pool of the event loop if max_workers is None"""
+
+	def __init__(self, name: str, max_workers: int | None = None):
+		super().__init__(name)
+		self.max_workers = max_workers
+		self._executor: Executor | None = (
+			ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'browser_use_{name}') if max_workers else None
+		)
+
+	async def run(self, func: Callable, *args, **kwargs) -> Any:
+		submission = self._submitted()
+		# same as asyncio.to_thread, the action sees the context variables of the caller
+		context = contextvars.copy_context()
+
+		def job():
+			self._started(submission)
+			return context.run(func, *args, **kwargs)
+
+		try:
+			return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+		except BaseException:
+			self._cancelled(submission)
+			raise
+		finally:
+			self._completed()
+
+	def shutdown(self, cancel_pending: bool = True) -> None:
+		if self._executor is not None:
+			self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
+
+
+def _run_in_process(func: Callable, args: tuple, kwargs: dict) -> tuple[float, Any]:
+	return time.time(), func(*args, **kwargs)
+
+
+class ProcessPoolActionExecutor(ActionExecutor):
+	"""
+	Runs CPU bound sync actions in a process pool, out of reach of the GIL of the event loop.
+
+	The function is pickled by reference, so it has to be defined at module level. Params and results are pickled too.
+	"""
+
+	def __init__(self, name: str, max_workers: int | None = None):
+		super().__init__(name)
+		self.max_workers = max_workers
+		self._executor: ProcessPoolExecutor | None = None
+
+	async def run(self, func: Callable, *args, **kwargs) -> Any:
+		if self._executor is None:
+			# started on first use, so importing browser_use does not spawn processes
+			self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+		submission = self._submitted()
+		submitted_at = time.time()
+		try:
+			started_at, result = await asyncio.get_running_loop().run_in_executor(
+				self._executor, functools.partial(_run_in_process, func, args, kwargs)
+			)
+		except BaseException:
+			self._cancelled(submission)
+			raise
+		finally:
+			self._completed()
+
+		# the worker reports its start time with the result, so queue stats are only updated at completion
+		wait_time = max(started_at - submitted_at, 0.0)
+		with self._lock:
+			submission.dequeued = True
+			self.stats.queued -= 1
+			self.stats.total_wait_time += wait_time
+			self.stats.max_wait_time = max(self.stats.max_wait_time, wait_time)
+		return result
+
+	def shutdown(self, cancel_pending: bool = True) -> None:
+		if self._executor is not None:
+			self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
+			self._executor = None
+
+
+DEFAULT_ACTION_EXECUTOR = 'thread'
+
+_action_executors: dict[str, ActionExecutor] = {
+	'thread': ThreadPoolActionExecutor('thread'),
+	'inline': ActionExecutor('inline'),
+	'process': ProcessPoolActionExecutor('process'),
+}
+
+
+def register_action_executor(executor: ActionExecutor) -> ActionExecutor:
+	"""
+	Make an executor available to actions by its name, replacing an executor with the same name.
+
+	Actions look their executor up by name on every call, so actions registered earlier move to the new executor.
+	The replaced executor finishes the calls it already accepted and is shut down afterwards.
+	"""
+	previous = _action_executors.get(executor.name)
+	_action_executors[executor.name] = executor
+	if previous is not None and previous is not executor:
+		previous.shutdown(cancel_pending=False)
+	return executor
+
+
+def get_action_executor(name: str) -> ActionExecutor:
+	if name not in _action_executors:
+		raise ValueError(f'Unknown action executor {name}, register it with register_action_executor first')
+	return _action_executors[name]
+
+
+def get_action_executor_stats() -> dict[str, ActionExecutorStats]:
+	"""Queue depth and wait times of all executors by name"""
+	return {name: executor.stats for name, executor in _action_executors.items()}
@@ -1,14 +1,29 @@
 import asyncio
+import logging
+from functools import lru_cache
 from inspect import iscoroutinefunction, signature
-from typing import Any, Callable, Optional, Type
+from typing import Any, Callable, Collection, Optional, Type
 
-from pydantic import BaseModel, Field, create_model
+from pydantic import BaseModel, Field, TypeAdapter, create_model
 
+from browser_use.agent.views import ActionResult
 from browser_use.browser.context import BrowserContext
+from browser_use.controller.registry.executors import (
+	DEFAULT_ACTION_EXECUTOR,
+	ActionExecutor,
+	ProcessPoolActionExecutor,
+	get_action_executor,
+	register_action_executor,
+)
 from browser_use.controller.registry.views import (
+	ACTION_MODEL_CACHE_SIZE,
+	ActionInvocationPlan,
 	ActionModel,
 	ActionRegistry,
+	ActionRegistryFingerprint,
 	RegisteredAction,
+	RegistryMetrics,
+	get_param_model_schema,
 )
 from browser_use.telemetry.service import ProductTelemetry
 from browser_use.telemetry.views import (
@@ -16,14 +31,36 @@ from browser_use.telemetry.views import (
 	RegisteredFunction,
 )
 
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=ACTION_MODEL_CACHE_SIZE)
+def _create_action_model(fingerprint: ActionRegistryFingerprint) -> Type[ActionModel]:
+	fields = {
+		name: (
+			Optional[param_model],
+			Field(default=None, description=description),
+		)
+		for name, description, param_model in fingerprint
+	}
+	return create_model('ActionModel', __base__=ActionModel, **fields)  # type:ignore
+
 
 class Registry:
 	"""Service for registering and managing actions"""
 
-	def __init__(self, exclude_actions: list[str] = []):
+	# bumped on every registration through action(), so dependants know when to rebuild their action models
+	version: int = 0
+
+	def __init__(self, exclude_actions: list[str] = [], default_timeout: Optional[float] = None):
 		self.registry = ActionRegistry()
 		self.telemetry = ProductTelemetry()
 		self.exclude_actions = exclude_actions
+		# seconds after which actions without their own timeout are cancelled, None waits forever
+		self.default_timeout = default_timeout
+		self.metrics = RegistryMetrics()
+		# invocation plans by action name, together with the action they were made for
+		self._plans: dict[str, tuple[RegisteredAction, ActionInvocationPlan]] = {}
 
 	def _create_param_model(self, function: Callable) -> Type[BaseModel]:
 		"""Creates a Pydantic model from function signature"""
@@ -45,8 +82,18 @@ class Registry:
 		description: str,
 		param_model: Optional[Type[BaseModel]] = None,
 		requires_browser: bool = False,
+		timeout: Optional[float] = None,
+		executor: str | ActionExecutor = DEFAULT_ACTION_EXECUTOR,
 	):
-		"""Decorator for registering actions"""
+		"""
+		Decorator for registering actions
+
+		@param timeout: Seconds after which the action is cancelled and returns an error result, overrides the default timeout
+		of the registry. Sync actions run in a thread, which is abandoned but keeps running after a timeout.
+		@param executor: Where a sync function runs: 'thread' (default thread pool), 'inline' (on the event loop),
+		'process' (process pool, params and results are pickled), or the name of an executor registered with
+		register_action_executor. An ActionExecutor instance is registered under its name.
+		"""
 
 		def decorator(func: Callable):
 			# Skip registration if action is in exclude_actions
@@ -58,9 +105,16 @@ class Registry:
 
 			# Wrap sync functions to make them async
 			if not iscoroutinefunction(func):
+				if isinstance(executor, ActionExecutor):
+					executor_name = register_action_executor(executor).name
+				else:
+					executor_name = get_action_executor(executor).name
+				if requires_browser and isinstance(get_action_executor(executor_name), ProcessPoolActionExecutor):
+					raise ValueError(f'Action {func.__name__} requires the browser, which can not be passed to another process')
 
 				async def async_wrapper(*args, **kwargs):
-					return await asyncio.to_thread(func, *args, **kwargs)
+					# looked up on every call, an executor registered later under the same name replaces this one
+					return await get_action_executor(executor_name).run(func, *args, **kwargs)
 
 				# Copy the signature and other metadata from the original function
 				async_wrapper.__signature__ = signature(func)
@@ -76,65 +130,100 @@ class Registry:
 				function=wrapped_func,
 				param_model=actual_param_model,
 				requires_browser=requires_browser,
+				timeout=timeout,
 			)
 			self.registry.actions[func.__name__] = action
+			self._plans[func.__name__] = (action, self._create_invocation_plan(action))
+			self.version += 1
 			return func
 
 		return decorator
 
+	@staticmethod
+	def _create_invocation_plan(action: RegisteredAction) -> ActionInvocationPlan:
+		parameters = list(signature(action.function).parameters.values())
+		first_annotation = parameters[0].annotation if parameters else None
+		return ActionInvocationPlan(
+			adapter=TypeAdapter(action.param_model),
+			# only when the first argument takes the param model itself, not one model typed field of it
+			pass_model=isinstance(first_annotation, type)
+			and issubclass(first_annotation, BaseModel)
+			and isinstance(action.param_model, type)
+			and issubclass(action.param_model, first_annotation),
+			requires_browser=bool(action.requires_browser),
+		)
+
+	def _get_invocation_plan(self, action_name: str, action: RegisteredAction) -> ActionInvocationPlan:
+		"""Plan of the action, made on first use for actions that were put into the registry directly"""
+		cached = self._plans.get(action_name)
+		if cached is not None and cached[0] is action:
+			return cached[1]
+		plan = self._create_invocation_plan(action)
+		self._plans[action_name] = (action, plan)
+		return plan
+
 	async def execute_action(self, action_name: str, params: dict, browser: Optional[BrowserContext] = None) -> Any:
 		"""Execute a registered action"""
 		if action_name not in self.registry.actions:
 			raise ValueError(f'Action {action_name} not found')
 
 		action = self.registry.actions[action_name]
+		self.metrics.record_execution(action_name)
+		# actions inserted into the registry directly may not declare a timeout
+		timeout = action.timeout if isinstance(action.timeout, (int, float)) else self.default_timeout
 		try:
-			# Create the validated Pydantic model
-			validated_params = action.param_model(**params)
-
-			# Check if the first parameter is a Pydantic model
-			sig = signature(action.function)
-			parameters = list(sig.parameters.values())
-			is_pydantic = parameters and issubclass(parameters[0].annotation, BaseModel)
+			plan = self._get_invocation_plan(action_name, action)
+			validated_params = plan.adapter.validate_python(params)
 
-			# Prepare arguments based on parameter type
-			if action.requires_browser:
+			args = (validated_params,) if plan.pass_model else ()
+			# fields are passed as they are, so model typed arguments get model instances
+			kwargs = {} if plan.pass_model else validated_params.__dict__.copy()
+			if plan.requires_browser:
 				if not browser:
 					raise ValueError(
 						f'Action {action_name} requires browser but none provided. This has to be used in combination of `requires_browser=True` when registering the action.'
 					)
-				if is_pydantic:
-					return await action.function(validated_params, browser=browser)
-				return await action.function(**validated_params.model_dump(), browser=browser)
-
-			if is_pydantic:
-				return await action.function(validated_params)
-			return await action.function(**validated_params.model_dump())
+				kwargs['browser'] = browser
+			call = action.function(*args, **kwargs)
+
+			if timeout is None:
+				return await call
+
+			# the action is cancelled when the deadline passes
+			deadline = asyncio.timeout(timeout)
+			try:
+				async with deadline:
+					return await call
+			except TimeoutError:
+				# timeouts raised by the action itself are regular errors
+				if not deadline.expired():
+					raise
+				self.metrics.record_timeout(action_name)
+				msg = f'Action {action_name} timed out after {timeout}s and was cancelled'
+				logger.warning(msg)
+				return ActionResult(error=msg, include_in_memory=True)
 
 		except Exception as e:
 			raise RuntimeError(f'Error executing action {action_name}: {str(e)}') from e
 
-	def create_action_model(self) -> Type[ActionModel]:
-		"""Creates a Pydantic model from registered actions"""
-		fields = {
-			name: (
-				Optional[action.param_model],
-				Field(default=None, description=action.description),
-			)
-			for name, action in self.registry.actions.items()
-		}
+	def create_action_model(self, exclude_actions: Collection[str] = ()) -> Type[ActionModel]:
+		"""
+		Creates a Pydantic model from registered actions
 
+		The model is shared by all registries with the same actions, so it is only built once per process.
+		exclude_actions leaves actions out of the model for one caller, without changing the registry.
+		"""
 		self.telemetry.capture(
 			ControllerRegisteredFunctionsTelemetryEvent(
 				registered_functions=[
-					RegisteredFunction(name=name, params=action.param_model.model_json_schema())
+					RegisteredFunction(name=name, params=get_param_model_schema(action.param_model))
 					for name, action in self.registry.actions.items()
 				]
 			)
 		)
 
-		return create_model('ActionModel', __base__=ActionModel, **fields)  # type:ignore
+		return _create_action_model(self.registry.fingerprint(exclude_actions))
 
-	def get_prompt_description(self) -> str:
+	def get_prompt_description(self, exclude_actions: Collection[str] = ()) -> str:
 		"""Get a description of all actions for the prompt"""
-		return self.registry.get_prompt_description()
+		return self.registry.get_prompt_description(exclude_actions)
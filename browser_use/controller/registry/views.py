@@ -1,6 +1,35 @@
-from typing import Callable, Dict, Type
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Collection, Dict, Optional, Type
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, TypeAdapter
+
+# Number of distinct action sets whose models and schemas are kept, one per registry in typical setups
+ACTION_MODEL_CACHE_SIZE = 128
+
+# What the dynamic action models and prompt description are built from: (name, description, param model) per action
+ActionRegistryFingerprint = tuple[tuple[str, str, Type[BaseModel]], ...]
+
+
+@lru_cache(maxsize=1024)
+def get_param_model_schema(param_model: Type[BaseModel]) -> dict[str, Any]:
+	"""JSON schema of a param model, computed once per model class. Callers must not modify it."""
+	return param_model.model_json_schema()
+
+
+@lru_cache(maxsize=1024)
+def _action_prompt_description(name: str, description: str, param_model: Type[BaseModel]) -> str:
+	skip_keys = ['title']
+	s = f'{description}: \n'
+	s += '{' + str(name) + ': '
+	s += str(
+		{
+			k: {sub_k: sub_v for sub_k, sub_v in v.items() if sub_k not in skip_keys}
+			for k, v in get_param_model_schema(param_model)['properties'].items()
+		}
+	)
+	s += '}'
+	return s
 
 
 class RegisteredAction(BaseModel):
@@ -11,22 +40,25 @@ class RegisteredAction(BaseModel):
 	function: Callable
 	param_model: Type[BaseModel]
 	requires_browser: bool = False
+	# seconds after which the action is cancelled, None falls back to the default timeout of the registry
+	timeout: Optional[float] = None
 
 	model_config = ConfigDict(arbitrary_types_allowed=True)
 
 	def prompt_description(self) -> str:
 		"""Get a description of the action for the prompt"""
-		skip_keys = ['title']
-		s = f'{self.description}: \n'
-		s += '{' + str(self.name) + ': '
-		s += str(
-			{
-				k: {sub_k: sub_v for sub_k, sub_v in v.items() if sub_k not in skip_keys}
-				for k, v in self.param_model.schema()['properties'].items()
-			}
-		)
-		s += '}'
-		return s
+		return _action_prompt_description(self.name, self.description, self.param_model)
+
+
+@dataclass
+class ActionInvocationPlan:
+	"""How to call a registered action, worked out once instead of on every call"""
+
+	# validates the raw params into the param model
+	adapter: TypeAdapter
+	# the function takes the param model as its first argument instead of one keyword argument per field
+	pass_model: bool
+	requires_browser: bool
 
 
 class ActionModel(BaseModel):
@@ -66,6 +98,51 @@ class ActionRegistry(BaseModel):
 
 	actions: Dict[str, RegisteredAction] = {}
 
-	def get_prompt_description(self) -> str:
+	def fingerprint(self, exclude_actions: Collection[str] = ()) -> ActionRegistryFingerprint:
+		"""Identifies the action set, registries with equal fingerprints share their cached models"""
+		return tuple(
+			(name, action.description, action.param_model)
+			for name, action in self.actions.items()
+			if name not in exclude_actions
+		)
+
+	def get_prompt_description(self, exclude_actions: Collection[str] = ()) -> str:
 		"""Get a description of all actions for the prompt"""
-		return '\n'.join([action.prompt_description() for action in self.actions.values()])
+		return '\n'.join([action.prompt_description() for name, action in self.actions.items() if name not in exclude_actions])
+
+
+@dataclass
+class RegistryMetrics:
+	"""Counters of the actions executed by a registry"""
+
+	executions: dict[str, int] = field(default_factory=dict)
+	timeouts: dict[str, int] = field(default_factory=dict)
+
+	@property
+	def total_timeouts(self) -> int:
+		return sum(self.timeouts.values())
+
+	def record_execution(self, action_name: str) -> None:
+		self.executions[action_name] = self.executions.get(action_name, 0) + 1
+
+	def record_timeout(self, action_name: str) -> None:
+		self.timeouts[action_name] = self.timeouts.get(action_name, 0) + 1
+
+
+@dataclass
+class ActionExecutorStats:
+	"""Load of an executor that runs sync actions"""
+
+	submitted: int = 0
+	completed: int = 0
+	# submitted calls that did not start yet
+	queued: int = 0
+	max_queued: int = 0
+	# seconds calls waited between submission and start
+	total_wait_time: float = 0.0
+	max_wait_time: float = 0.0
+
+	@property
+	def average_wait_time(self) -> float:
+		started = self.submitted - self.queued
+		return self.total_wait_time / started if started else 0.0
@@ -7,13 +7,14 @@ from main_content_extractor import MainContentExtractor
 from playwright.async_api import Page
 from pydantic import BaseModel
 
-from browser_use.agent.views import ActionModel, ActionResult
+from browser_use.agent.views import ActionModel, ActionResult, StepMetadata
 from browser_use.browser.context import BrowserContext
 from browser_use.controller.registry.service import Registry
 from browser_use.controller.views import (
 	ClickElementAction,
 	DoneAction,
 	ExtractPageContentAction,
+	FillFormAction,
 	GoToUrlAction,
 	InputTextAction,
 	OpenTabAction,
@@ -26,16 +27,37 @@ from browser_use.utils import time_execution_async, time_execution_sync
 
 logger = logging.getLogger(__name__)
 
+# Reads the options of a select element
+DROPDOWN_OPTIONS_JS = """
+(select) => {
+	if (!select || !select.options) return null;
+
+	return {
+		options: Array.from(select.options).map(opt => ({
+			text: opt.text, //do not trim, because we are doing exact match in select_dropdown_option
+			value: opt.value,
+			index: opt.index
+		})),
+		id: select.id,
+		name: select.name
+	};
+}
+"""
+
+# Finds the element of the `xpath` argument in the document
+FIND_BY_XPATH_JS = 'document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue'
+
 
 class Controller:
 	def __init__(
 		self,
 		exclude_actions: list[str] = [],
 		output_model: Optional[Type[BaseModel]] = None,
+		default_action_timeout: Optional[float] = None,
 	):
 		self.exclude_actions = exclude_actions
 		self.output_model = output_model
-		self.registry = Registry(exclude_actions)
+		self.registry = Registry(exclude_actions, default_timeout=default_action_timeout)
 		self._register_default_actions()
 
 	def _register_default_actions(self):
@@ -131,10 +153,36 @@ class Controller:
 				raise Exception(f'Element index {params.index} does not exist - retry or use alternative actions')
 
 			element_node = state.selector_map[params.index]
-			await browser._input_text_element_node(element_node, params.text)
+			strategy = await browser._input_text_element_node(element_node, params.text)
 			msg = f'⌨️  Input "{params.text}" into index {params.index}'
 			logger.info(msg)
-			logger.debug(f'Element xpath: {element_node.xpath}')
+			logger.debug(f'Element xpath: {element_node.xpath}, input strategy: {strategy}')
+			return ActionResult(extracted_content=msg, include_in_memory=True)
+
+		@self.registry.action(
+			'Fill several form fields at once, fields is a list of {"index": int, "value": str}: '
+			'text inputs and textareas (value is the text), selects (value is the option text), '
+			'checkboxes and radios (value "true" or "false"). Use input_text for fields that show suggestions while typing',
+			param_model=FillFormAction,
+			requires_browser=True,
+		)
+		async def fill_form(params: FillFormAction, browser: BrowserContext):
+			session = await browser.get_session()
+			state = session.cached_state
+
+			missing = [field.index for field in params.fields if field.index not in state.selector_map]
+			if missing:
+				raise Exception(f'Element indices {missing} do not exist - retry or use alternative actions')
+
+			results = await browser.fill_form_fields([(state.selector_map[field.index], field.value) for field in params.fields])
+			filled = sum(result.success for result in results)
+			msg = f'📝  Filled {filled}/{len(results)} form fields'
+			for result in results:
+				msg += f'\n{"✅" if result.success else "❌"} index {result.index}: {result.message}'
+			logger.info(msg)
+
+			if filled == 0:
+				return ActionResult(error=msg, include_in_memory=True)
 			return ActionResult(extracted_content=msg, include_in_memory=True)
 
 		# Tab Management Actions
@@ -172,6 +220,11 @@ class Controller:
 			logger.info(msg)
 			return ActionResult(extracted_content=msg)
 
+		# only offered to agents whose vision policy can leave screenshots out, the others exclude it from their action model
+		@self.registry.action('Attach a screenshot of the page to the next state, in case it was left out')
+		async def request_screenshot():
+			return ActionResult(extracted_content='A screenshot will be attached to the next state', screenshot_requested=True)
+
 		@self.registry.action(
 			'Scroll down the page by pixel amount - if no amount is specified, scroll down one page',
 			param_model=ScrollAction,
@@ -274,52 +327,35 @@ class Controller:
 			dom_element = selector_map[index]
 
 			try:
-				# Frame-aware approach since we know it works
-				all_options = []
-				frame_index = 0
-
-				for frame in page.frames:
-					try:
-						options = await frame.evaluate(
-							"""
-							(xpath) => {
-								const select = document.evaluate(xpath, document, null,
-									XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
-								if (!select) return null;
-
-								return {
-									options: Array.from(select.options).map(opt => ({
-										text: opt.text, //do not trim, because we are doing exact match in select_dropdown_option
-										value: opt.value,
-										index: opt.index
-									})),
-									id: select.id,
-									name: select.name
-								};
-							}
-						""",
-							dom_element.xpath,
-						)
-
-						if options:
-							logger.debug(f'Found dropdown in frame {frame_index}')
-							logger.debug(f'Dropdown ID: {options["id"]}, Name: {options["name"]}')
-
-							formatted_options = []
-							for opt in options['options']:
-								# encoding ensures AI uses the exact string in select_dropdown_option
-								encoded_text = json.dumps(opt['text'])
-								formatted_options.append(f'{opt["index"]}: text={encoded_text}')
-
-							all_options.extend(formatted_options)
-
-					except Exception as frame_e:
-						logger.debug(f'Frame {frame_index} evaluation failed: {str(frame_e)}')
+				options = None
 
-					frame_index += 1
-
-				if all_options:
-					msg = '\n'.join(all_options)
+				# The element handle is resolved in its own frame, so no frame has to be searched
+				element_handle = await browser.get_locate_element(dom_element)
+				if element_handle:
+					options = await element_handle.evaluate(DROPDOWN_OPTIONS_JS)
+				else:
+					# Frame-aware fallback: look for the xpath in every frame
+					for frame_index, frame in enumerate(page.frames):
+						try:
+							options = await frame.evaluate(
+								f'(xpath) => ({DROPDOWN_OPTIONS_JS})({FIND_BY_XPATH_JS})', dom_element.xpath
+							)
+							if options:
+								logger.debug(f'Found dropdown in frame {frame_index}')
+								break
+						except Exception as frame_e:
+							logger.debug(f'Frame {frame_index} evaluation failed: {str(frame_e)}')
+
+				if options:
+					logger.debug(f'Dropdown ID: {options["id"]}, Name: {options["name"]}')
+
+					formatted_options = []
+					for opt in options['options']:
+						# encoding ensures AI uses the exact string in select_dropdown_option
+						encoded_text = json.dumps(opt['text'])
+						formatted_options.append(f'{opt["index"]}: text={encoded_text}')
+
+					msg = '\n'.join(formatted_options)
 					msg += '\nUse the exact text string in select_dropdown_option'
 					logger.info(msg)
 					return ActionResult(extracted_content=msg, include_in_memory=True)
@@ -358,9 +394,21 @@ class Controller:
 			logger.debug(f'Element attributes: {dom_element.attributes}')
 			logger.debug(f'Element tag: {dom_element.tag_name}')
 
-			xpath = '//' + dom_element.xpath
-
 			try:
+				# The element handle is resolved in its own frame, so no frame has to be searched
+				element_handle = await browser.get_locate_element(dom_element)
+				if element_handle:
+					try:
+						# "label" because we are selecting by text
+						# timeout=1000 because we are already waiting for all network events,
+						# therefore ideally we don't need to wait a lot here (default 30s)
+						selected_option_values = await element_handle.select_option(label=text, timeout=1000)
+						msg = f'selected option {text} with value {selected_option_values}'
+						logger.info(msg)
+						return ActionResult(extracted_content=msg, include_in_memory=True)
+					except Exception as handle_e:
+						logger.debug(f'Selecting through the element handle failed, searching all frames: {str(handle_e)}')
+
 				frame_index = 0
 				for frame in page.frames:
 					try:
@@ -440,33 +488,50 @@ class Controller:
 
 	@time_execution_async('--multi-act')
 	async def multi_act(
-		self, actions: list[ActionModel], browser_context: BrowserContext, check_for_new_elements: bool = True
+		self,
+		actions: list[ActionModel],
+		browser_context: BrowserContext,
+		check_for_new_elements: bool = True,
+		step_metadata: Optional[StepMetadata] = None,
 	) -> list[ActionResult]:
-		"""Execute multiple actions"""
+		"""Execute multiple actions, settle times between them are recorded in step_metadata"""
 		results = []
 
 		session = await browser_context.get_session()
 		cached_selector_map = session.cached_state.selector_map
 		cached_path_hashes = set(e.hash.branch_path_hash for e in cached_selector_map.values())
+		# hashes of the state the indices currently refer to
+		current_path_hashes = sorted(e.hash.branch_path_hash for e in cached_selector_map.values())
 		await browser_context.remove_highlights()
 
 		for i, action in enumerate(actions):
 			if action.get_index() is not None and i != 0:
-				new_state = await browser_context.get_state()
-				new_path_hashes = set(e.hash.branch_path_hash for e in new_state.selector_map.values())
-				if check_for_new_elements and not new_path_hashes.issubset(cached_path_hashes):
+				# only hash the interactive elements in the page, the full state is extracted if they changed
+				new_path_hashes = await browser_context.get_interactive_branch_path_hashes()
+				if new_path_hashes is None:
+					new_state = await browser_context.get_state()
+					new_path_hashes = [e.hash.branch_path_hash for e in new_state.selector_map.values()]
+					current_path_hashes = sorted(new_path_hashes)
+
+				if check_for_new_elements and not set(new_path_hashes).issubset(cached_path_hashes):
 					# next action requires index but there are new elements on the page
 					logger.info(f'Something new appeared after action {i} / {len(actions)}')
 					break
 
+				if sorted(new_path_hashes) != current_path_hashes:
+					# elements moved or disappeared, so the cached indices are outdated
+					new_state = await browser_context.get_state()
+					current_path_hashes = sorted(e.hash.branch_path_hash for e in new_state.selector_map.values())
+
 			results.append(await self.act(action, browser_context))
 
 			logger.debug(f'Executed action {i + 1} / {len(actions)}')
 			if results[-1].is_done or results[-1].error or i == len(actions) - 1:
 				break
 
-			await asyncio.sleep(browser_context.config.wait_between_actions)
-			# hash all elements. if it is a subset of cached_state its fine - else break (new elements on page)
+			settle_time = await browser_context.wait_for_dom_settle()
+			if step_metadata is not None:
+				step_metadata.settle_times.append(settle_time)
 
 		return results
 
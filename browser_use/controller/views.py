@@ -23,6 +23,15 @@ class InputTextAction(BaseModel):
 	xpath: Optional[str] = None
 
 
+class FormField(BaseModel):
+	index: int
+	value: str
+
+
+class FillFormAction(BaseModel):
+	fields: list[FormField]
+
+
 class DoneAction(BaseModel):
 	text: str
 
@@ -3,9 +3,48 @@
     applyClickStyling = false,
     applyFormRelated = false
 ) => {
-    const { doHighlightElements, focusHighlightIndex, viewportExpansion } = args;
+    const { doHighlightElements, focusHighlightIndex, viewportExpansion, extractionId, branchPathsOnly, stableIndices } = args;
     let highlightIndex = 0; // Reset highlight index
 
+    // Last highlight index of every element indexed on this page, lives as long as the window (until navigation).
+    // With stableIndices elements keep their index across extractions and new elements get fresh ones.
+    if (!window.__browserUseIndices) {
+        window.__browserUseIndices = { indices: new WeakMap(), next: 0 };
+    }
+    const indexState = window.__browserUseIndices;
+    // focus and branch path runs read the indices of the last extraction but do not hand out new ones
+    const recordIndices = focusHighlightIndex < 0 && !branchPathsOnly;
+
+    function assignHighlightIndex(node, nodeData) {
+        const previousIndex = indexState.indices.get(node);
+        let index;
+        if (!stableIndices) {
+            index = highlightIndex++;
+        } else if (previousIndex !== undefined) {
+            index = previousIndex;
+        } else {
+            index = recordIndices ? indexState.next++ : indexState.next + highlightIndex++;
+        }
+        if (recordIndices) {
+            if (previousIndex !== undefined) {
+                nodeData.previousHighlightIndex = previousIndex;
+            }
+            indexState.indices.set(node, index);
+        }
+        return index;
+    }
+
+    // Branch paths (tag names from below the root down to the element) of all highlighted elements.
+    // With branchPathsOnly only these are returned, as a cheap check whether the interactive elements changed.
+    const branchPaths = [];
+
+    // Highlighted elements of this extraction by highlight index, so actions can resolve them without a selector.
+    // A focus-only run just draws a highlight and keeps the map of the last full extraction.
+    const elementMap = new Map();
+    if (extractionId && focusHighlightIndex < 0) {
+        window.__browserUseElements = { extractionId, elements: elementMap };
+    }
+
     // Quick check to confirm the script receives focusHighlightIndex
     console.log('focusHighlightIndex:', focusHighlightIndex);
 
@@ -379,7 +418,7 @@
 
 
     // Function to traverse the DOM and create nested JSON
-    function buildDomTree(node, parentIframe = null) {
+    function buildDomTree(node, parentIframe = null, parentBranchPath = null) {
         if (!node) return null;
 
         // Special case for text nodes
@@ -416,6 +455,9 @@
             }
         }
 
+        // The root itself is not part of the branch path, same as in HistoryTreeProcessor
+        const branchPath = parentBranchPath === null ? '' : (parentBranchPath ? `${parentBranchPath}/` : '') + nodeData.tagName;
+
         if (node.nodeType === Node.ELEMENT_NODE) {
             const isInteractive = isInteractiveElement(node);
             const isVisible = isElementVisible(node);
@@ -427,7 +469,12 @@
 
             // Highlight if element meets all criteria and highlighting is enabled
             if (isInteractive && isVisible && isTop) {
-                nodeData.highlightIndex = highlightIndex++;
+                nodeData.highlightIndex = assignHighlightIndex(node, nodeData);
+                branchPaths.push(branchPath);
+                // Elements inside iframes belong to another document and are located through their frame
+                if (!parentIframe) {
+                    elementMap.set(nodeData.highlightIndex, node);
+                }
                 if (doHighlightElements) {
                     if(focusHighlightIndex >= 0){
                         if(focusHighlightIndex === nodeData.highlightIndex){
@@ -453,7 +500,7 @@
         // Handle shadow DOM
         if (node.shadowRoot) {
             const shadowChildren = Array.from(node.shadowRoot.childNodes).map(child =>
-                buildDomTree(child, parentIframe)
+                buildDomTree(child, parentIframe, branchPath)
             );
             nodeData.children.push(...shadowChildren);
         }
@@ -464,7 +511,7 @@
                 const iframeDoc = node.contentDocument || node.contentWindow.document;
                 if (iframeDoc) {
                     const iframeChildren = Array.from(iframeDoc.body.childNodes).map(child =>
-                        buildDomTree(child, node)
+                        buildDomTree(child, node, branchPath)
                     );
                     nodeData.children.push(...iframeChildren);
                 }
@@ -473,7 +520,7 @@
             }
         } else {
             const children = Array.from(node.childNodes).map(child =>
-                buildDomTree(child, parentIframe)
+                buildDomTree(child, parentIframe, branchPath)
             );
             nodeData.children.push(...children);
         }
@@ -482,5 +529,6 @@
     }
 
 
-    return buildDomTree(document.body);
+    const tree = buildDomTree(document.body);
+    return branchPathsOnly ? branchPaths : tree;
 }
@@ -1,4 +1,6 @@
+import hashlib
 import logging
+import uuid
 from importlib import resources
 from typing import Optional
 
@@ -26,13 +28,23 @@ class DomService:
 									focus_element: int = -1,
 									viewport_expansion: int = 0,
 									apply_click_styling: bool = False,
-									apply_form_related: bool = False) -> DOMState:
-		element_tree = await self._build_dom_tree(highlight_elements, focus_element, viewport_expansion, apply_click_styling, apply_form_related)
-		selector_map = self._create_selector_map(element_tree)
+									apply_form_related: bool = False,
+									stable_indices: bool = True) -> DOMState:
+		"""
+		Extract the interactive elements of the page.
+
+		With stable_indices elements keep their highlight index across extractions while the page is not navigated, new
+		elements get fresh indices. Without it indices follow the traversal order. Either way elements indexed before
+		carry their last index in previous_highlight_index.
+		"""
+		# a focus run only draws a highlight, its elements are not registered in the page
+		extraction_id = uuid.uuid4().hex if focus_element < 0 else None
+		element_tree = await self._build_dom_tree(highlight_elements, focus_element, viewport_expansion, apply_click_styling, apply_form_related, extraction_id, stable_indices)
+		selector_map = self._create_selector_map(element_tree, extraction_id)
 
 		return DOMState(element_tree=element_tree, selector_map=selector_map)
 
-	async def _build_dom_tree(self, highlight_elements: bool, focus_element: int, viewport_expansion: int, apply_click_styling: bool, apply_form_related: bool) -> DOMElementNode:
+	async def _build_dom_tree(self, highlight_elements: bool, focus_element: int, viewport_expansion: int, apply_click_styling: bool, apply_form_related: bool, extraction_id: Optional[str] = None, stable_indices: bool = True) -> DOMElementNode:
 		js_code = resources.read_text('browser_use.dom', 'buildDomTree.js')
 
 		args = {
@@ -41,6 +53,8 @@ class DomService:
 			'viewportExpansion': viewport_expansion,
 			'applyClickStyling': apply_click_styling,
 			'applyFormRelated': apply_form_related,
+			'extractionId': extraction_id,
+			'stableIndices': stable_indices,
 		}
 
 		eval_page = await self.page.evaluate(js_code, args)  # This is quite big, so be careful
@@ -51,12 +65,30 @@ class DomService:
 
 		return html_to_dict
 
-	def _create_selector_map(self, element_tree: DOMElementNode) -> SelectorMap:
+	async def get_interactive_branch_path_hashes(self, viewport_expansion: int = 0) -> list[str]:
+		"""
+		Branch path hashes of the elements get_clickable_elements would index, without transferring and parsing the DOM tree.
+
+		The hashes are the same as HashedDomElement.branch_path_hash of the extracted elements.
+		"""
+		js_code = resources.read_text('browser_use.dom', 'buildDomTree.js')
+		args = {
+			'doHighlightElements': False,
+			'focusHighlightIndex': -1,
+			'viewportExpansion': viewport_expansion,
+			'branchPathsOnly': True,
+		}
+		branch_paths = await self.page.evaluate(js_code, args)
+		# same as HistoryTreeProcessor._parent_branch_path_hash of the '/' separated tag names
+		return [hashlib.sha256(branch_path.encode()).hexdigest() for branch_path in branch_paths]
+
+	def _create_selector_map(self, element_tree: DOMElementNode, extraction_id: Optional[str] = None) -> SelectorMap:
 		selector_map = {}
 
 		def process_node(node: DOMBaseNode):
 			if isinstance(node, DOMElementNode):
 				if node.highlight_index is not None:
+					node.extraction_id = extraction_id
 					selector_map[node.highlight_index] = node
 
 				for child in node.children:
@@ -93,6 +125,7 @@ class DomService:
 			is_interactive=node_data.get('isInteractive', False),
 			is_top_element=node_data.get('isTopElement', False),
 			highlight_index=node_data.get('highlightIndex'),
+			previous_highlight_index=node_data.get('previousHighlightIndex'),
 			shadow_root=node_data.get('shadowRoot', False),
 			parent=parent,
 		)
@@ -35,6 +35,10 @@ class DOMElementNode(DOMBaseNode):
 	"""
 	xpath: the xpath of the element from the last root node (shadow root or iframe OR document if no shadow root or iframe).
 	To properly reference the element we need to recursively switch the root node until we find the element (work you way up the tree with `.parent`)
+
+	extraction_id: id of the DOM extraction that assigned the highlight index. While the page is not reloaded the element can be resolved directly by (extraction_id, highlight_index).
+
+	previous_highlight_index: highlight index the element had when it was last extracted on the same page, None for new elements.
 	"""
 
 	tag_name: str
@@ -45,6 +49,8 @@ class DOMElementNode(DOMBaseNode):
 	is_top_element: bool = False
 	shadow_root: bool = False
 	highlight_index: Optional[int] = None
+	extraction_id: Optional[str] = None
+	previous_highlight_index: Optional[int] = None
 
 	def __repr__(self) -> str:
 		tag_str = f'<{self.tag_name}'
@@ -118,7 +124,11 @@ class DOMElementNode(DOMBaseNode):
 
 	def clickable_elements_to_string(self, include_attributes: list[str] = []) -> str:
 		"""Convert the processed DOM content to HTML."""
-		formatted_text = []
+		return '\n'.join(line for _, line in self.clickable_element_lines(include_attributes))
+
+	def clickable_element_lines(self, include_attributes: list[str] = []) -> list[tuple[str, str]]:
+		"""Lines of clickable_elements_to_string with a key identifying their element or text on the page"""
+		formatted_lines: list[tuple[str, str]] = []
 
 		def process_node(node: DOMBaseNode, depth: int) -> None:
 			if isinstance(node, DOMElementNode):
@@ -131,8 +141,11 @@ class DOMElementNode(DOMBaseNode):
 							for key, value in node.attributes.items()
 							if key in include_attributes
 						)
-					formatted_text.append(
-						f'{node.highlight_index}[:]<{node.tag_name}{attributes_str}>{node.get_all_text_till_next_clickable_element()}</{node.tag_name}>'
+					formatted_lines.append(
+						(
+							f'element:{node.xpath}',
+							f'{node.highlight_index}[:]<{node.tag_name}{attributes_str}>{node.get_all_text_till_next_clickable_element()}</{node.tag_name}>',
+						)
 					)
 
 				# Process children regardless
@@ -142,10 +155,10 @@ class DOMElementNode(DOMBaseNode):
 			elif isinstance(node, DOMTextNode):
 				# Add text only if it doesn't have a highlighted parent
 				if not node.has_parent_with_highlight_index():
-					formatted_text.append(f'_[:]{node.text}')
+					formatted_lines.append((f'text:{node.text}', f'_[:]{node.text}'))
 
 		process_node(self, 0)
-		return '\n'.join(formatted_text)
+		return formatted_lines
 
 	def get_file_upload_element(self, check_siblings: bool = True) -> Optional['DOMElementNode']:
 		# Check if current element is a file input
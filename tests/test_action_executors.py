@@ -0,0 +1,125 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from browser_use.controller.registry.executors import (
+	ProcessPoolActionExecutor,
+	ThreadPoolActionExecutor,
+	get_action_executor_stats,
+)
+from browser_use.controller.registry.service import Registry
+
+# run with:
+# python -m pytest tests/test_action_executors.py
+
+
+def sum_of_squares(n: int) -> dict:
+	# defined at module level, so the process pool can unpickle it
+	return {'pid': os.getpid(), 'result': sum(i * i for i in range(n))}
+
+
+@pytest.mark.asyncio
+async def test_named_bounded_thread_pool_queues_calls():
+	registry = Registry()
+
+	@registry.action('Slow parse', executor=ThreadPoolActionExecutor('test-bounded', max_workers=1))
+	def slow_parse(value: str):
+		time.sleep(0.1)
+		return threading.current_thread().name
+
+	thread_names = await asyncio.gather(*[registry.execute_action('slow_parse', {'value': 'x'}) for _ in range(3)])
+
+	assert all(name.startswith('browser_use_test-bounded') for name in thread_names)
+	stats = get_action_executor_stats()['test-bounded']
+	assert stats.submitted == stats.completed == 3
+	assert stats.queued == 0
+	assert stats.max_queued >= 2
+	assert stats.max_wait_time >= 0.15
+
+
+@pytest.mark.asyncio
+async def test_inline_executor_runs_on_the_event_loop():
+	registry = Registry()
+
+	@registry.action('Trivial', executor='inline')
+	def trivial():
+		return threading.get_ident()
+
+	assert await registry.execute_action('trivial', {}) == threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_process_executor_pickles_params_and_results():
+	registry = Registry()
+	executor = ProcessPoolActionExecutor('test-process', max_workers=1)
+	registry.action('Crunch numbers', executor=executor)(sum_of_squares)
+
+	try:
+		result = await registry.execute_action('sum_of_squares', {'n': 1000})
+	finally:
+		executor.shutdown()
+
+	assert result['result'] == sum(i * i for i in range(1000))
+	assert result['pid'] != os.getpid()
+	assert executor.stats.completed == 1
+	assert executor.stats.queued == 0
+
+
+def test_invalid_executor_registrations():
+	registry = Registry()
+
+	with pytest.raises(ValueError, match='Unknown action executor'):
+		registry.action('Unknown executor', executor='does-not-exist')(sum_of_squares)
+
+	with pytest.raises(ValueError, match='can not be passed to another process'):
+
+		@registry.action('Needs the browser', requires_browser=True, executor='process')
+		def needs_browser(browser):
+			pass
+
+
+@pytest.mark.asyncio
+async def test_replacing_an_executor_keeps_earlier_actions_working():
+	registry = Registry()
+
+	@registry.action('First', executor=ThreadPoolActionExecutor('test-replaced', max_workers=1))
+	def first():
+		return threading.current_thread().name
+
+	replacement = ThreadPoolActionExecutor('test-replaced', max_workers=1)
+
+	@registry.action('Second', executor=replacement)
+	def second():
+		return threading.current_thread().name
+
+	assert (await registry.execute_action('first', {})).startswith('browser_use_test-replaced')
+	assert (await registry.execute_action('second', {})).startswith('browser_use_test-replaced')
+	assert replacement.stats.completed == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_queued_calls_leave_the_queue():
+	registry = Registry()
+	executor = ThreadPoolActionExecutor('test-cancelled', max_workers=1)
+	release = threading.Event()
+
+	@registry.action('Blocking', executor=executor)
+	def blocking():
+		release.wait(5)
+
+	running = asyncio.create_task(registry.execute_action('blocking', {}))
+	queued = asyncio.create_task(registry.execute_action('blocking', {}))
+	await asyncio.sleep(0.1)
+	assert executor.stats.queued == 1
+
+	queued.cancel()
+	with pytest.raises(asyncio.CancelledError):
+		await queued
+	release.set()
+	await running
+
+	assert executor.stats.queued == 0
+	assert executor.stats.submitted == executor.stats.completed == 2
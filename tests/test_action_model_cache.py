@@ -0,0 +1,61 @@
+from unittest.mock import Mock, patch
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from pydantic import BaseModel
+
+from browser_use.agent.service import Agent
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.controller.registry.service import Registry
+from browser_use.controller.service import Controller
+
+# run with:
+# python -m pytest tests/test_action_model_cache.py
+
+
+class GreetParams(BaseModel):
+	name: str
+
+
+def _registry() -> Registry:
+	registry = Registry()
+
+	@registry.action('Greet someone', param_model=GreetParams)
+	def greet(params: GreetParams):
+		return f'hello {params.name}'
+
+	return registry
+
+
+def _agent(controller: Controller) -> Agent:
+	llm = Mock(spec=BaseChatModel)
+	return Agent(
+		task='Test task', llm=llm, controller=controller, browser=Mock(spec=Browser, config=BrowserConfig()), generate_gif=False
+	)
+
+
+def test_registries_with_the_same_actions_share_the_action_model():
+	first, second = _registry(), _registry()
+
+	assert first.registry.fingerprint() == second.registry.fingerprint()
+	assert first.create_action_model() is second.create_action_model()
+
+	@second.action('Wave at someone', param_model=GreetParams)
+	def wave(params: GreetParams):
+		return f'waving at {params.name}'
+
+	second_model = second.create_action_model()
+	assert second_model is not first.create_action_model()
+	assert set(second_model.model_fields) == {'greet', 'wave'}
+
+
+def test_agents_with_a_shared_controller_reuse_models_and_schemas():
+	controller = Controller()
+	first = _agent(controller)
+
+	with patch.object(BaseModel, 'model_json_schema') as model_json_schema:
+		second = _agent(controller)
+
+	model_json_schema.assert_not_called()
+	assert second.ActionModel is first.ActionModel
+	assert second.AgentOutput is first.AgentOutput
+	assert second.message_manager.action_descriptions == first.message_manager.action_descriptions
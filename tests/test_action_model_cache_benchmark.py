@@ -0,0 +1,49 @@
+"""
+Benchmark of constructing agents that share one controller, with and without the action model cache.
+
+run with:
+python -m pytest tests/test_action_model_cache_benchmark.py -s -m slow
+"""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from browser_use.agent.service import Agent
+from browser_use.agent.views import AgentOutput
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.controller.registry import service as registry_service
+from browser_use.controller.registry import views as registry_views
+from browser_use.controller.service import Controller
+
+AGENTS = 100
+
+
+def _clear_caches():
+	registry_service._create_action_model.cache_clear()
+	registry_views.get_param_model_schema.cache_clear()
+	registry_views._action_prompt_description.cache_clear()
+	AgentOutput.type_with_custom_actions.cache_clear()
+
+
+def _time_agent_construction(controller: Controller, clear_caches: bool) -> float:
+	browser = Mock(spec=Browser, config=BrowserConfig())
+	start = time.perf_counter()
+	for _ in range(AGENTS):
+		if clear_caches:
+			_clear_caches()
+		Agent(task='Benchmark', llm=Mock(spec=BaseChatModel), controller=controller, browser=browser, generate_gif=False)
+	return (time.perf_counter() - start) / AGENTS
+
+
+@pytest.mark.slow
+def test_action_model_cache_benchmark():
+	controller = Controller()
+
+	uncached = _time_agent_construction(controller, clear_caches=True)
+	cached = _time_agent_construction(controller, clear_caches=False)
+
+	print(f'\nAgent construction: uncached {uncached * 1000:.2f}ms, cached {cached * 1000:.2f}ms')
+	assert cached < uncached
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from browser_use.agent.views import ActionResult
+from browser_use.controller.registry.service import Registry
+
+# run with:
+# python -m pytest tests/test_action_timeouts.py
+
+
+@pytest.mark.asyncio
+async def test_action_is_cancelled_after_its_timeout():
+	registry = Registry(default_timeout=10)
+	cancelled = asyncio.Event()
+
+	@registry.action('Hangs forever', timeout=0.1)
+	async def hang():
+		try:
+			await asyncio.sleep(60)
+		except asyncio.CancelledError:
+			cancelled.set()
+			raise
+
+	result = await asyncio.wait_for(registry.execute_action('hang', {}), 2)
+
+	assert isinstance(result, ActionResult)
+	assert result.error == 'Action hang timed out after 0.1s and was cancelled'
+	assert cancelled.is_set()
+	assert registry.metrics.timeouts == {'hang': 1}
+	assert registry.metrics.total_timeouts == 1
+
+
+@pytest.mark.asyncio
+async def test_default_timeout_applies_to_actions_without_their_own():
+	registry = Registry(default_timeout=0.1)
+
+	@registry.action('Slow')
+	async def slow():
+		await asyncio.sleep(60)
+
+	@registry.action('Fast')
+	async def fast():
+		return ActionResult(extracted_content='done')
+
+	assert (await registry.execute_action('slow', {})).error
+	assert (await registry.execute_action('fast', {})).extracted_content == 'done'
+	assert registry.metrics.executions == {'slow': 1, 'fast': 1}
+	assert registry.metrics.timeouts == {'slow': 1}
+
+
+@pytest.mark.asyncio
+async def test_timeouts_raised_by_the_action_are_errors():
+	registry = Registry(default_timeout=5)
+
+	@registry.action('Raises its own timeout')
+	async def flaky():
+		raise TimeoutError('upstream timed out')
+
+	with pytest.raises(RuntimeError, match='upstream timed out'):
+		await registry.execute_action('flaky', {})
+	assert registry.metrics.total_timeouts == 0
@@ -0,0 +1,72 @@
+import asyncio
+import time
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import HumanMessage
+
+from browser_use.agent.service import Agent
+from browser_use.agent.views import AgentBrain
+from browser_use.browser.browser import Browser, BrowserConfig
+
+# run with:
+# python -m pytest tests/test_async_llm.py
+
+LATENCY = 1.0
+
+
+def _agent(structured_llm) -> Agent:
+	llm = Mock(spec=BaseChatModel)
+	llm.with_structured_output = Mock(return_value=structured_llm)
+	return Agent(task='Test task', llm=llm, browser=Mock(spec=Browser, config=BrowserConfig()), generate_gif=False)
+
+
+def _response(agent: Agent) -> dict:
+	brain = AgentBrain(evaluation_previous_goal='', memory='', next_goal='')
+	return {'parsed': agent.AgentOutput(current_state=brain, action=[])}
+
+
+async def _time_concurrent_steps(agents: list[Agent]) -> float:
+	start = time.perf_counter()
+	await asyncio.gather(*[agent.get_next_action([HumanMessage(content='state')]) for agent in agents])
+	return time.perf_counter() - start
+
+
+@pytest.mark.asyncio
+async def test_concurrent_agents_do_not_block_each_other():
+	agents = []
+	for _ in range(10):
+		structured_llm = Mock()
+
+		async def ainvoke(messages, agent_index=len(agents)):
+			await asyncio.sleep(LATENCY)
+			return _response(agents[agent_index])
+
+		structured_llm.ainvoke = ainvoke
+		agents.append(_agent(structured_llm))
+
+	elapsed = await _time_concurrent_steps(agents)
+
+	# ten 1s model calls overlap instead of taking 10s
+	assert LATENCY <= elapsed < 2 * LATENCY
+
+
+@pytest.mark.asyncio
+async def test_sync_only_clients_run_in_a_thread():
+	agents = []
+	# stays within the default thread pool of the event loop, which has at least 5 workers
+	for _ in range(4):
+		structured_llm = Mock()
+		structured_llm.ainvoke = Mock(side_effect=NotImplementedError)
+
+		def invoke(messages, agent_index=len(agents)):
+			time.sleep(LATENCY)
+			return _response(agents[agent_index])
+
+		structured_llm.invoke = invoke
+		agents.append(_agent(structured_llm))
+
+	elapsed = await _time_concurrent_steps(agents)
+
+	assert LATENCY <= elapsed < 2 * LATENCY
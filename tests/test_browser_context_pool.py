@@ -0,0 +1,179 @@
+import asyncio
+import uuid
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from browser_use.agent.service import Agent
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContext
+from browser_use.browser.pool import BrowserContextPool, BrowserPool
+
+# run with:
+# python -m pytest tests/test_browser_context_pool.py
+
+
+def _fake_context() -> Mock:
+	context = Mock(spec=BrowserContext)
+	context.context_id = str(uuid.uuid4())
+	context.session = Mock()
+	context.close = AsyncMock()
+	return context
+
+
+@pytest.fixture
+def pool():
+	pool = BrowserContextPool(browser=Mock(spec=Browser, config=BrowserConfig()), size=2)
+	pool._create_context = AsyncMock(side_effect=lambda: _fake_context())  # type: ignore
+	return pool
+
+
+@pytest.mark.asyncio
+async def test_acquire_hits_warm_contexts(pool: BrowserContextPool):
+	await pool.start()
+	assert len(pool._idle) == 2
+
+	first = await pool.acquire()
+	second = await pool.acquire()
+	third = await pool.acquire()
+
+	assert len({first.context_id, second.context_id, third.context_id}) == 3
+	assert pool.metrics.acquired == 3
+	assert pool.metrics.hits >= 2
+	assert pool.metrics.hit_rate >= 2 / 3
+
+	# background replenishing brings the pool back to its size
+	await asyncio.gather(*pool._tasks)
+	assert len(pool._idle) == 2
+	await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_release_recycles_or_resets(pool: BrowserContextPool):
+	await pool.start()
+	context = await pool.acquire()
+	await pool.release(context)
+	context.close.assert_awaited_once()
+	assert pool.metrics.recycled == 1
+
+	pool.reset_on_release = True
+	pool._reset_context = AsyncMock()  # type: ignore
+	await asyncio.gather(*pool._tasks)
+	context = await pool.acquire()
+	await pool.release(context)
+	context.close.assert_not_awaited()
+	assert pool.metrics.reset == 1
+	assert context in pool._idle
+	await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_agent_acquires_and_releases_from_pool(pool: BrowserContextPool):
+	agent = Agent(task='Test task', llm=Mock(spec=BaseChatModel), browser_context_pool=pool, generate_gif=False)
+	assert agent.browser_context is None
+	assert agent.browser is pool.browser
+
+	with patch.object(agent, 'step', AsyncMock()):
+		await agent.run(max_steps=1)
+
+	assert pool.metrics.acquired == 1
+	assert pool.metrics.recycled == 1
+	assert agent.browser_context is None
+	await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_rerun_history_releases_its_context(pool: BrowserContextPool):
+	agent = Agent(task='Test task', llm=Mock(spec=BaseChatModel), browser_context_pool=pool, generate_gif=False)
+	history = Mock(history=[Mock(model_output=Mock(action=[Mock()]))])
+
+	with patch.object(agent, '_execute_history_step', AsyncMock(side_effect=ValueError('Replay failed'))):
+		with pytest.raises(RuntimeError, match='Replay failed'):
+			await agent.rerun_history(history, max_retries=1, skip_failures=False)
+
+	assert pool.metrics.acquired == 1
+	assert pool.metrics.recycled == 1
+	assert agent.browser_context is None
+	await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_rerun_history_keeps_the_agents_own_context_open():
+	agent = Agent(
+		task='Test task', llm=Mock(spec=BaseChatModel), browser=Mock(spec=Browser, config=BrowserConfig()), generate_gif=False
+	)
+	browser_context = agent.browser_context
+	browser_context.close = AsyncMock()  # type: ignore
+
+	with patch.object(agent, '_execute_history_step', AsyncMock(return_value=[])):
+		await agent.rerun_history(Mock(history=[Mock(model_output=Mock(action=[Mock()]))]))
+
+	browser_context.close.assert_not_awaited()
+	assert agent.browser_context is browser_context
+
+
+def _fake_playwright_browser(contexts: int = 0) -> Mock:
+	playwright_browser = Mock()
+	playwright_browser.contexts = [Mock() for _ in range(contexts)]
+	playwright_browser.is_connected = Mock(return_value=True)
+	return playwright_browser
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_picks_least_loaded_shard():
+	pool = BrowserPool(config=BrowserConfig(headless=True), size=3)
+	for shard, contexts in zip(pool.shards, [2, 0, 1]):
+		shard.playwright_browser = _fake_playwright_browser(contexts)
+
+	assert await pool.get_playwright_browser() is pool.shards[1].playwright_browser
+
+	# ties are spread round robin
+	for shard in pool.shards:
+		shard.playwright_browser.contexts = []
+	picked = [pool._pick_shard() for _ in range(3)]
+	assert sorted(picked) == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_restarts_disconnected_shard():
+	pool = BrowserPool(config=BrowserConfig(headless=True), size=2)
+	crashed = _fake_playwright_browser()
+	restarted = _fake_playwright_browser()
+	shard = pool.shards[0]
+	shard.playwright_browser = crashed
+
+	async def fake_close():
+		shard.playwright_browser = None
+
+	shard.close = fake_close  # type: ignore
+	shard.get_playwright_browser = AsyncMock(return_value=restarted)  # type: ignore
+
+	pool._on_shard_disconnected(0, crashed)
+	await asyncio.gather(*pool._tasks)
+
+	assert pool.restarts == [1, 0]
+	shard.get_playwright_browser.assert_awaited_once()
+	stats = await pool.get_stats()
+	assert [s.restarts for s in stats] == [1, 0]
+	assert stats[1].connected is False
+
+
+@pytest.mark.asyncio
+async def test_browser_pool_launches_a_shard_once():
+	pool = BrowserPool(config=BrowserConfig(headless=True), size=1)
+	shard = pool.shards[0]
+	launched = _fake_playwright_browser()
+
+	async def slow_launch():
+		await asyncio.sleep(0.05)
+		shard.playwright_browser = launched
+		return launched
+
+	shard.get_playwright_browser = AsyncMock(side_effect=slow_launch)  # type: ignore
+
+	browsers = await asyncio.gather(*[pool.get_playwright_browser() for _ in range(5)])
+
+	assert all(browser is launched for browser in browsers)
+	shard.get_playwright_browser.assert_awaited_once()
+	launched.on.assert_called_once()
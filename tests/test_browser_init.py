@@ -0,0 +1,110 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+
+from browser_use.agent.service import Agent
+from browser_use.browser.browser import Browser, BrowserConfig, _acquire_shared_playwright, _release_shared_playwright
+
+# run with:
+# python -m pytest tests/test_browser_init.py
+
+
+def _fake_playwright_browser() -> Mock:
+	"""Playwright browser whose contexts open a blank page"""
+
+	async def new_context(**kwargs):
+		context = MagicMock()
+		context.pages = []
+		context.add_init_script = AsyncMock()
+		context.new_page = AsyncMock(return_value=Mock(url='about:blank'))
+		return context
+
+	playwright_browser = Mock()
+	playwright_browser.new_context = AsyncMock(side_effect=new_context)
+	playwright_browser.close = AsyncMock()
+	return playwright_browser
+
+
+@pytest.fixture
+def fake_playwright():
+	"""Patch the Playwright driver and count driver starts and browser launches"""
+	driver = Mock()
+	driver.stop = AsyncMock()
+	starter = Mock()
+	starter.start = AsyncMock(return_value=driver)
+
+	async def slow_launch(self, playwright):
+		# give all waiting agents the chance to race for the browser
+		await asyncio.sleep(0.05)
+		return _fake_playwright_browser()
+
+	with (
+		patch('browser_use.browser.browser.async_playwright', return_value=starter),
+		patch.object(Browser, '_setup_browser', autospec=True, side_effect=slow_launch) as launch,
+	):
+		yield starter, driver, launch
+
+
+@pytest.mark.asyncio
+async def test_concurrent_agents_launch_browser_once(fake_playwright):
+	starter, _, launch = fake_playwright
+	browser = Browser(config=BrowserConfig(headless=True))
+	agents = [Agent(task=f'Task {i}', llm=Mock(spec=BaseChatModel), browser=browser, generate_gif=False) for i in range(20)]
+
+	sessions = await asyncio.gather(*[agent.browser_context.get_session() for agent in agents])
+
+	assert len(sessions) == 20
+	assert starter.start.await_count == 1
+	assert launch.call_count == 1
+	await asyncio.gather(*[agent.browser_context.close() for agent in agents])
+	await browser.close()
+
+
+@pytest.mark.asyncio
+async def test_shared_playwright_driver(fake_playwright):
+	starter, driver, launch = fake_playwright
+	browsers = [Browser(config=BrowserConfig(headless=True, share_playwright=True)) for _ in range(3)]
+
+	await asyncio.gather(*[browser.get_playwright_browser() for browser in browsers])
+
+	# one driver, but every Browser has its own browser process
+	assert starter.start.await_count == 1
+	assert launch.call_count == 3
+	assert len({id(browser.playwright_browser) for browser in browsers}) == 3
+
+	for browser in browsers[:-1]:
+		await browser.close()
+	driver.stop.assert_not_awaited()
+	await browsers[-1].close()
+	driver.stop.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_shared_playwright_driver_restarts_once(fake_playwright):
+	starter, driver, _ = fake_playwright
+
+	async def slow_start():
+		await asyncio.sleep(0.05)
+		return driver
+
+	async def slow_stop():
+		await asyncio.sleep(0.05)
+
+	starter.start = AsyncMock(side_effect=slow_start)
+	driver.stop = AsyncMock(side_effect=slow_stop)
+
+	await _acquire_shared_playwright()
+	release = asyncio.create_task(_release_shared_playwright())
+	await asyncio.sleep(0)
+	# waits for the release to stop the driver, then starts a new one
+	waiting = asyncio.create_task(_acquire_shared_playwright())
+	await release
+	late = asyncio.create_task(_acquire_shared_playwright())
+	await asyncio.gather(waiting, late)
+
+	assert starter.start.await_count == 2
+	await _release_shared_playwright()
+	await _release_shared_playwright()
+	assert driver.stop.await_count == 2
@@ -0,0 +1,213 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from browser_use.browser.browser import Browser
+from browser_use.browser.context import FOCUS_HIGHLIGHT_SCRIPT, REMOVE_HIGHLIGHTS_SCRIPT, BrowserContext, BrowserContextConfig
+from browser_use.controller.service import Controller
+from browser_use.dom.views import DOMElementNode
+
+# run with:
+# python -m pytest tests/test_element_locator.py
+
+
+def _element(extraction_id: str | None = 'extraction-1') -> DOMElementNode:
+	return DOMElementNode(
+		tag_name='button',
+		xpath='html/body/div/button',
+		attributes={'class': 'primary btn', 'type': 'submit'},
+		children=[],
+		is_visible=True,
+		parent=None,
+		highlight_index=3,
+		extraction_id=extraction_id,
+	)
+
+
+def _context_with_page(page) -> BrowserContext:
+	context = BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig())
+	context.get_current_page = AsyncMock(return_value=page)  # type: ignore
+	return context
+
+
+@pytest.mark.asyncio
+async def test_extracted_element_is_resolved_without_selector():
+	element_handle = Mock(scroll_into_view_if_needed=AsyncMock())
+	page = Mock(evaluate_handle=AsyncMock(return_value=Mock(as_element=Mock(return_value=element_handle))))
+	page.query_selector = AsyncMock()
+	context = _context_with_page(page)
+
+	assert await context.get_locate_element(_element()) is element_handle
+	assert page.evaluate_handle.await_args.args[1] == ['extraction-1', 3]
+	page.query_selector.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_stale_extraction_falls_back_to_selector():
+	element_handle = Mock(scroll_into_view_if_needed=AsyncMock())
+	# the page was reloaded or extracted again, the element map does not know the extraction anymore
+	stale_handle = Mock(as_element=Mock(return_value=None), dispose=AsyncMock())
+	page = Mock(evaluate_handle=AsyncMock(return_value=stale_handle))
+	page.query_selector = AsyncMock(return_value=element_handle)
+	context = _context_with_page(page)
+
+	assert await context.get_locate_element(_element()) is element_handle
+	stale_handle.dispose.assert_awaited_once()
+	page.query_selector.assert_awaited_once_with('html > body > div > button.primary.btn[type="submit"]')
+
+	page.evaluate_handle.reset_mock()
+	assert await context.get_locate_element(_element(extraction_id=None)) is element_handle
+	page.evaluate_handle.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_element_handles_are_cached_until_next_extraction():
+	element_handle = Mock(scroll_into_view_if_needed=AsyncMock(), dispose=AsyncMock())
+	page = Mock(evaluate_handle=AsyncMock(return_value=Mock(as_element=Mock(return_value=element_handle))))
+	context = _context_with_page(page)
+	element = _element()
+
+	assert await context.get_locate_element(element) is element_handle
+	assert await context.get_locate_element(element) is element_handle
+	page.evaluate_handle.assert_awaited_once()
+
+	# a new extraction disposes the handles of the previous one
+	context._wait_for_page_and_frames_load = AsyncMock()  # type: ignore
+	context._update_state = AsyncMock()  # type: ignore
+	context.get_session = AsyncMock(return_value=Mock())  # type: ignore
+	await context.get_state()
+
+	element_handle.dispose.assert_awaited_once()
+	assert await context.get_locate_element(element) is element_handle
+	assert page.evaluate_handle.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_replaced_element_is_located_again():
+	removed_handle = Mock(scroll_into_view_if_needed=AsyncMock(), dispose=AsyncMock())
+	replacement_handle = Mock(scroll_into_view_if_needed=AsyncMock())
+	page = Mock(evaluate_handle=AsyncMock(return_value=Mock(as_element=Mock(return_value=removed_handle))))
+	context = _context_with_page(page)
+	element = _element()
+
+	assert await context.get_locate_element(element) is removed_handle
+
+	# the page re-rendered the button, the cached handle points at the removed node
+	removed_handle.scroll_into_view_if_needed.side_effect = Exception('Element is not attached to the DOM')
+	page.evaluate_handle.return_value = Mock(as_element=Mock(return_value=replacement_handle))
+	assert await context.get_locate_element(element) is replacement_handle
+	removed_handle.dispose.assert_awaited_once()
+	assert page.evaluate_handle.await_count == 2
+
+	assert await context.get_locate_element(element) is replacement_handle
+	assert page.evaluate_handle.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_click_on_a_removed_element_locates_it_again():
+	removed_handle = Mock(click=AsyncMock(side_effect=Exception('Element is not attached to the DOM')), dispose=AsyncMock())
+	replacement_handle = Mock(click=AsyncMock())
+	page = Mock(url='https://example.com', evaluate=AsyncMock(), wait_for_load_state=AsyncMock())
+	context = _context_with_page(page)
+	context.get_locate_element = AsyncMock(side_effect=[removed_handle, replacement_handle])  # type: ignore
+
+	await context._click_element_node(_element())
+
+	replacement_handle.click.assert_awaited_once()
+	# no JS click on the removed node
+	page.evaluate.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_select_dropdown_option_uses_element_handle():
+	element_handle = Mock(select_option=AsyncMock(return_value=['pro']))
+	element = _element()
+	element.tag_name = 'select'
+	page = Mock(frames=[])
+	context = _context_with_page(page)
+	context.get_selector_map = AsyncMock(return_value={3: element})  # type: ignore
+	context.get_locate_element = AsyncMock(return_value=element_handle)  # type: ignore
+
+	controller = Controller()
+	result = await controller.registry.execute_action('select_dropdown_option', {'index': 3, 'text': 'Pro'}, browser=context)
+
+	element_handle.select_option.assert_awaited_once_with(label='Pro', timeout=1000)
+	assert result.extracted_content == "selected option Pro with value ['pro']"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('highlight_elements', [True, False])
+async def test_click_draws_focus_overlay_without_extraction(highlight_elements):
+	element_handle = Mock(click=AsyncMock(), evaluate=AsyncMock())
+	page = Mock(url='https://example.com', evaluate=AsyncMock(), wait_for_load_state=AsyncMock())
+	context = BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig(highlight_elements=highlight_elements))
+	context.get_current_page = AsyncMock(return_value=page)  # type: ignore
+	context.get_locate_element = AsyncMock(return_value=element_handle)  # type: ignore
+	context._update_state = AsyncMock()  # type: ignore
+
+	await context._click_element_node(_element())
+
+	context._update_state.assert_not_awaited()
+	element_handle.click.assert_awaited_once()
+	if highlight_elements:
+		element_handle.evaluate.assert_awaited_once_with(FOCUS_HIGHLIGHT_SCRIPT, 3)
+	else:
+		element_handle.evaluate.assert_not_awaited()
+
+
+def _iframe_element() -> DOMElementNode:
+	element = _element()
+	iframe = DOMElementNode(
+		tag_name='iframe', xpath='html/body/iframe', attributes={}, children=[element], is_visible=True, parent=None
+	)
+	element.parent = iframe
+	return element
+
+
+@pytest.mark.asyncio
+async def test_focus_highlight_only_clears_highlighted_frames():
+	main_frame = Mock(evaluate=AsyncMock())
+	iframe = Mock(evaluate=AsyncMock())
+	other_frame = Mock(evaluate=AsyncMock())
+	context = _context_with_page(Mock(main_frame=main_frame, frames=[main_frame, iframe, other_frame]))
+
+	# in the main document the overlay script clears the old highlights itself
+	main_element = Mock(evaluate=AsyncMock())
+	await context._highlight_focus_element(_element(), main_element)
+	main_frame.evaluate.assert_not_awaited()
+	main_element.evaluate.assert_awaited_once_with(FOCUS_HIGHLIGHT_SCRIPT, 3)
+
+	# in an iframe the highlights of the main document are cleared, and the iframe is remembered
+	iframe_element = Mock(evaluate=AsyncMock(), owner_frame=AsyncMock(return_value=iframe))
+	await context._highlight_focus_element(_iframe_element(), iframe_element)
+	main_frame.evaluate.assert_awaited_once_with(REMOVE_HIGHLIGHTS_SCRIPT)
+	iframe.evaluate.assert_not_awaited()
+
+	# back in the main document only the iframe is cleared
+	main_frame.evaluate.reset_mock()
+	await context._highlight_focus_element(_element(), main_element)
+	iframe.evaluate.assert_awaited_once_with(REMOVE_HIGHLIGHTS_SCRIPT)
+	main_frame.evaluate.assert_not_awaited()
+
+	await context.remove_highlights()
+	main_frame.evaluate.assert_awaited_once_with(REMOVE_HIGHLIGHTS_SCRIPT)
+	assert iframe.evaluate.await_count == 1
+	other_frame.evaluate.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_remove_highlights_clears_the_focused_iframe():
+	main_frame = Mock(evaluate=AsyncMock())
+	# a detached frame does not stop the others from being cleared
+	iframe = Mock(evaluate=AsyncMock(side_effect=Exception('Frame was detached')))
+	context = _context_with_page(Mock(main_frame=main_frame, frames=[main_frame, iframe]))
+	await context._highlight_focus_element(
+		_iframe_element(), Mock(evaluate=AsyncMock(), owner_frame=AsyncMock(return_value=iframe))
+	)
+	main_frame.evaluate.reset_mock()
+
+	await context.remove_highlights()
+
+	main_frame.evaluate.assert_awaited_once_with(REMOVE_HIGHLIGHTS_SCRIPT)
+	iframe.evaluate.assert_awaited_once_with(REMOVE_HIGHLIGHTS_SCRIPT)
+	assert not context._highlighted_frames
@@ -0,0 +1,80 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from browser_use.browser.browser import Browser
+from browser_use.browser.context import FILL_FORM_BATCH_SCRIPT, FILL_FORM_FIELD_SCRIPT, BrowserContext, BrowserContextConfig
+from browser_use.controller.service import Controller
+from browser_use.dom.views import DOMElementNode
+
+# run with:
+# python -m pytest tests/test_fill_form.py
+
+
+def _element(index: int, tag_name: str, extraction_id: str | None = 'extraction-1', **attributes: str) -> DOMElementNode:
+	return DOMElementNode(
+		tag_name=tag_name,
+		xpath=f'html/body/form/{tag_name}[{index}]',
+		attributes=attributes,
+		children=[],
+		is_visible=True,
+		parent=None,
+		highlight_index=index,
+		extraction_id=extraction_id,
+	)
+
+
+def _context(page, selector_map: dict) -> BrowserContext:
+	context = BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig())
+	context.get_current_page = AsyncMock(return_value=page)  # type: ignore
+	context.get_session = AsyncMock(return_value=Mock(cached_state=Mock(selector_map=selector_map)))  # type: ignore
+	return context
+
+
+@pytest.mark.asyncio
+async def test_fill_form_applies_fields_in_one_evaluation():
+	selector_map = {1: _element(1, 'input'), 2: _element(2, 'select'), 3: _element(3, 'input', type='checkbox')}
+	page = Mock(wait_for_load_state=AsyncMock())
+	page.evaluate = AsyncMock(
+		return_value=[
+			{'success': True, 'message': 'entered "Jane"'},
+			{'success': True, 'message': 'selected "Pro"'},
+			{'success': True, 'message': 'checked'},
+		]
+	)
+	context = _context(page, selector_map)
+
+	result = await Controller().registry.execute_action(
+		'fill_form',
+		{'fields': [{'index': 1, 'value': 'Jane'}, {'index': 2, 'value': 'Pro'}, {'index': 3, 'value': 'true'}]},
+		browser=context,
+	)
+
+	page.evaluate.assert_awaited_once_with(FILL_FORM_BATCH_SCRIPT, ['extraction-1', [[1, 'Jane'], [2, 'Pro'], [3, 'true']]])
+	assert result.error is None
+	assert result.extracted_content.startswith('📝  Filled 3/3 form fields')
+	assert '✅ index 2: selected "Pro"' in result.extracted_content
+
+
+@pytest.mark.asyncio
+async def test_unresolved_fields_are_filled_one_by_one():
+	# the second field is inside an iframe and not part of the in-page element map
+	selector_map = {1: _element(1, 'input'), 2: _element(2, 'input', extraction_id=None)}
+	page = Mock(wait_for_load_state=AsyncMock())
+	page.evaluate = AsyncMock(return_value=[{'success': True, 'message': 'entered "Jane"'}, None])
+	element_handle = Mock(evaluate=AsyncMock(return_value={'success': False, 'message': 'field is disabled or read only'}))
+	context = _context(page, selector_map)
+	context.get_locate_element = AsyncMock(return_value=element_handle)  # type: ignore
+
+	results = await context.fill_form_fields([(selector_map[1], 'Jane'), (selector_map[2], 'Doe')])
+
+	assert page.evaluate.await_args.args[1] == ['extraction-1', [[1, 'Jane'], [-1, 'Doe']]]
+	element_handle.evaluate.assert_awaited_once_with(FILL_FORM_FIELD_SCRIPT, 'Doe')
+	assert [(r.index, r.success) for r in results] == [(1, True), (2, False)]
+
+
+@pytest.mark.asyncio
+async def test_fill_form_rejects_unknown_indices():
+	context = _context(Mock(), {1: _element(1, 'input')})
+	with pytest.raises(Exception, match=r'\[7\]'):
+		await Controller().registry.execute_action('fill_form', {'fields': [{'index': 7, 'value': 'x'}]}, browser=context)
@@ -0,0 +1,175 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+
+from browser_use.agent.message_manager.service import MessageManager
+from browser_use.agent.prompts import SystemPrompt
+from browser_use.agent.service import Agent
+from browser_use.agent.views import ActionResult, AgentBrain, AgentOutput
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.views import BrowserState, TabInfo
+from browser_use.controller.registry.service import Registry
+from browser_use.dom.views import DOMElementNode
+
+# run with:
+# python -m pytest tests/test_history_compaction.py
+
+registry = Registry()
+
+
+@registry.action('Click element')
+def click_element(index: int):
+	pass
+
+
+ActionModel = registry.create_action_model()
+AgentOutputModel = AgentOutput.type_with_custom_actions(ActionModel)
+
+
+def _message_manager(max_history_steps: int, summary_llm=None) -> MessageManager:
+	return MessageManager(
+		llm=Mock(spec=BaseChatModel),
+		task='Test task',
+		action_descriptions='Test actions',
+		system_prompt_class=SystemPrompt,
+		max_history_steps=max_history_steps,
+		summary_llm=summary_llm,
+	)
+
+
+def _state(step: int) -> BrowserState:
+	url = f'https://example.com/{step}'
+	return BrowserState(
+		url=url,
+		title='Test Page',
+		element_tree=DOMElementNode(tag_name='div', attributes={}, children=[], is_visible=True, parent=None, xpath='//div'),
+		selector_map={},
+		tabs=[TabInfo(page_id=1, url=url, title='Test Page')],
+	)
+
+
+def _run_step(message_manager: MessageManager, step: int) -> None:
+	result = [ActionResult(extracted_content=f'content of step {step - 1}', include_in_memory=True)] if step > 1 else None
+	message_manager.add_state_message(_state(step), result)
+	message_manager.get_messages()
+	message_manager._remove_last_state_message()
+	brain = AgentBrain(evaluation_previous_goal='', memory='', next_goal=f'goal {step}')
+	action = ActionModel(click_element={'index': step})  # type: ignore
+	message_manager.add_model_output(AgentOutputModel(current_state=brain, action=[action]))
+
+
+def test_old_steps_are_folded_into_a_summary():
+	message_manager = _message_manager(max_history_steps=3)
+	prefix = [m.message.model_dump() for m in message_manager.history.messages]
+
+	for step in range(1, 11):
+		_run_step(message_manager, step)
+
+	messages = message_manager.get_messages()
+	prefix_length = message_manager.prefix_length
+	assert [m.model_dump() for m in messages[:prefix_length]] == prefix
+
+	summary = messages[prefix_length].content
+	assert 'Step 1: goal 1 - actions: click_element' in summary
+	assert 'Step 7: goal 7' in summary
+	assert 'Step 8' not in summary
+	# results of a step are added with the next state, they are folded together with their step
+	assert 'Action result: content of step 7' in summary
+
+	kept = messages[prefix_length + 1 :]
+	assert len([m for m in kept if isinstance(m, AIMessage)]) == 3
+	assert 'goal 8' in str(kept[0].tool_calls)  # type: ignore
+	assert 'content of step 8' in kept[2].content
+
+
+def test_prompt_size_stays_flat_on_long_runs():
+	message_manager = _message_manager(max_history_steps=5)
+
+	sizes = {}
+	for step in range(1, 151):
+		_run_step(message_manager, step)
+		sizes[step] = (len(message_manager.history.messages), message_manager.history.total_tokens)
+
+	assert sizes[100][0] == sizes[150][0]
+	assert sizes[150][1] <= sizes[100][1] * 1.05
+
+
+@pytest.mark.asyncio
+async def test_summary_llm_condenses_in_the_background():
+	summary_llm = Mock(spec=BaseChatModel)
+	summary_llm.ainvoke = AsyncMock(return_value=AIMessage(content='Visited example.com pages 1 to 2.'))
+	message_manager = _message_manager(max_history_steps=2, summary_llm=summary_llm)
+
+	for step in range(1, 5):
+		_run_step(message_manager, step)
+	await message_manager._summary_task  # type: ignore
+
+	summary_llm.ainvoke.assert_awaited_once()
+	assert 'Step 1: goal 1' in summary_llm.ainvoke.await_args.args[0][1].content
+	summary = message_manager.get_messages()[message_manager.prefix_length].content
+	assert 'Visited example.com pages 1 to 2.' in summary
+	# lines folded while the call ran stay rule based until the next call
+	assert 'Step 1' not in summary
+	assert 'Step 2: goal 2' in summary
+
+
+@pytest.mark.asyncio
+async def test_failed_summary_call_keeps_rule_based_summary():
+	summary_llm = Mock(spec=BaseChatModel)
+	summary_llm.ainvoke = AsyncMock(side_effect=RuntimeError('rate limited'))
+	message_manager = _message_manager(max_history_steps=1, summary_llm=summary_llm)
+
+	for step in range(1, 4):
+		_run_step(message_manager, step)
+	await asyncio.gather(message_manager._summary_task)  # type: ignore
+
+	summary = message_manager.get_messages()[message_manager.prefix_length].content
+	assert 'Step 1: goal 1' in summary
+	assert 'Step 2: goal 2' in summary
+
+
+@pytest.mark.asyncio
+async def test_close_cancels_a_running_summary():
+	summary_llm = Mock(spec=BaseChatModel)
+	summary_llm.ainvoke = AsyncMock(side_effect=lambda messages: asyncio.sleep(60))
+	message_manager = _message_manager(max_history_steps=1, summary_llm=summary_llm)
+
+	for step in range(1, 4):
+		_run_step(message_manager, step)
+	task = message_manager._summary_task
+	summary = message_manager.get_messages()[message_manager.prefix_length].content
+
+	await message_manager.close()
+
+	assert task is not None and task.cancelled()
+	assert message_manager._summary_task is None
+	assert message_manager.get_messages()[message_manager.prefix_length].content == summary
+
+
+@pytest.mark.asyncio
+async def test_agent_run_closes_the_message_manager():
+	agent = Agent(
+		task='Test task',
+		llm=Mock(spec=BaseChatModel),
+		browser=Mock(spec=Browser, config=BrowserConfig()),
+		generate_gif=False,
+	)
+
+	with patch.object(agent, 'step', AsyncMock()), patch.object(agent.message_manager, 'close', AsyncMock()) as close:
+		await agent.run(max_steps=1)
+
+	close.assert_awaited_once()
+
+
+def test_history_is_kept_without_limit():
+	message_manager = _message_manager(max_history_steps=None)  # type: ignore
+
+	for step in range(1, 6):
+		_run_step(message_manager, step)
+
+	messages = message_manager.get_messages()
+	assert len([m for m in messages[message_manager.prefix_length :] if isinstance(m, AIMessage)]) == 5
+	assert not any(isinstance(m, HumanMessage) and 'Summary of the earlier steps' in m.content for m in messages)
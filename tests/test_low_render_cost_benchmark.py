@@ -0,0 +1,123 @@
+"""
+Benchmark renderer CPU time per agent step with and without the low render cost preset.
+
+A step is simulated as get_state() followed by a pause that stands in for the LLM call, on local
+fixture pages with CSS animations, transitions and a long list of elements. CPU time is the renderer
+main thread TaskDuration reported by the Chrome DevTools Performance domain.
+
+run with:
+python -m pytest tests/test_low_render_cost_benchmark.py -s -m slow
+"""
+
+import asyncio
+
+import pytest
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContextConfig
+
+STEPS = 5
+THINK_TIME = 1.0
+
+ANIMATED_PAGE = """
+<html>
+<head>
+<style>
+	.spinner { width: 40px; height: 40px; border: 4px solid #333; border-top-color: transparent;
+		border-radius: 50%; animation: spin 0.6s linear infinite; display: inline-block; margin: 4px; }
+	@keyframes spin { to { transform: rotate(360deg); } }
+	.pulse { animation: pulse 1s ease-in-out infinite alternate; }
+	@keyframes pulse { from { opacity: 0.2; } to { opacity: 1; } }
+	button { transition: background-color 0.5s, transform 0.5s; }
+	button:hover { background-color: #f80; transform: scale(1.1); }
+</style>
+</head>
+<body>
+	<h1 class="pulse">Dashboard</h1>
+	<div id="spinners"></div>
+	<form>
+		<input name="name" placeholder="Name">
+		<select name="plan"><option>Basic</option><option>Pro</option></select>
+		<button type="button">Save</button>
+	</form>
+	<script>
+		const spinners = document.getElementById('spinners');
+		for (let i = 0; i < 60; i++) {
+			const el = document.createElement('div');
+			el.className = 'spinner';
+			spinners.appendChild(el);
+		}
+	</script>
+</body>
+</html>
+"""
+
+LONG_LIST_PAGE = """
+<html>
+<body>
+	<ul id="list"></ul>
+	<script>
+		const list = document.getElementById('list');
+		for (let i = 0; i < 500; i++) {
+			const li = document.createElement('li');
+			li.innerHTML = `<a href="#item-${i}" class="pulse" style="animation: fade 2s infinite">Item ${i}</a>`
+				+ ' <button>Open</button>';
+			list.appendChild(li);
+		}
+	</script>
+	<style>@keyframes fade { from { opacity: 0.5; } to { opacity: 1; } }</style>
+</body>
+</html>
+"""
+
+FIXTURE_URL = 'http://fixtures.test/page.html'
+FIXTURE_PAGES = {'animated': ANIMATED_PAGE, 'long_list': LONG_LIST_PAGE}
+
+
+async def _renderer_task_duration(cdp_session) -> float:
+	metrics = await cdp_session.send('Performance.getMetrics')
+	return next(m['value'] for m in metrics['metrics'] if m['name'] == 'TaskDuration')
+
+
+async def _cpu_time_per_step(browser_config: BrowserConfig, html: str) -> float:
+	browser = Browser(config=browser_config)
+	try:
+		async with await browser.new_context(browser_config.new_context_config) as context:
+			page = await context.get_current_page()
+			# serve the fixture through a route, so init scripts run like on a real navigation
+			await page.route(FIXTURE_URL, lambda route: route.fulfill(content_type='text/html', body=html))
+			await page.goto(FIXTURE_URL)
+
+			cdp_session = await page.context.new_cdp_session(page)
+			await cdp_session.send('Performance.enable')
+
+			start = await _renderer_task_duration(cdp_session)
+			for _ in range(STEPS):
+				await context.get_state()
+				await asyncio.sleep(THINK_TIME)
+			end = await _renderer_task_duration(cdp_session)
+
+			return (end - start) / STEPS
+	finally:
+		await browser.close()
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('fixture_name', list(FIXTURE_PAGES))
+async def test_low_render_cost_cpu_time_per_step(fixture_name):
+	html = FIXTURE_PAGES[fixture_name]
+
+	baseline = await _cpu_time_per_step(
+		BrowserConfig(headless=True, new_context_config=BrowserContextConfig(highlight_elements=False)),
+		html,
+	)
+	low_render_cost = await _cpu_time_per_step(
+		BrowserConfig.low_render_cost(new_context_config=BrowserContextConfig.low_render_cost(highlight_elements=False)),
+		html,
+	)
+
+	# only reported, renderer CPU time varies too much between machines to assert on
+	print(
+		f'\n{fixture_name}: renderer CPU per step {baseline * 1000:.1f}ms -> {low_render_cost * 1000:.1f}ms '
+		f'({(1 - low_render_cost / baseline) * 100:.0f}% less)'
+	)
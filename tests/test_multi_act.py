@@ -0,0 +1,122 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from browser_use.agent.views import ActionResult, StepMetadata
+from browser_use.browser.browser import Browser
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.controller.service import Controller
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMElementNode
+
+# run with:
+# python -m pytest tests/test_multi_act.py
+
+
+def _tree(*tag_paths: str) -> dict[int, DOMElementNode]:
+	"""Selector map of elements below a body root, one element per '/' separated tag path"""
+	root = DOMElementNode(tag_name='body', xpath='body', attributes={}, children=[], is_visible=True, parent=None)
+	selector_map = {}
+	for index, tag_path in enumerate(tag_paths):
+		parent = root
+		for tag_name in tag_path.split('/'):
+			node = DOMElementNode(tag_name=tag_name, xpath='', attributes={}, children=[], is_visible=True, parent=parent)
+			parent.children.append(node)
+			parent = node
+		parent.highlight_index = index
+		selector_map[index] = parent
+	return selector_map
+
+
+def _hashes(*tag_paths: str) -> list[str]:
+	return [node.hash.branch_path_hash for node in _tree(*tag_paths).values()]
+
+
+@pytest.fixture
+def setup():
+	controller = Controller()
+	controller.act = AsyncMock(return_value=ActionResult())  # type: ignore
+
+	selector_map = _tree('form/input', 'form/button')
+	context = BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig(wait_between_actions=0))
+	context.get_session = AsyncMock(return_value=Mock(cached_state=Mock(selector_map=selector_map)))  # type: ignore
+	context.remove_highlights = AsyncMock()  # type: ignore
+	context.get_state = AsyncMock(return_value=Mock(selector_map=selector_map))  # type: ignore
+	context.wait_for_dom_settle = AsyncMock(return_value=0.2)  # type: ignore
+
+	ActionModel = controller.registry.create_action_model()
+	actions = [ActionModel(input_text={'index': 0, 'text': 'Jane'}), ActionModel(click_element={'index': 1})]  # type: ignore
+	return controller, context, actions
+
+
+@pytest.mark.asyncio
+async def test_unchanged_elements_skip_extraction(setup):
+	controller, context, actions = setup
+	context.get_interactive_branch_path_hashes = AsyncMock(return_value=_hashes('form/button', 'form/input'))  # type: ignore
+
+	step_metadata = StepMetadata(step_number=1, step_start_time=0)
+	results = await controller.multi_act(actions, context, step_metadata=step_metadata)
+
+	assert len(results) == 2
+	context.get_state.assert_not_awaited()
+	assert step_metadata.settle_times == [0.2]
+
+
+@pytest.mark.asyncio
+async def test_new_elements_stop_without_extraction(setup):
+	controller, context, actions = setup
+	context.get_interactive_branch_path_hashes = AsyncMock(return_value=_hashes('form/input', 'form/button', 'ul/li/a'))  # type: ignore
+
+	results = await controller.multi_act(actions, context)
+
+	assert len(results) == 1
+	context.get_state.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('page_hashes', [_hashes('form/button'), None])
+async def test_changed_or_unknown_elements_extract_state(setup, page_hashes):
+	controller, context, actions = setup
+	context.get_interactive_branch_path_hashes = AsyncMock(return_value=page_hashes)  # type: ignore
+
+	results = await controller.multi_act(actions, context)
+
+	assert len(results) == 2
+	context.get_state.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_in_page_hashes_match_history_tree_processor():
+	page = Mock(evaluate=AsyncMock(return_value=['form/input', 'form/button']))
+
+	hashes = await DomService(page).get_interactive_branch_path_hashes()
+
+	assert hashes == _hashes('form/input', 'form/button')
+	assert page.evaluate.await_args.args[1]['branchPathsOnly'] is True
+
+
+@pytest.mark.asyncio
+async def test_dom_settle_returns_once_page_is_quiet():
+	context = BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig(wait_between_actions=5, dom_settle_time=0.1))
+	# milliseconds since the last mutation, the page stops changing after the first check
+	page = Mock(evaluate=AsyncMock(side_effect=[0, 20, 150]))
+	context.get_current_page = AsyncMock(return_value=page)  # type: ignore
+
+	settle_time = await context.wait_for_dom_settle()
+
+	assert 0.05 < settle_time < 1
+	assert page.evaluate.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_dom_settle_waits_for_requests_up_to_the_maximum():
+	context = BrowserContext(
+		browser=Mock(spec=Browser), config=BrowserContextConfig(wait_between_actions=0.3, dom_settle_time=0.1)
+	)
+	page = Mock(evaluate=AsyncMock(return_value=1000))
+	context.get_current_page = AsyncMock(return_value=page)  # type: ignore
+	context._inflight_requests.add(Mock())
+
+	settle_time = await context.wait_for_dom_settle()
+
+	assert 0.3 <= settle_time < 0.5
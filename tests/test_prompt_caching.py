@@ -0,0 +1,111 @@
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from langchain_anthropic import ChatAnthropic
+from langchain_anthropic.chat_models import _format_messages
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_openai import ChatOpenAI
+
+from browser_use.agent.message_manager.service import CACHE_CONTROL, MessageManager
+from browser_use.agent.prompts import SystemPrompt
+from browser_use.agent.service import Agent
+from browser_use.agent.views import AgentBrain, AgentOutput, StepMetadata
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.views import BrowserState, TabInfo
+from browser_use.dom.views import DOMElementNode
+
+# run with:
+# python -m pytest tests/test_prompt_caching.py
+
+
+def _message_manager(llm: BaseChatModel) -> MessageManager:
+	return MessageManager(
+		llm=llm,
+		task='Test task',
+		action_descriptions='Test actions',
+		system_prompt_class=SystemPrompt,
+		message_context='Test context',
+	)
+
+
+def _state(url: str) -> BrowserState:
+	return BrowserState(
+		url=url,
+		title='Test Page',
+		element_tree=DOMElementNode(tag_name='div', attributes={}, children=[], is_visible=True, parent=None, xpath='//div'),
+		selector_map={},
+		tabs=[TabInfo(page_id=1, url=url, title='Test Page')],
+	)
+
+
+def _run_step(message_manager: MessageManager, url: str) -> list:
+	message_manager.add_state_message(_state(url))
+	messages = message_manager.get_messages()
+	message_manager._remove_last_state_message()
+	brain = AgentBrain(evaluation_previous_goal='', memory='', next_goal=f'visit {url}')
+	message_manager.add_model_output(AgentOutput(current_state=brain, action=[]))
+	return messages
+
+
+def test_anthropic_prefix_is_marked_and_stable_across_steps():
+	llm = ChatAnthropic(model_name='claude-3-5-sonnet-20240620', api_key='x', timeout=None, stop=None)  # type: ignore
+	message_manager = _message_manager(llm)
+
+	first = _run_step(message_manager, 'https://a.com')
+	second = _run_step(message_manager, 'https://b.com')
+
+	prefix_length = message_manager.prefix_length
+	assert [m.model_dump() for m in first[:prefix_length]] == [m.model_dump() for m in second[:prefix_length]]
+
+	system, formatted = _format_messages(second)
+	assert system[-1]['cache_control'] == CACHE_CONTROL  # type: ignore
+	marked = [block for m in formatted if isinstance(m['content'], list) for block in m['content'] if 'cache_control' in block]
+	assert len(marked) == 1
+	assert 'Test task' in marked[0]['text']
+
+	# the history itself keeps plain messages
+	assert isinstance(message_manager.history.messages[0].message.content, str)
+
+
+def test_openai_messages_are_not_marked():
+	message_manager = _message_manager(ChatOpenAI(model='gpt-4o', api_key='x'))  # type: ignore
+
+	messages = message_manager.get_messages()
+
+	assert isinstance(messages[0], SystemMessage)
+	assert all(isinstance(m.content, str) for m in messages)
+
+
+def test_system_prompt_is_identical_across_runs_of_a_day():
+	morning = SystemPrompt('Test actions', current_date=datetime(2025, 1, 1, 9, 0)).get_system_message()
+	evening = SystemPrompt('Test actions', current_date=datetime(2025, 1, 1, 21, 30)).get_system_message()
+
+	assert morning.content == evening.content
+
+
+@pytest.mark.asyncio
+async def test_step_metadata_reports_cached_input_tokens():
+	llm = Mock(spec=BaseChatModel)
+	structured_llm = Mock()
+	llm.with_structured_output = Mock(return_value=structured_llm)
+	agent = Agent(task='Test task', llm=llm, browser=Mock(spec=Browser, config=BrowserConfig()), generate_gif=False)
+	raw = AIMessage(
+		content='',
+		usage_metadata={
+			'input_tokens': 5000,
+			'output_tokens': 100,
+			'total_tokens': 5100,
+			'input_token_details': {'cache_read': 4000},
+		},
+	)
+	brain = AgentBrain(evaluation_previous_goal='', memory='', next_goal='')
+	structured_llm.ainvoke = AsyncMock(return_value={'raw': raw, 'parsed': agent.AgentOutput(current_state=brain, action=[])})
+	step_metadata = StepMetadata(step_number=1, step_start_time=0.0)
+
+	await agent.get_next_action([HumanMessage(content='state')], step_metadata)
+
+	assert step_metadata.input_tokens == 5000
+	assert step_metadata.cached_input_tokens == 4000
+	assert step_metadata.uncached_input_tokens == 1000
@@ -0,0 +1,75 @@
+"""
+Benchmark the dispatch overhead of Registry.execute_action for 10k calls of trivial actions.
+
+The legacy dispatch inspects the signature, builds the param model and dumps it again on every call,
+as execute_action did before invocation plans were computed at registration.
+
+run with:
+python -m pytest tests/test_registry_dispatch_benchmark.py -s -m slow
+"""
+
+import time
+from inspect import signature
+
+import pytest
+from pydantic import BaseModel
+
+from browser_use.controller.registry.service import Registry
+
+CALLS = 10_000
+
+
+class ClickParams(BaseModel):
+	index: int
+	xpath: str | None = None
+
+
+async def _legacy_execute_action(registry: Registry, action_name: str, params: dict, browser=None):
+	action = registry.registry.actions[action_name]
+	validated_params = action.param_model(**params)
+	parameters = list(signature(action.function).parameters.values())
+	is_pydantic = parameters and issubclass(parameters[0].annotation, BaseModel)
+	if action.requires_browser:
+		if is_pydantic:
+			return await action.function(validated_params, browser=browser)
+		return await action.function(**validated_params.model_dump(), browser=browser)
+	if is_pydantic:
+		return await action.function(validated_params)
+	return await action.function(**validated_params.model_dump())
+
+
+def _registry() -> Registry:
+	registry = Registry()
+
+	@registry.action('Click', param_model=ClickParams, requires_browser=True)
+	async def click(params: ClickParams, browser):
+		return params.index
+
+	@registry.action('Add numbers')
+	async def add_numbers(a: int, b: int):
+		return a + b
+
+	return registry
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('action_name, params', [('click', {'index': 5}), ('add_numbers', {'a': 1, 'b': 2})])
+async def test_dispatch_overhead_10k_actions(action_name, params):
+	registry = _registry()
+	browser = object()
+
+	start = time.perf_counter()
+	for _ in range(CALLS):
+		await _legacy_execute_action(registry, action_name, params, browser=browser)
+	legacy = time.perf_counter() - start
+
+	start = time.perf_counter()
+	for _ in range(CALLS):
+		await registry.execute_action(action_name, params, browser=browser)  # type: ignore
+	planned = time.perf_counter() - start
+
+	print(
+		f'\n{action_name}: {CALLS} dispatches {legacy * 1000:.0f}ms -> {planned * 1000:.0f}ms '
+		f'({legacy / CALLS * 1e6:.1f}us -> {planned / CALLS * 1e6:.1f}us per action)'
+	)
+	assert planned < legacy
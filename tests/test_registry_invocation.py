@@ -0,0 +1,50 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from pydantic import BaseModel
+
+from browser_use.controller.registry.service import Registry
+
+# run with:
+# python -m pytest tests/test_registry_invocation.py
+
+
+class Address(BaseModel):
+	street: str
+	city: str
+
+
+@pytest.mark.asyncio
+async def test_invocation_plan_is_made_at_registration():
+	registry = Registry()
+
+	@registry.action('Describe an address')
+	async def describe(address: Address, floor: int = 0):
+		return f'{address.street}, {address.city} (floor {floor})'
+
+	action, plan = registry._plans['describe']
+	assert action is registry.registry.actions['describe']
+	assert plan.pass_model is False
+
+	# model typed keyword arguments receive model instances
+	result = await registry.execute_action('describe', {'address': {'street': 'Main St 1', 'city': 'Springfield'}})
+	assert result == 'Main St 1, Springfield (floor 0)'
+
+
+@pytest.mark.asyncio
+async def test_actions_put_into_the_registry_get_a_plan_on_first_use():
+	registry = Registry()
+
+	@registry.action('Original')
+	async def replaced(value: str):
+		return 'original'
+
+	registry.registry.actions['replaced'] = MagicMock(
+		requires_browser=False,
+		function=AsyncMock(return_value='mocked'),
+		param_model=Address,
+	)
+
+	assert await registry.execute_action('replaced', {'street': 'Main St 1', 'city': 'Springfield'}) == 'mocked'
+	registry.registry.actions['replaced'].function.assert_awaited_once_with(street='Main St 1', city='Springfield')
+	assert registry._plans['replaced'][0] is registry.registry.actions['replaced']
@@ -0,0 +1,107 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from browser_use.browser.browser import Browser
+from browser_use.browser.context import TRANSPARENT_PIXEL_GIF, BrowserContext, BrowserContextConfig
+
+# run with:
+# python -m pytest tests/test_resource_blocking.py
+
+
+def _route(url: str, resource_type: str, main_frame: bool = False) -> Mock:
+	route = Mock()
+	route.request = Mock(url=url, resource_type=resource_type)
+	if main_frame:
+		route.request.frame.parent_frame = None
+	route.fallback = AsyncMock()
+	route.abort = AsyncMock()
+	route.fulfill = AsyncMock()
+	return route
+
+
+def _context(**config) -> BrowserContext:
+	return BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig(block_resources=True, **config))
+
+
+@pytest.mark.asyncio
+async def test_blocks_configured_types_and_patterns():
+	context = _context(blocked_image_placeholder=False)
+
+	image = _route('https://example.com/logo.png', 'image')
+	tracker = _route('https://www.google-analytics.com/collect', 'xhr')
+	script = _route('https://example.com/app.js', 'script')
+	first_party = _route('https://example.com/api/analytics/ads?metrics=1', 'fetch')
+	document = _route('https://analytics.example.com/dashboard', 'document')
+	ad_frame = _route('https://ad.doubleclick.net/frame.html', 'document')
+	ad_page = _route('https://ad.doubleclick.net/landing.html', 'document', main_frame=True)
+
+	for route in (image, tracker, script, first_party, document, ad_frame, ad_page):
+		await context._route_blocked_resources(route)
+
+	image.abort.assert_awaited_once_with('blockedbyclient')
+	tracker.abort.assert_awaited_once()
+	script.fallback.assert_awaited_once()
+	first_party.fallback.assert_awaited_once()
+	document.fallback.assert_awaited_once()
+	ad_frame.abort.assert_awaited_once()
+	ad_page.fallback.assert_awaited_once()
+
+	stats = context.resource_blocking_stats
+	assert stats.blocked_requests == 3
+	assert stats.blocked_by_type == {'image': 1, 'xhr': 1, 'document': 1}
+	assert stats.estimated_bytes_saved > 0
+
+
+@pytest.mark.asyncio
+async def test_image_placeholder_instead_of_abort():
+	context = _context(blocked_image_placeholder=True)
+	route = _route('https://example.com/hero.jpg', 'image')
+
+	await context._route_blocked_resources(route)
+
+	route.abort.assert_not_awaited()
+	route.fulfill.assert_awaited_once_with(status=200, content_type='image/gif', body=TRANSPARENT_PIXEL_GIF)
+	assert context.resource_blocking_stats.blocked_requests == 1
+
+
+@pytest.mark.asyncio
+async def test_image_placeholder_follows_vision_by_default():
+	context = _context()
+	context._wait_for_page_and_frames_load = AsyncMock()  # type: ignore
+	context._update_state = AsyncMock()  # type: ignore
+	context.get_session = AsyncMock(return_value=Mock())  # type: ignore
+
+	with_vision = _route('https://example.com/hero.jpg', 'image')
+	await context.get_state(use_vision=True)
+	await context._route_blocked_resources(with_vision)
+	with_vision.fulfill.assert_awaited_once()
+
+	without_vision = _route('https://example.com/hero.jpg', 'image')
+	await context.get_state(use_vision=False)
+	await context._route_blocked_resources(without_vision)
+	without_vision.abort.assert_awaited_once_with('blockedbyclient')
+
+
+@pytest.mark.asyncio
+async def test_only_blocked_hosts_are_routed_without_resource_types():
+	context = _context(blocked_resource_types=[], blocked_hosts=['doubleclick.net'])
+	playwright_context = Mock(route=AsyncMock())
+
+	await context._install_resource_blocking(playwright_context)
+
+	pattern = playwright_context.route.await_args.args[0]
+	assert pattern.match('https://ad.doubleclick.net/ddm/ad.js')
+	assert pattern.match('https://doubleclick.net:443')
+	assert not pattern.match('https://example.com/doubleclick.net/ads')
+	assert not pattern.match('https://notdoubleclick.net/')
+
+
+@pytest.mark.asyncio
+async def test_resource_types_route_every_request():
+	context = _context()
+	playwright_context = Mock(route=AsyncMock())
+
+	await context._install_resource_blocking(playwright_context)
+
+	playwright_context.route.assert_awaited_once_with('**/*', context._route_blocked_resources)
@@ -0,0 +1,107 @@
+import base64
+from io import BytesIO
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+from PIL import Image
+
+from browser_use.agent.message_manager.service import MessageManager
+from browser_use.agent.prompts import AgentMessagePrompt, SystemPrompt
+from browser_use.browser.browser import Browser
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.dom.views import DOMElementNode, DOMState
+
+# run with:
+# python -m pytest tests/test_screenshot_config.py
+
+
+def _png(width: int, height: int) -> bytes:
+	output = BytesIO()
+	Image.new('RGB', (width, height), (200, 30, 30)).save(output, format='PNG')
+	return output.getvalue()
+
+
+def _image_message(image: bytes, mime: str = 'png') -> HumanMessage:
+	return HumanMessage(
+		content=[
+			{'type': 'text', 'text': 'state'},
+			{'type': 'image_url', 'image_url': {'url': f'data:image/{mime};base64,{base64.b64encode(image).decode()}'}},
+		]
+	)
+
+
+def _message_manager(llm) -> MessageManager:
+	return MessageManager(
+		llm=llm,
+		task='Test task',
+		action_descriptions='Test actions',
+		system_prompt_class=SystemPrompt,
+		image_tokens=800,
+	)
+
+
+def test_postprocess_keeps_png_without_limits():
+	context = BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig())
+	screenshot = _png(1280, 1100)
+	assert context._postprocess_screenshot(screenshot) is screenshot
+
+
+@pytest.mark.parametrize('screenshot_format', ['png', 'jpeg', 'webp'])
+def test_postprocess_downscales_and_reencodes(screenshot_format):
+	config = BrowserContextConfig(screenshot_format=screenshot_format, screenshot_quality=60, screenshot_max_dimension=640)
+	context = BrowserContext(browser=Mock(spec=Browser), config=config)
+
+	image = Image.open(BytesIO(context._postprocess_screenshot(_png(1280, 1100))))
+	assert image.format == screenshot_format.upper()
+	assert max(image.size) == 640
+	assert image.size == (640, 550)
+
+
+def test_image_tokens_follow_real_dimensions():
+	manager = _message_manager(ChatOpenAI(model='gpt-4o-mini', api_key='test'))
+
+	small = manager._count_tokens(_image_message(_png(512, 512)))
+	large = manager._count_tokens(_image_message(_png(1280, 1100)))
+	assert small < large
+	# one 512px tile plus the base cost, and a couple of text tokens
+	assert 255 <= small < 260
+
+
+def test_image_tokens_anthropic_estimate():
+	manager = _message_manager(ChatAnthropic(model_name='claude-3-5-sonnet-20240620', api_key='test', timeout=100, stop=None))
+	tokens = manager._count_tokens(_image_message(_png(750, 100)))
+	assert 100 <= tokens < 105
+
+
+def test_image_tokens_fall_back_to_flat_estimate():
+	manager = _message_manager(ChatOpenAI(model='gpt-4o-mini', api_key='test'))
+	message = HumanMessage(content=[{'type': 'image_url', 'image_url': {'url': 'data:image/png;base64,not-an-image'}}])
+	assert manager._count_tokens(message) == 800
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('screenshot_format', ['jpeg', 'webp'])
+async def test_state_keeps_screenshot_format(screenshot_format):
+	context = BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig(screenshot_format=screenshot_format))
+	page = AsyncMock(url='https://example.com')
+	root = DOMElementNode(tag_name='body', xpath='', attributes={}, children=[], is_visible=True, parent=None)
+	dom_service = Mock()
+	dom_service.get_clickable_elements = AsyncMock(return_value=DOMState(element_tree=root, selector_map={}))
+
+	with (
+		patch.object(context, 'get_session', AsyncMock()),
+		patch.object(context, 'get_current_page', AsyncMock(return_value=page)),
+		patch.object(context, 'remove_highlights', AsyncMock()),
+		patch.object(context, 'take_screenshot', AsyncMock(return_value='c2NyZWVuc2hvdA==')),
+		patch.object(context, 'get_scroll_info', AsyncMock(return_value=(0, 0))),
+		patch.object(context, 'get_tabs_info', AsyncMock(return_value=[])),
+		patch('browser_use.browser.context.DomService', return_value=dom_service),
+	):
+		state = await context._update_state(use_vision=True)
+
+	assert state.screenshot_format == screenshot_format
+	message = AgentMessagePrompt(state).get_user_message()
+	assert message.content[1]['image_url']['url'].startswith(f'data:image/{screenshot_format};base64,')
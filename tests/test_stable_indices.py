@@ -0,0 +1,95 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.dom.service import DomService
+from browser_use.dom.views import DOMElementNode, DOMState
+
+# run with:
+# python -m pytest tests/test_stable_indices.py
+
+
+def _button(index: int, previous_index: int | None) -> DOMElementNode:
+	return DOMElementNode(
+		tag_name='button',
+		xpath=f'html/body/button[{index}]',
+		attributes={},
+		children=[],
+		is_visible=True,
+		parent=None,
+		highlight_index=index,
+		previous_highlight_index=previous_index,
+	)
+
+
+def test_previous_index_is_parsed():
+	node = DomService(Mock())._parse_node(
+		{'tagName': 'button', 'xpath': 'html/body/button', 'highlightIndex': 7, 'previousHighlightIndex': 3, 'children': []}
+	)
+
+	assert isinstance(node, DOMElementNode)
+	assert node.highlight_index == 7
+	assert node.previous_highlight_index == 3
+
+
+@pytest.mark.asyncio
+async def test_state_exposes_old_to_new_index_mapping():
+	selector_map = {0: _button(0, 0), 5: _button(5, 2), 9: _button(9, None)}
+	dom_state = DOMState(element_tree=_button(0, None), selector_map=selector_map)  # type: ignore
+	page = Mock(url='https://example.com', evaluate=AsyncMock(), title=AsyncMock(return_value='Example'))
+	context = BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig(stable_highlight_indices=False))
+	context.get_session = AsyncMock()  # type: ignore
+	context.get_current_page = AsyncMock(return_value=page)  # type: ignore
+	context.remove_highlights = AsyncMock()  # type: ignore
+	context.get_tabs_info = AsyncMock(return_value=[])  # type: ignore
+	context.get_scroll_info = AsyncMock(return_value=(0, 0))  # type: ignore
+
+	with patch('browser_use.browser.context.DomService') as dom_service:
+		dom_service.return_value.get_clickable_elements = AsyncMock(return_value=dom_state)
+		state = await context._update_state()
+
+	assert dom_service.return_value.get_clickable_elements.await_args.kwargs['stable_indices'] is False
+	assert state.index_mapping == {0: 0, 2: 5}
+
+	context.config.stable_highlight_indices = True
+	with patch('browser_use.browser.context.DomService') as dom_service:
+		dom_service.return_value.get_clickable_elements = AsyncMock(return_value=dom_state)
+		state = await context._update_state()
+
+	assert state.index_mapping == {}
+
+
+PAGE = """
+<html><body>
+	<div id="banner"></div>
+	<button>First</button>
+	<button>Second</button>
+	<a href="#">Link</a>
+</body></html>
+"""
+
+
+@pytest.mark.asyncio
+async def test_indices_survive_elements_added_before_them():
+	browser = Browser(config=BrowserConfig(headless=True))
+	context = BrowserContext(browser=browser, config=BrowserContextConfig(highlight_elements=False))
+	try:
+		page = await context.get_current_page()
+		await page.set_content(PAGE)
+		first = await context.get_state()
+		before = {node.get_all_text(): index for index, node in first.selector_map.items()}
+
+		await page.evaluate("document.getElementById('banner').innerHTML = '<button>Accept cookies</button>'")
+		second = await context.get_state()
+		after = {node.get_all_text(): index for index, node in second.selector_map.items()}
+
+		for text in ('First', 'Second', 'Link'):
+			assert after[text] == before[text]
+		assert after['Accept cookies'] not in before.values()
+		# nothing to map while indices are stable
+		assert second.index_mapping == {}
+	finally:
+		await context.close()
+		await browser.close()
@@ -0,0 +1,126 @@
+from unittest.mock import Mock
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import HumanMessage
+
+from browser_use.agent.message_manager.service import MessageManager
+from browser_use.agent.prompts import SystemPrompt
+from browser_use.browser.views import BrowserState, TabInfo
+from browser_use.dom.views import DOMElementNode, DOMTextNode
+
+# run with:
+# python -m pytest tests/test_state_deltas.py
+
+
+def _element(index: int, text: str, tag_name: str = 'button', value: str | None = None) -> DOMElementNode:
+	element = DOMElementNode(
+		tag_name=tag_name,
+		xpath=f'html/body/{tag_name}[{index}]',
+		attributes={'value': value} if value is not None else {},
+		children=[],
+		is_visible=True,
+		parent=None,
+		highlight_index=index,
+	)
+	element.children.append(DOMTextNode(text=text, is_visible=True, parent=element))
+	return element
+
+
+def _state(url: str, elements: list[DOMElementNode]) -> BrowserState:
+	root = DOMElementNode(
+		tag_name='body', xpath='html/body', attributes={}, children=list(elements), is_visible=True, parent=None
+	)
+	for element in elements:
+		element.parent = root
+	return BrowserState(
+		url=url,
+		title='Test Page',
+		element_tree=root,
+		selector_map={e.highlight_index: e for e in elements},  # type: ignore
+		tabs=[TabInfo(page_id=1, url=url, title='Test Page')],
+	)
+
+
+def _page(value: str = '', extra: int = 0) -> list[DOMElementNode]:
+	elements = [_element(i, f'Link {i}', tag_name='a') for i in range(10)]
+	elements.append(_element(10, '', tag_name='input', value=value))
+	elements += [_element(11 + i, f'New {i}') for i in range(extra)]
+	return elements
+
+
+def _message_manager(state_deltas: bool = True, full_snapshot_interval: int = 5) -> MessageManager:
+	return MessageManager(
+		llm=Mock(spec=BaseChatModel),
+		task='Test task',
+		action_descriptions='Test actions',
+		system_prompt_class=SystemPrompt,
+		include_attributes=['value'],
+		state_deltas=state_deltas,
+		full_snapshot_interval=full_snapshot_interval,
+	)
+
+
+def _step(message_manager: MessageManager, state: BrowserState) -> str:
+	message_manager.add_state_message(state)
+	content = message_manager.get_messages()[-1].content
+	message_manager._remove_last_state_message()
+	assert isinstance(content, str)
+	return content
+
+
+def test_same_page_sends_only_changed_elements():
+	message_manager = _message_manager()
+
+	first = _step(message_manager, _state('https://example.com', _page()))
+	assert 'Interactive elements from current page view' in first
+	snapshot = message_manager.history.messages[-1].message
+	assert isinstance(snapshot, HumanMessage)
+	assert 'Page snapshot of https://example.com' in snapshot.content
+	assert '3[:]<a >Link 3</a>' in snapshot.content
+
+	second = _step(message_manager, _state('https://example.com', _page(value='hello', extra=1)))
+	assert 'Changes to the interactive elements of the page snapshot above' in second
+	assert 'Added:\n11[:]<button >New 0</button>' in second
+	assert 'Changed:\n10[:]<input value="hello"></input>' in second
+	assert 'Link 3' not in second
+	assert len(second) < len(first)
+
+	# the snapshot stays the reference for the next delta
+	assert message_manager.history.messages[-1].message is snapshot
+
+
+def test_navigation_sends_full_element_list():
+	message_manager = _message_manager()
+	_step(message_manager, _state('https://example.com', _page()))
+
+	content = _step(message_manager, _state('https://example.com/other', _page()))
+
+	assert 'Interactive elements from current page view' in content
+	snapshots = [m for m in message_manager.history.messages if 'Page snapshot of' in str(m.message.content)]
+	assert len(snapshots) == 1
+	assert 'https://example.com/other' in snapshots[0].message.content
+
+
+def test_full_element_list_after_interval_or_large_change():
+	message_manager = _message_manager(full_snapshot_interval=2)
+	_step(message_manager, _state('https://example.com', _page()))
+
+	assert 'Changes to' in _step(message_manager, _state('https://example.com', _page(value='a')))
+	assert 'Changes to' in _step(message_manager, _state('https://example.com', _page(value='b')))
+	assert 'Interactive elements from current page view' in _step(
+		message_manager, _state('https://example.com', _page(value='c'))
+	)
+
+	# more new elements than the page had before
+	content = _step(message_manager, _state('https://example.com', _page(value='c', extra=20)))
+	assert 'Interactive elements from current page view' in content
+
+
+def test_full_element_list_without_state_deltas():
+	message_manager = _message_manager(state_deltas=False)
+
+	for _ in range(2):
+		content = _step(message_manager, _state('https://example.com', _page()))
+		assert 'Interactive elements from current page view' in content
+
+	assert not any('Page snapshot of' in str(m.message.content) for m in message_manager.history.messages)
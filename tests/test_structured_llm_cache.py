@@ -0,0 +1,55 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import HumanMessage
+
+from browser_use.agent.service import Agent
+from browser_use.agent.views import AgentBrain
+from browser_use.browser.browser import Browser, BrowserConfig
+
+# run with:
+# python -m pytest tests/test_structured_llm_cache.py
+
+
+def _agent() -> Agent:
+	llm = Mock(spec=BaseChatModel)
+	structured_llm = Mock()
+	llm.with_structured_output = Mock(return_value=structured_llm)
+	agent = Agent(task='Test task', llm=llm, browser=Mock(spec=Browser, config=BrowserConfig()), generate_gif=False)
+
+	async def ainvoke(messages):
+		brain = AgentBrain(evaluation_previous_goal='', memory='', next_goal='')
+		return {'parsed': agent.AgentOutput(current_state=brain, action=[])}
+
+	structured_llm.ainvoke = AsyncMock(side_effect=ainvoke)
+	return agent
+
+
+@pytest.mark.asyncio
+async def test_structured_llm_is_built_once_per_agent():
+	agent = _agent()
+
+	for _ in range(3):
+		await agent.get_next_action([HumanMessage(content='state')])
+
+	agent.llm.with_structured_output.assert_called_once()  # type: ignore
+	assert agent.llm.with_structured_output.call_args.args[0] is agent.AgentOutput  # type: ignore
+
+
+@pytest.mark.asyncio
+async def test_registering_an_action_rebuilds_the_structured_llm():
+	agent = _agent()
+	await agent.get_next_action([HumanMessage(content='state')])
+	old_output_model = agent.AgentOutput
+
+	@agent.controller.registry.action('Say hello')
+	def say_hello(name: str):
+		return f'hello {name}'
+
+	await agent.get_next_action([HumanMessage(content='state')])
+
+	assert agent.llm.with_structured_output.call_count == 2  # type: ignore
+	assert agent.AgentOutput is not old_output_model
+	assert 'say_hello' in agent.ActionModel.model_fields
+	assert agent.llm.with_structured_output.call_args.args[0] is agent.AgentOutput  # type: ignore
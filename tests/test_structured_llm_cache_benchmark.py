@@ -0,0 +1,59 @@
+"""
+Benchmark of binding the output schema to the LLM on every step versus once per agent.
+
+run with:
+python -m pytest tests/test_structured_llm_cache_benchmark.py -s -m slow
+"""
+
+import time
+from unittest.mock import Mock
+
+import pytest
+from langchain_openai import ChatOpenAI
+
+from browser_use.agent.service import Agent
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.controller.service import Controller
+
+STEPS = 100
+
+
+def _controller_with_actions(extra_actions: int) -> Controller:
+	controller = Controller()
+	for i in range(extra_actions):
+
+		def custom_action(text: str, index: int):
+			return text
+
+		custom_action.__name__ = f'custom_action_{i}'
+		controller.registry.action(f'Custom action {i}')(custom_action)
+	return controller
+
+
+@pytest.mark.slow
+def test_structured_llm_cache_benchmark():
+	controller = _controller_with_actions(extra_actions=5)
+	action_count = len(controller.registry.registry.actions)
+	assert action_count >= 15
+
+	agent = Agent(
+		task='Benchmark',
+		llm=ChatOpenAI(model='gpt-4o', api_key='benchmark'),  # type: ignore
+		controller=controller,
+		browser=Mock(spec=Browser, config=BrowserConfig()),
+		generate_gif=False,
+	)
+
+	start = time.perf_counter()
+	for _ in range(STEPS):
+		agent.llm.with_structured_output(agent.AgentOutput, include_raw=True, method=agent.tool_calling_method)
+	uncached = (time.perf_counter() - start) / STEPS
+
+	agent._get_structured_llm()
+	start = time.perf_counter()
+	for _ in range(STEPS):
+		agent._get_structured_llm()
+	cached = (time.perf_counter() - start) / STEPS
+
+	print(f'\n{action_count} actions, per step: rebuilt {uncached * 1000:.2f}ms, cached {cached * 1000:.4f}ms')
+	assert cached < uncached
@@ -0,0 +1,89 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from browser_use.browser.browser import Browser
+from browser_use.browser.context import BrowserContext, BrowserContextConfig
+from browser_use.dom.views import DOMElementNode
+
+# run with:
+# python -m pytest tests/test_text_input.py
+
+
+def _element(tag_name: str, **attributes: str) -> DOMElementNode:
+	return DOMElementNode(
+		tag_name=tag_name,
+		xpath=f'html/body/{tag_name}',
+		attributes=attributes,
+		children=[],
+		is_visible=True,
+		parent=None,
+		highlight_index=0,
+	)
+
+
+def _context(element_handle, **config) -> BrowserContext:
+	context = BrowserContext(browser=Mock(spec=Browser), config=BrowserContextConfig(highlight_elements=False, **config))
+	page = Mock(wait_for_load_state=AsyncMock())
+	context.get_current_page = AsyncMock(return_value=page)  # type: ignore
+	context.get_locate_element = AsyncMock(return_value=element_handle)  # type: ignore
+	return context
+
+
+def _element_handle() -> Mock:
+	return Mock(scroll_into_view_if_needed=AsyncMock(), fill=AsyncMock(), type=AsyncMock(), evaluate=AsyncMock())
+
+
+@pytest.mark.parametrize(
+	'element, strategy',
+	[
+		(_element('input'), 'fill'),
+		(_element('input', type='email'), 'fill'),
+		(_element('textarea'), 'fill'),
+		(_element('input', type='checkbox'), 'type'),
+		(_element('input', role='combobox'), 'type'),
+		(_element('input', **{'aria-autocomplete': 'list'}), 'type'),
+		(_element('input', list='cities'), 'type'),
+		(_element('div', contenteditable='true'), 'insert_text'),
+		(_element('div', contenteditable=''), 'insert_text'),
+		(_element('div', role='textbox'), 'type'),
+	],
+)
+def test_detect_text_input_strategy(element, strategy):
+	assert BrowserContext._detect_text_input_strategy(element) == strategy
+
+
+@pytest.mark.asyncio
+async def test_fill_is_used_for_plain_inputs():
+	element_handle = _element_handle()
+	context = _context(element_handle)
+
+	assert await context._input_text_element_node(_element('input'), 'Main Street 1') == 'fill'
+	element_handle.fill.assert_awaited_once_with('Main Street 1')
+	element_handle.type.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_failing_strategy_falls_back_to_typing():
+	element_handle = _element_handle()
+	element_handle.fill = AsyncMock(side_effect=[Exception('Element is not an <input>'), None])
+	context = _context(element_handle)
+
+	assert await context._input_text_element_node(_element('input'), 'Main Street 1') == 'type'
+	element_handle.type.assert_awaited_once_with('Main Street 1')
+
+
+@pytest.mark.asyncio
+async def test_override_selector_wins_over_default():
+	element_handle = _element_handle()
+	# the element matches the second override selector
+	element_handle.evaluate = AsyncMock(return_value=1)
+	context = _context(element_handle, text_input_strategy='fill', text_input_overrides={'#name': 'fill', '#address': 'type'})
+
+	assert await context._input_text_element_node(_element('input'), 'Main Street 1') == 'type'
+	element_handle.type.assert_awaited_once_with('Main Street 1')
+
+	# an explicit strategy skips the override lookup
+	element_handle.evaluate.reset_mock()
+	assert await context._input_text_element_node(_element('input'), 'Main Street 1', strategy='fill') == 'fill'
+	element_handle.evaluate.assert_not_awaited()
@@ -0,0 +1,64 @@
+"""
+Benchmark input_text strategies for 1000 character inputs.
+
+Every strategy enters the same text into a plain input, a textarea and a contenteditable element of a local
+fixture page. Per-character typing is the behaviour before text_input_strategy existed.
+
+run with:
+python -m pytest tests/test_text_input_benchmark.py -s -m slow
+"""
+
+import time
+
+import pytest
+
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.context import BrowserContextConfig
+
+TEXT = ('The quick brown fox jumps over the lazy dog. ' * 23)[:1000]
+
+FORM_PAGE = """
+<html>
+<body>
+	<input id="address">
+	<textarea id="description"></textarea>
+	<div id="notes" contenteditable="true"></div>
+</body>
+</html>
+"""
+
+FIXTURE_URL = 'http://fixtures.test/form.html'
+FIELDS = {'address': 'input', 'description': 'textarea', 'notes': 'div'}
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize('field_id', list(FIELDS))
+async def test_text_input_strategies_1k_characters(field_id):
+	browser = Browser(config=BrowserConfig(headless=True))
+	try:
+		async with await browser.new_context(BrowserContextConfig(highlight_elements=False)) as context:
+			page = await context.get_current_page()
+			await page.route(FIXTURE_URL, lambda route: route.fulfill(content_type='text/html', body=FORM_PAGE))
+			await page.goto(FIXTURE_URL)
+
+			state = await context.get_state()
+			element_node = next(node for node in state.selector_map.values() if node.attributes.get('id') == field_id)
+			auto_strategy = context._detect_text_input_strategy(element_node)
+
+			timings = {}
+			for strategy in ['type', 'fill', 'insert_text']:
+				start = time.perf_counter()
+				used = await context._input_text_element_node(element_node, TEXT, strategy=strategy)
+				timings[strategy] = time.perf_counter() - start
+
+				content = await page.eval_on_selector(f'#{field_id}', '(element) => element.value ?? element.innerText')
+				assert content.strip() == TEXT.strip(), f'{strategy} (used {used}) entered a different text'
+
+			# only reported, the timings vary too much between machines to assert on
+			print(
+				f'\n{FIELDS[field_id]}#{field_id} 1k chars: '
+				+ ', '.join(f'{strategy} {seconds * 1000:.0f}ms' for strategy, seconds in timings.items())
+				+ f' (auto picks {auto_strategy})'
+			)
+	finally:
+		await browser.close()
@@ -0,0 +1,101 @@
+from unittest.mock import Mock, patch
+
+from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import HumanMessage
+from langchain_openai import ChatOpenAI
+
+from browser_use.agent.message_manager import tokenizer as tokenizer_module
+from browser_use.agent.message_manager.service import MessageManager
+from browser_use.agent.message_manager.tokenizer import TiktokenTokenizer, Tokenizer, get_tokenizer, register_tokenizer
+from browser_use.agent.prompts import SystemPrompt
+
+# run with:
+# python -m pytest tests/test_tokenizer.py
+
+
+class WordTokenizer(Tokenizer):
+	def _count_tokens(self, text: str) -> int:
+		return len(text.split())
+
+
+def _message_manager(tokenizer: Tokenizer, max_input_tokens: int = 128000) -> MessageManager:
+	return MessageManager(
+		llm=ChatOpenAI(model='gpt-4o', api_key='x'),  # type: ignore
+		task='Test task',
+		action_descriptions='Test actions',
+		system_prompt_class=SystemPrompt,
+		max_input_tokens=max_input_tokens,
+		tokenizer=tokenizer,
+	)
+
+
+def test_tokenizer_per_model_family_is_shared():
+	openai = get_tokenizer(ChatOpenAI(model='gpt-4o', api_key='x'))  # type: ignore
+	anthropic = get_tokenizer(ChatAnthropic(model_name='claude-3-5-sonnet-20240620', api_key='x', timeout=None, stop=None))  # type: ignore
+
+	assert isinstance(openai, TiktokenTokenizer)
+	assert openai.model_name == 'gpt-4o'
+	assert type(anthropic) is Tokenizer
+	assert get_tokenizer(ChatOpenAI(model='gpt-4o', api_key='x')) is openai  # type: ignore
+
+
+def test_tiktoken_counts_are_cached_per_text():
+	encoding = Mock(encode=Mock(side_effect=lambda text, **kwargs: text.split()))
+	tokenizer = TiktokenTokenizer('gpt-4o')
+
+	with patch('tiktoken.encoding_for_model', return_value=encoding):
+		assert tokenizer.count_tokens('one two three') == 3
+		assert tokenizer.count_tokens('one two three') == 3
+		assert tokenizer.count_tokens('four') == 1
+
+	assert encoding.encode.call_count == 2
+
+
+def test_tiktoken_falls_back_to_estimate_without_encoding():
+	tokenizer = TiktokenTokenizer('gpt-4o', characters_per_token=4)
+
+	with patch('tiktoken.encoding_for_model', side_effect=OSError('offline')):
+		assert tokenizer.count_tokens('x' * 40) == 10
+
+
+def test_registered_tokenizer_is_used_for_its_model_class():
+	try:
+		register_tokenizer('ChatOpenAI', lambda llm, characters_per_token: WordTokenizer())
+		message_manager = MessageManager(
+			llm=ChatOpenAI(model='gpt-4o', api_key='x'),  # type: ignore
+			task='Test task',
+			action_descriptions='Test actions',
+			system_prompt_class=SystemPrompt,
+		)
+		assert isinstance(message_manager.tokenizer, WordTokenizer)
+	finally:
+		register_tokenizer('ChatOpenAI', tokenizer_module._openai_tokenizer)
+
+
+def test_provider_token_counts_correct_the_estimate():
+	message_manager = _message_manager(WordTokenizer())
+	counted = message_manager.history.total_tokens
+	message_manager.get_messages()
+
+	message_manager.reconcile_input_tokens(counted * 2)
+	assert message_manager.token_correction == 1.5
+	assert message_manager.estimated_input_tokens == round(counted * 1.5)
+
+	# one odd report can not blow up the correction
+	message_manager.reconcile_input_tokens(counted * 100)
+	assert message_manager.token_correction == 2.25
+
+
+def test_cut_messages_uses_the_corrected_limit():
+	message_manager = _message_manager(WordTokenizer(), max_input_tokens=2000)
+	message_manager._add_message_with_tokens(HumanMessage(content='word ' * 500))
+	total = message_manager.history.total_tokens
+	assert 1000 < total < 2000
+
+	message_manager.cut_messages()
+	assert message_manager.history.total_tokens == total
+
+	# the provider counts twice as many tokens as the tokenizer, so the history is over the limit
+	message_manager.token_correction = 2.0
+	message_manager.cut_messages()
+	assert message_manager.history.total_tokens <= 1000
@@ -0,0 +1,200 @@
+import base64
+from io import BytesIO
+from unittest.mock import Mock
+
+import pytest
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_openai import ChatOpenAI
+from PIL import Image, ImageDraw
+
+from browser_use.agent.message_manager.service import MessageManager
+from browser_use.agent.prompts import AgentMessagePrompt, SystemPrompt
+from browser_use.agent.service import Agent
+from browser_use.agent.views import ActionResult
+from browser_use.agent.vision import AdaptiveVisionPolicy, VisionDecision, VisionPolicy
+from browser_use.browser.browser import Browser, BrowserConfig
+from browser_use.browser.views import BrowserState, TabInfo
+from browser_use.controller.service import Controller
+from browser_use.dom.views import DOMElementNode
+
+# run with:
+# python -m pytest tests/test_vision_policy.py
+
+
+def _screenshot(*boxes: tuple[int, int, int, int]) -> str:
+	image = Image.new('RGB', (800, 600), 'white')
+	draw = ImageDraw.Draw(image)
+	for box in boxes:
+		draw.rectangle(box, fill='black')
+	buffer = BytesIO()
+	image.save(buffer, format='PNG')
+	return base64.b64encode(buffer.getvalue()).decode()
+
+
+def _state(screenshot: str | None, url: str = 'https://example.com', tags: list[str] = []) -> BrowserState:
+	children = [
+		DOMElementNode(tag_name=tag, xpath=f'html/body/{tag}', attributes={}, children=[], is_visible=True, parent=None)
+		for tag in tags
+	]
+	root = DOMElementNode(
+		tag_name='body', xpath='html/body', attributes={}, children=list(children), is_visible=True, parent=None
+	)
+	return BrowserState(
+		url=url,
+		title='Test Page',
+		element_tree=root,
+		selector_map={},
+		tabs=[TabInfo(page_id=1, url=url, title='Test Page')],
+		screenshot=screenshot,
+	)
+
+
+def _size(screenshot: str) -> tuple[int, int]:
+	return Image.open(BytesIO(base64.b64decode(screenshot))).size
+
+
+def test_default_policy_sends_every_screenshot():
+	policy = VisionPolicy()
+	screenshot = _screenshot()
+
+	for _ in range(3):
+		assert policy.decide(_state(screenshot)).screenshot == screenshot
+
+	assert policy.stats.images_sent == 3
+	assert policy.stats.images_skipped == 0
+
+
+def test_unchanged_page_is_left_out_and_changes_are_cropped():
+	policy = AdaptiveVisionPolicy()
+	page = _screenshot((0, 0, 800, 60))
+
+	assert policy.decide(_state(page)).reason == 'navigation'
+
+	unchanged = policy.decide(_state(page))
+	assert unchanged.screenshot is None
+	assert unchanged.note and 'request_screenshot' in unchanged.note
+
+	# a dropdown opened in the middle of the page
+	dropdown = _screenshot((0, 0, 800, 60), (300, 200, 450, 320))
+	cropped = policy.decide(_state(dropdown))
+	assert cropped.reason == 'changed_region'
+	assert cropped.cropped and cropped.detail == 'high'
+	width, height = _size(cropped.screenshot)  # type: ignore
+	assert width < 400 and height < 300
+
+	# compared against what the model has seen last, the same dropdown is not sent again
+	assert policy.decide(_state(dropdown)).reason == 'unchanged'
+
+	different_page_same_url = _screenshot((0, 0, 800, 600))
+	assert policy.decide(_state(different_page_same_url)).reason == 'changed'
+
+	assert policy.stats.images_sent == 3
+	assert policy.stats.images_cropped == 1
+	assert policy.stats.images_skipped == 2
+	assert policy.stats.reasons == {'navigation': 1, 'unchanged': 2, 'changed_region': 1, 'changed': 1}
+
+
+@pytest.mark.parametrize(
+	'last_result, reason, detail',
+	[
+		([ActionResult(error='Element not found')], 'action_failed', 'high'),
+		([ActionResult(screenshot_requested=True)], 'requested', 'high'),
+		([], 'unchanged', 'auto'),
+	],
+)
+def test_failed_or_requested_actions_send_full_screenshot(last_result, reason, detail):
+	policy = AdaptiveVisionPolicy()
+	page = _screenshot()
+	policy.decide(_state(page))
+
+	decision = policy.decide(_state(page), last_result)
+
+	assert decision.reason == reason
+	assert decision.detail == detail
+	assert (decision.screenshot == page) is (reason != 'unchanged')
+
+
+def test_navigation_refresh_and_visual_content():
+	policy = AdaptiveVisionPolicy(max_steps_without_image=2)
+	page = _screenshot()
+	policy.decide(_state(page))
+
+	assert policy.decide(_state(page, url='https://example.com/next')).reason == 'navigation'
+	assert policy.decide(_state(page, url='https://example.com/next')).reason == 'unchanged'
+	assert policy.decide(_state(page, url='https://example.com/next')).reason == 'unchanged'
+	refresh = policy.decide(_state(page, url='https://example.com/next'))
+	assert refresh.reason == 'refresh'
+	assert refresh.detail == 'low'
+
+	# canvas content can only be seen in full
+	chart = _screenshot((300, 200, 450, 320))
+	decision = policy.decide(_state(chart, url='https://example.com/next', tags=['canvas']))
+	assert decision.reason == 'visual_content'
+	assert decision.screenshot == chart
+
+
+def test_state_message_follows_the_decision():
+	policy = AdaptiveVisionPolicy()
+	page = _screenshot()
+	state = _state(page)
+	policy.decide(state)
+
+	skipped = AgentMessagePrompt(state, vision=policy.decide(state)).get_user_message()
+	assert isinstance(skipped.content, str)
+	assert 'No screenshot this step' in skipped.content
+
+	failed = AgentMessagePrompt(state, vision=policy.decide(state, [ActionResult(error='failed')])).get_user_message()
+	assert failed.content[1]['image_url']['detail'] == 'high'  # type: ignore
+
+	# without a policy decision the message is unchanged
+	default = AgentMessagePrompt(state).get_user_message()
+	assert default.content[1]['image_url'] == {'url': f'data:image/png;base64,{page}'}  # type: ignore
+
+
+def _agent(**kwargs) -> Agent:
+	return Agent(
+		task='Test task',
+		llm=Mock(spec=BaseChatModel),
+		browser=Mock(spec=Browser, config=BrowserConfig()),
+		generate_gif=False,
+		**kwargs,
+	)
+
+
+def _offers_screenshot_requests(agent: Agent) -> bool:
+	return (
+		'request_screenshot' in agent.ActionModel.model_fields
+		and 'request_screenshot' in agent.message_manager.system_prompt.content
+	)
+
+
+@pytest.mark.asyncio
+async def test_model_can_request_a_screenshot_from_adaptive_policies():
+	controller = Controller()
+	version = controller.registry.version
+
+	assert not _offers_screenshot_requests(_agent(controller=controller))
+	assert not _offers_screenshot_requests(_agent(controller=controller, use_vision=False, vision_policy=AdaptiveVisionPolicy()))
+	agent = _agent(controller=controller, vision_policy=AdaptiveVisionPolicy())
+	assert _offers_screenshot_requests(agent)
+
+	# the agents share the controller, which is not changed for any of them
+	assert controller.registry.version == version
+	result = await controller.registry.execute_action('request_screenshot', {})
+	assert result.screenshot_requested
+
+
+def test_low_detail_images_have_a_flat_token_cost():
+	manager = MessageManager(
+		llm=ChatOpenAI(model='gpt-4o-mini', api_key='test'),
+		task='Test task',
+		action_descriptions='Test actions',
+		system_prompt_class=SystemPrompt,
+	)
+	state = _state(_screenshot())
+	high = AgentMessagePrompt(state, vision=VisionDecision(reason='test', screenshot=state.screenshot, detail='high'))
+	low = AgentMessagePrompt(state, vision=VisionDecision(reason='test', screenshot=state.screenshot, detail='low'))
+
+	high_image, low_image = high.get_user_message().content[1], low.get_user_message().content[1]  # type: ignore
+	assert manager._count_image_tokens(low_image) == 85  # type: ignore
+	assert manager._count_image_tokens(high_image) > 85  # type: ignore